@@ -0,0 +1,36 @@
+"""Microbenchmarks for the latency of memoized type system methods when the
+result is already cached.  Run this file directly::
+
+    $ python bench_typesystem.py
+
+"""
+from __future__ import print_function
+import timeit
+
+from xdress.types.system import TypeSystem
+
+ts = TypeSystem()
+
+CASES = [
+    ("ts.canon(t)", 'float'),
+    ("ts.canon(t)", ('map', 'str', ('vector', 'int32', 0), 0)),
+    ("ts.cython_ctype(t)", 'float'),
+    ("ts.cython_ctype(t)", ('map', 'str', ('vector', 'int32', 0), 0)),
+    ("ts.cython_py2c('x', t)", 'float'),
+    ("ts.cython_py2c('x', t)", ('map', 'str', ('vector', 'int32', 0), 0)),
+    ]
+
+def bench(stmt, t, number=100000, repeat=5):
+    """Returns the best time per call of a statement, in microseconds, after
+    it has been run once so that only cache hits are measured."""
+    setup = "from __main__ import ts; t = {0!r}; {1}".format(t, stmt)
+    times = timeit.Timer(stmt, setup=setup).repeat(number=number, repeat=repeat)
+    return min(times) / number * 1e6
+
+def main():
+    print("{0:<24} {1:<42} {2:>8}".format('call', 't', 'usec'))
+    for stmt, t in CASES:
+        print("{0:<24} {1:<42} {2:>8.3f}".format(stmt, repr(t), bench(stmt, t)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""Benchmarks the Python to C++ conversion of std::vector<double> arguments for
+large inputs.  The current vector converter, which copies contiguous arrays and
+buffers in bulk, is compared with the element by element loop that is used for
+everything else.  This compiles a small extension module with pyximport, so
+Cython and a C++ compiler are required.  Run this file directly::
+
+    $ python bench_vector_py2c.py
+
+"""
+from __future__ import print_function
+import os
+import sys
+import array
+import timeit
+import tempfile
+
+import numpy as np
+
+from xdress.utils import indent
+from xdress.types.system import TypeSystem
+from xdress.types import defaults
+
+SIZES = [10**6, 10**7, 10**8]
+
+_header = """# distutils: language = c++
+from libcpp.vector cimport vector as cpp_vector
+from libc.string cimport memcpy
+from cpython.buffer cimport PyObject_CheckBuffer
+cimport numpy as np
+import numpy as np
+
+np.import_array()
+"""
+
+_func = """
+def {name}(x):
+{decl}
+{body}
+    return {rtn}.size()
+"""
+
+def genpyx():
+    """Returns the source of a module with a function for each converter which
+    converts its argument to a vector and returns the vector's size."""
+    t = ('vector', 'float64', 0)
+    convs = [('bulk', defaults.CYTHON_PY2C_CONV_VECTOR_BULK),
+             ('elementwise', defaults.CYTHON_PY2C_CONV_VECTOR)]
+    pyx = _header
+    for name, conv in convs:
+        ts = TypeSystem()
+        ts.cython_py2c_conv[t] = conv
+        decl, body, rtn = ts.cython_py2c('x', t)
+        pyx += _func.format(name=name, decl=indent(decl), body=indent(body),
+                            rtn=rtn)
+    return pyx
+
+def build():
+    """Compiles the benchmark module and returns it."""
+    import pyximport
+    d = tempfile.mkdtemp()
+    with open(os.path.join(d, 'vector_py2c.pyx'), 'w') as f:
+        f.write(genpyx())
+    pyximport.install(setup_args={'include_dirs': np.get_include()},
+                      build_dir=d, language_level=3)
+    sys.path.insert(0, d)
+    import vector_py2c
+    return vector_py2c
+
+def bench(f, x, repeat=3):
+    """Returns the best time for a call, in milliseconds."""
+    return min(timeit.Timer(lambda: f(x)).repeat(number=1, repeat=repeat)) * 1e3
+
+def main():
+    mod = build()
+    print("{0:>10} {1:<12} {2:>12} {3:>12}".format('size', 'input', 'bulk ms',
+                                                   'element ms'))
+    for n in SIZES:
+        x = np.arange(n, dtype='f8')
+        inputs = [('ndarray', x), ('memoryview', memoryview(x)),
+                  ('array.array', array.array('d', x[:10**6]))]
+        for kind, y in inputs:
+            assert mod.bulk(y) == mod.elementwise(y) == len(y)
+            print("{0:>10} {1:<12} {2:>12.3f} {3:>12.3f}".format(len(y), kind,
+                  bench(mod.bulk, y), bench(mod.elementwise, y)))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+from __future__ import print_function
+import io
+
+from nose.tools import assert_equal, assert_true
+
+from xdress import astparsers
+
+from tools import unit
+
+GCCXML_SAMPLE = u"""<?xml version="1.0"?>
+<GCC_XML>
+  <Namespace id="_1" name="::" members="_3 _4 " mangled="_Z2::"/>
+  <Function id="_3" name="foo" returns="_10" context="_1" file="f1" line="3">
+    <Argument name="a" type="_10" file="f1" line="3"/>
+  </Function>
+  <Variable id="_4" name="foo" type="_10" context="_1" file="f1" line="4"/>
+  <FundamentalType id="_10" name="int" size="32" align="32"/>
+  <Function id="_20" name="baz" returns="_21" context="_1" file="f2" line="1"/>
+  <FundamentalType id="_21" name="float" size="32" align="32"/>
+  <File id="f1" name="./t.h"/>
+  <File id="f2" name="other.h"/>
+</GCC_XML>
+"""
+
+@unit
+def test_gccxml_index():
+    root = astparsers.etree.parse(io.BytesIO(GCCXML_SAMPLE.encode()))
+    idx = astparsers.gccxml_index(root)
+    assert_true(idx is astparsers.gccxml_index(root))
+    assert_equal(idx.find_id('_4').tag, 'Variable')
+    assert_equal(idx.find_id('_42'), None)
+    assert_equal(idx.find_name('foo').tag, 'Function')
+    assert_equal(idx.find_name('a').tag, 'Argument')
+    assert_equal(idx.find_file('t.h').attrib['id'], 'f1')
+    assert_equal([n.attrib['id'] for n in idx.iterchildren('Variable', 'foo')], ['_4'])
+    assert_equal(idx.find_child('Function', 'foo').attrib['id'], '_3')
+    assert_equal(idx.find_child('Function', 'bar'), None)
+    astparsers.clearmemo()
+    assert_true(idx is not astparsers.gccxml_index(root))
+
+@unit
+def test_gccxml_stream():
+    f = io.BytesIO(GCCXML_SAMPLE.encode())
+    root = astparsers.gccxml_stream(f, set(['t.h']))
+    obs = [node.attrib['id'] for node in root.getroot()]
+    exp = ['_1', '_3', '_4', '_10', 'f1', 'f2']
+    assert_equal(obs, exp)
+
+@unit
+def test_parser_cache():
+    roots = [astparsers.etree.parse(io.BytesIO(GCCXML_SAMPLE.encode())) \
+             for i in range(3)]
+    size = astparsers.estimate_ast_size(roots[0])
+    assert_true(size > 0)
+    cache = astparsers.ParserCache(maxsize=2*size)
+    idx = astparsers.gccxml_index(roots[0])
+    memo = astparsers.clang_type_memo(roots[0])
+    cache['a'] = roots[0]
+    cache['b'] = roots[1]
+    assert_true(cache.get('a') is roots[0])
+    cache['c'] = roots[2]
+    # 'b' was the least recently used
+    assert_equal(list(cache._entries.keys()), ['a', 'c'])
+    assert_equal(cache.get('b'), None)
+    assert_equal((cache.hits, cache.misses, cache.evictions), (1, 1, 1))
+    assert_equal(cache.size, 2*size)
+    cache.maxsize = size // 2
+    cache['d'] = roots[1]
+    assert_equal(list(cache._entries.keys()), ['d'])
+    # indexes and memos of evicted trees are dropped too
+    assert_true(idx is not astparsers.gccxml_index(roots[0]))
+    assert_true(memo is not astparsers.clang_type_memo(roots[0]))
+    astparsers.clearmemo()
+
+if __name__ == '__main__':
+    import nose
+    nose.runmodule()
@@ -7,6 +7,7 @@ from xdress import autodescribe as ad
 from xdress.astparsers import PARSERS_AVAILABLE
 from xdress.utils import parse_global_rc, Arg
 
+from nose.tools import assert_equal, assert_true
 from tools import unit, assert_equal_or_diff, skip_then_continue, cleanfs
 
 from numpy.testing import dec
@@ -328,6 +329,51 @@ def test_pycparser_describe_device_descriptor_tag():
            }
     assert_equal_or_diff(obs, exp)
 
+@dec.skipif(ad.pycparser is None)
+@unit
+def test_describe_many():
+    from xdress.utils import apiname
+    testdir = os.path.dirname(os.path.abspath(__file__))
+    names = [(apiname('Device_measure', ('device.c',), 'device', 'Device_measure',
+                      None, (), 'c'), 'func'),
+             (apiname('DeviceDescriptorTag', ('device.c',), 'device',
+                      'DeviceDescriptorTag', None, (), 'c'), 'class'),
+             (apiname('Device_Init', ('device.h', 'device.c'), 'device',
+                      'Device_Init', None, (), 'c'), 'func'),
+             (apiname('Device_Init', ('device.c',), 'device', 'Device_Init',
+                      None, (), 'c'), 'func'),]
+    ts.register_class('DeviceDescriptorTag')
+    kwargs = dict(includes=[testdir], parsers='pycparser', ts=ts, builddir='build')
+    exp = [ad.describe(name.srcfiles, name=name.srcname, kind=kind,
+                       language=name.language, **kwargs) for name, kind in names]
+    def check_describe_many(jobs):
+        closures = []
+        if jobs == 1:
+            obs = ad.describe_many(names, closures=closures, **kwargs)
+        else:
+            obs = ad.parallel_describe(names, jobs, closures=closures, **kwargs)
+        assert_equal_or_diff(obs, exp)
+        assert_equal(len(closures), len(names))
+        for closure in closures:
+            assert_true(any([f.endswith('device.h') for f in closure]))
+    for jobs in (1, 2):
+        yield check_describe_many, jobs
+
+@unit
+def test_clang_type_memo():
+    ad.clearmemo()
+    tu, other = object(), object()
+    memo = ad.clang_type_memo(tu)
+    assert_true(ad.clang_type_memo(tu) is memo)
+    assert_true(ad.clang_type_memo(other) is not memo)
+    assert_equal(ad._clang_memo_get(memo, memo.types, 'double'), (False, None))
+    memo.types['double'] = 'float64'
+    assert_equal(ad._clang_memo_get(memo, memo.types, 'double'), (True, 'float64'))
+    assert_equal((memo.hits, memo.misses), (1, 1))
+    assert_equal(str(memo), '1 hits, 1 misses (50.0% hit rate)')
+    ad.clearmemo()
+    assert_true(ad.clang_type_memo(tu) is not memo)
+
 if __name__ == '__main__':
     import nose
     nose.runmodule()
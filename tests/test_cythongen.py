@@ -0,0 +1,213 @@
+from __future__ import print_function
+import re
+import warnings
+
+import numpy as np
+
+from xdress.types.system import TypeSystem
+from xdress import cythongen as cg
+from xdress.utils import Arg
+
+from nose.tools import assert_equal, assert_true, assert_false, assert_raises
+from tools import unit
+
+ts = TypeSystem()
+
+
+def _exec_dispatcher(lines, **overloads):
+    ns = {'np': np}
+    ns.update(overloads)
+    exec('\n'.join(lines), ns)
+    return ns
+
+@unit
+def test_gen_dispatcher_memoizes_exact_matches():
+    name_mangled = {('f', ('x', 'int32')): '_f_0',
+                    ('f', ('x', 'float64')): '_f_1'}
+    calls = []
+    def _f_0(x):
+        calls.append('_f_0')
+        return 'int'
+    def _f_1(x):
+        calls.append('_f_1')
+        return 'float'
+    lines = cg._gen_dispatcher('f', name_mangled, ts, is_method=False)
+    ns = _exec_dispatcher(lines, _f_0=_f_0, _f_1=_f_1)
+    f = ns['f']
+    assert_equal(f(1.0), 'float')
+    assert_equal(ns['_dispatch_f'], {(float,): _f_1})
+    assert_equal(f(2.0), 'float')
+    assert_equal(calls, ['_f_1', '_f_1'])
+
+@unit
+def test_gen_dispatcher_duck_typed_not_memoized():
+    name_mangled = {('f', ('x', ('vector', 'int32'))): '_f_0',
+                    ('f', ('x', ('vector', 'float64'))): '_f_1'}
+    def _f_0(x):
+        if not all(isinstance(a, int) for a in x):
+            raise TypeError('not all ints')
+        return 'int'
+    def _f_1(x):
+        return 'float'
+    lines = cg._gen_dispatcher('f', name_mangled, ts, is_method=False)
+    src = '\n'.join(lines)
+    duck = src[src.index('# duck-typed dispatch'):]
+    assert_false('_dispatch_f[' in duck)
+    ns = _exec_dispatcher(lines, _f_0=_f_0, _f_1=_f_1)
+    f = ns['f']
+    # lists of ints and lists of floats have the same type, but not overload
+    assert_equal(f([1, 2]), 'int')
+    assert_equal(f([1.5, 2.5]), 'float')
+    assert_equal(f([1, 2]), 'int')
+    assert_equal(ns['_dispatch_f'], {})
+
+_fp = ('function_pointer', (('x', 'int32'),), 'float64')
+
+@unit
+def test_nogil_flags():
+    sigs = {('f', ('x', 'int32')): {'return': 'float64', 'defaults': ((Arg.NONE, None),)},
+            ('f', ('cb', _fp)): {'return': 'float64', 'defaults': ((Arg.NONE, None),)},
+            ('g', ('cb', _fp)): {'return': 'float64', 'defaults': ((Arg.NONE, None),),
+                                 'nogil': True},
+            ('h', ('x', 'int32')): {'return': 'float64', 'defaults': ((Arg.NONE, None),),
+                                    'nogil': False},}
+    desc = {'extra': {}}
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter('always')
+        obs = cg._nogil_flags(desc, sigs.items(), nogil=True, ts=ts)
+    # an inherited default keeps the GIL for signatures that need it
+    exp = {('f', ('x', 'int32')): True, ('f', ('cb', _fp)): False,
+           ('g', ('cb', _fp)): True, ('h', ('x', 'int32')): False}
+    assert_equal(dict([(k, obs[k]) for k in exp]), exp)
+    assert_equal(len(w), 1)
+    assert_true(issubclass(w[0].category, RuntimeWarning))
+    obs = cg._nogil_flags({'extra': {'nogil': False}}, sigs.items(), nogil=True,
+                          ts=ts)
+    assert_equal(obs[('f', ('x', 'int32'))], False)
+    assert_equal(obs[('g', ('cb', _fp))], True)
+
+@unit
+def test_gen_function_nogil():
+    args = (('s', 'str'), ('n', 'int32'), ('v', ('vector', 'float64', 0)))
+    defaults = ((Arg.NONE, None),) * 3
+    lines = cg._gen_function('f', 'f', args, 'float64', defaults, ts,
+                             inst_name='cpp_mod', nogil=True)
+    src = '\n'.join(lines)
+    assert_true('    with nogil:' in lines)
+    i = lines.index('    with nogil:')
+    block = []
+    for line in lines[i+1:]:
+        if not line.startswith(' ' * 8):
+            break
+        block.append(line)
+    assert_equal(len(block), 1)
+    # only C variables, and no Python objects, are used without the GIL
+    cdefs = set(cg._cdef_names.findall(src))
+    names = set(re.findall(r'(?<![\w.])[A-Za-z_]\w*', block[0])) - set(['cpp_mod'])
+    assert_true(0 < len(names))
+    assert_true(names <= cdefs, names - cdefs)
+    for pyname in ('s', 'n', 'v', 's_bytes', 'v_view'):
+        assert_false(pyname in names)
+
+@unit
+def test_gen_function_nogil_requires_gil():
+    args = (('cb', _fp),)
+    defaults = ((Arg.NONE, None),)
+    assert_raises(TypeError, cg._gen_function, 'f', 'f', args, 'float64',
+                  defaults, ts, inst_name='cpp_mod', nogil=True)
+
+_ptr = ('float64', '*')
+_cptr = (('float64', 'const'), '*')
+
+@unit
+def test_array_args_auto():
+    args = (('x', _ptr), ('n', 'int32'), ('y', _ptr), ('flag', 'int32'),
+            ('z', _cptr), ('z_size', 'uint64'), ('s', ('str', '*')), ('len', 'int32'))
+    assert_equal(cg._array_args('f', args, {}, ts), {})
+    obs = cg._array_args('f', args, {}, ts, array_args=True)
+    assert_equal(obs, {'x': 'n', 'z': 'z_size'})
+
+@unit
+def test_array_args_explicit():
+    args = (('x', _ptr), ('y', _cptr), ('count', 'int64'), ('w', 'float64'))
+    val = {'arrays': {'x': 'count', 'y': 'count'}}
+    exp = {'x': 'count', 'y': 'count'}
+    assert_equal(cg._array_args('f', args, val, ts), exp)
+    assert_equal(cg._array_args('f', args, val, ts, array_args=True), exp)
+    for arrays in ({'q': 'count'}, {'w': 'count'}, {'x': 'q'}, {'x': 'w'}):
+        assert_raises(ValueError, cg._array_args, 'f', args,
+                      {'arrays': arrays}, ts)
+
+@unit
+def test_array_pyargs():
+    args = (('x', _ptr), ('n', 'int32'), ('y', 'float64'))
+    defaults = ((Arg.NONE, None), (Arg.NONE, None), (Arg.LIT, 1.0))
+    obs = cg._array_pyargs(args, defaults, {'x': 'n'})
+    assert_equal(obs, ((('x', _ptr), ('y', 'float64')),
+                       ((Arg.NONE, None), (Arg.LIT, 1.0))))
+    assert_equal(cg._array_pyargs(args, defaults, {}), (args, defaults))
+
+@unit
+def test_gen_function_arrays():
+    args = (('x', _ptr), ('y', _cptr), ('n', 'int32'))
+    defaults = ((Arg.NONE, None),) * 3
+    arrays = {'x': 'n', 'y': 'n'}
+    lines = cg._gen_function('f', 'f', args, 'float64', defaults, ts,
+                             inst_name='cpp_mod', arrays=arrays)
+    src = '\n'.join(lines)
+    # lengths come from the arrays rather than from the caller
+    assert_equal(lines[0], 'def f(x, y):')
+    assert_true('cdef double[::1] x_view' in src)
+    assert_true('cdef const double[::1] y_view' in src)
+    assert_true('cdef const double * y_ptr = NULL' in src)
+    # the shared length is taken from the first array and checked against the rest
+    assert_equal(src.count('cdef Py_ssize_t n_len'), 1)
+    assert_true('n_len = (0 if x_view is None else x_view.shape[0])' in src)
+    assert_true('if (0 if y_view is None else y_view.shape[0]) != n_len:' in src)
+    assert_true("raise ValueError('f() arrays x and y must have the same length')"
+                in src)
+    # lengths that do not fit into the C type are not silently truncated
+    assert_true('if <Py_ssize_t> (<int> n_len) != n_len:' in src)
+    assert_true('raise OverflowError(' in src)
+    assert_true('rtnval = cpp_mod.f(x_ptr, y_ptr, <int> n_len)' in src)
+
+@unit
+def test_gen_function_nogil_references():
+    rts = TypeSystem()
+    rts.register_classname('Foo', 'mypack', 'pxd_foo', 'cpp_foo')
+    defaults = ((Arg.NONE, None),)
+    # wrapped classes are passed by reference to their own instance
+    for t in [('Foo', '&'), (('Foo', 'const'), '&')]:
+        lines = cg._gen_function('f', 'f', (('a', t),), 'float64', defaults, rts,
+                                 inst_name='cpp_mod', nogil=True)
+        src = '\n'.join(lines)
+        assert_false('a_nogil' in src)
+        assert_true('rtnval = cpp_mod.f((<cpp_foo.Foo *> a_proxy._inst)[0])' in src)
+    # const references may refer to a C temporary
+    lines = cg._gen_function('f', 'f', (('a', (('str', 'const'), '&')),),
+                             'float64', defaults, rts, inst_name='cpp_mod',
+                             nogil=True)
+    src = '\n'.join(lines)
+    assert_true('cdef std_string a_nogil' in src)
+    assert_true('rtnval = cpp_mod.f(a_nogil)' in src)
+    # non-const references which would be copied keep the GIL
+    key = ('f', ('a', ('str', '&')))
+    assert_raises(TypeError, cg._gen_function, 'f', 'f', key[1:], 'float64',
+                  defaults, rts, inst_name='cpp_mod', nogil=True)
+    val = {'return': 'float64', 'defaults': defaults}
+    with warnings.catch_warnings(record=True) as w:
+        warnings.simplefilter('always')
+        assert_false(cg._nogil_flag(key, val, True, rts))
+    assert_equal(len(w), 1)
+    assert_true(cg._nogil_flag(key, dict(val, nogil=True), False, rts))
+
+@unit
+def test_nogil_needs_temp():
+    # guards the guesses that _nogil_needs_temp() makes about the templates
+    rts = TypeSystem()
+    rts.register_classname('Foo', 'mypack', 'pxd_foo', 'cpp_foo')
+    for t in ['str', 'int32', 'float64', (('str', 'const'), '&')]:
+        assert_true(cg._nogil_needs_temp('a', t, rts), t)
+    for t in [('vector', 'float64', 0), ('vector', 'float64', '&'), 'Foo',
+              ('Foo', '&'), ('Foo', '*')]:
+        assert_false(cg._nogil_needs_temp('a', t, rts), t)
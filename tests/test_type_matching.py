@@ -1,6 +1,7 @@
 from nose.tools import assert_equal
 
-from xdress.types.matching import TypeMatcher, MatchAny, matches
+from xdress.types.matching import TypeMatcher, TypeMatcherIndex, MatchAny, \
+    matches
 
 from tools import unit
 
@@ -39,3 +40,35 @@ def check_matches(pattern, t, exp):
 def test_matches():
     for pattern, t, exp in type_matcher_cases:
         yield check_matches, pattern, t, exp
+
+
+def check_typematcherindex(pattern, t, exp):
+    tmi = TypeMatcherIndex([pattern])
+    obs = 0 < len(tmi.matches(t))
+    assert_equal(exp, obs)
+
+
+@unit
+def test_typematcherindex():
+    for pattern, t, exp in type_matcher_cases:
+        yield check_typematcherindex, pattern, t, exp
+
+
+@unit
+def test_typematcherindex_order():
+    tmi = TypeMatcherIndex()
+    tmi.add(('vector', MatchAny, 0), 'anyvec')
+    tmi.add('int32', 'int')
+    tmi.add(('vector', 'float64', 0), 'dblvec')
+    tmi.add(MatchAny, 'any')
+    assert_equal(4, len(tmi))
+    assert_equal(['anyvec', 'dblvec', 'any'],
+                 tmi.matches(('vector', 'float64', 0)))
+    assert_equal('int', tmi.first('int32'))
+    assert_equal('any', tmi.first(('set', 'int32', 0)))
+    tmi.remove(('vector', MatchAny, 0))
+    tmi.remove(MatchAny)
+    assert_equal('dblvec', tmi.first(('vector', 'float64', 0)))
+    assert_equal(None, tmi.first(('vector', 'int32', 0)))
+    assert_equal(True, tmi.flatmatches(('vector', 'int32', 0)))
+    assert_equal(False, tmi.flatmatches(('vector', 'char', 0)))
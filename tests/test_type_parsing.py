@@ -0,0 +1,71 @@
+from nose.tools import assert_equal, assert_raises
+
+from xdress.types.parsing import parse_type, tokenize_type
+
+from tools import unit
+
+
+def check_tokenize_type(s, exp):
+    obs = tokenize_type(s)
+    assert_equal(exp, obs)
+
+
+@unit
+def test_tokenize_type():
+    cases = [
+        ['int', ['int']],
+        ['unsigned long int', ['unsigned', 'long', 'int']],
+        ['std::vector<double>', ['std::vector', '<', 'double', '>']],
+        ['const char * &', ['const', 'char', '*', '&']],
+        ['int[10]', ['int', '[', 10, ']']],
+        ]
+    for s, exp in cases:
+        yield check_tokenize_type, s, exp
+
+
+def check_parse_type(s, exp):
+    obs = parse_type(s)
+    assert_equal(exp, obs)
+
+
+@unit
+def test_parse_type():
+    cases = [
+        ['int', 'int32'],
+        ['long long int', 'int64'],
+        ['long unsigned int', 'uint32'],
+        ['double', 'float64'],
+        ['std::string', 'str'],
+        ['const char *', (('char', 'const'), '*')],
+        ['double const &', (('float64', 'const'), '&')],
+        ['int[10]', ('int32', 10)],
+        ['std::vector<double, std::allocator<double> >', ('vector', 'float64', 0)],
+        ['std::map<int, std::vector<double> >', 
+            ('map', 'int32', ('vector', 'float64', 0), 0)],
+        ['vector<vector<int>>', ('vector', ('vector', 'int32', 0), 0)],
+        ['Foo<3, true>', ('Foo', 3, True, 0)],
+        ['::ns::Bar *', ('Bar', '*')],
+        ]
+    for s, exp in cases:
+        yield check_parse_type, s, exp
+
+
+@unit
+def test_parse_type_errors():
+    for s in ['', 'int <', 'std::map<int', 'x y', 'long float']:
+        yield assert_raises, TypeError, parse_type, s
+
+
+@unit
+def test_parse_type_cache():
+    maxsize = parse_type.maxsize
+    parse_type.maxsize = 2
+    try:
+        parse_type.cache.clear()
+        parse_type('int')
+        parse_type('double')
+        parse_type('int')
+        parse_type('float')
+        assert_equal(['int', 'float'], list(parse_type.cache.keys()))
+    finally:
+        parse_type.maxsize = maxsize
@@ -2,11 +2,15 @@ from __future__ import print_function
 import pprint
 import os
 import sys
+import pickle
 
 from xdress.types.system import TypeSystem
+from xdress.types.canonical import CanonType
+from xdress.types.matching import TypeMatcher, MatchAny
 from xdress.utils import Arg
 
-from nose.tools import assert_equal, with_setup
+from nose.tools import assert_equal, assert_true, assert_false, assert_raises, \
+    with_setup
 from tools import unit
 
 if sys.version_info[0] > 2:
@@ -92,6 +96,10 @@ def test_canon():
             (('void', '*'), ('function_pointer', ('arguments', ('list', 
                 ('pair', 'str', 'type', 0), 0), (('_0', ('uint32', '*')),)), 
                 ('returns', 'type', 'int')))),
+        ('unsigned int', 'uint32'),
+        ('const char *', (('char', 'const'), '*')),
+        ('std::map<int, std::vector<double> >', 
+            ('map', 'int32', ('vector', 'float64', 0), 0)),
     )
     for t, exp in cases:
         yield check_canon, t, exp            # Check that the case works,
@@ -297,6 +305,21 @@ def test_cython_cimport_lines():
     for t, exp in cases:
         yield check_cython_cimport_lines, t, exp  # Check that the case works,
 
+@unit
+def test_cython_import_sets():
+    t = ('map', 'nucid', ('vector', 'float64', 0), 0)
+    cis = ts.cython_cimport_set(t)
+    assert_true(isinstance(cis, frozenset))
+    assert_true(cis is ts.cython_cimport_set(t))
+    assert_equal(ts.cython_cimport_tuples(t), cis)
+    assert_equal(ts.cython_cimport_tuples(t, inc=['c']),
+                 ts.cython_cimport_set(t, frozenset(['c'])))
+    seen = set([('orly',)])
+    assert_true(ts.cython_cimport_tuples(t, seen) is seen)
+    assert_equal(cis | set([('orly',)]), seen)
+    assert_true(ts.cython_import_set(t) is ts.cython_import_set(t))
+    assert_equal(ts.cython_import_tuples(t), ts.cython_import_set(t))
+
 def check_cython_import_tuples(t, exp):
     obs = ts.cython_import_tuples(t)
     assert_equal(exp, obs)
@@ -465,6 +488,48 @@ def test_cython_c2py():
     for (name, t, inst_name), exp in cases:
         yield check_cython_c2py, name, t, inst_name, exp  # Check that the case works,
 
+@unit
+def test_cython_c2py_move():
+    vec = ('vector', 'float64', 0)
+    decl, body, rtn, iscached = ts.cython_c2py('x', vec, view=False, cached=False,
+                                               move=True)
+    assert_true('x_proxy_vec.swap(x)' in body)
+    assert_true('np.set_array_base(x_proxy, x_proxy_base)' in body)
+    assert_false('PyArray_Copy' in body)
+    # empty vectors are never indexed
+    assert_true(body.index('if 0 == x_proxy_shape[0]:') < body.index('x_proxy_vec[0]'))
+    assert_true('cdef xdress_extra_types.HeapCapsule[cpp_vector[double]] '
+                'x_proxy_keeper' in decl)
+    assert_equal(rtn, 'x_proxy')
+    # types without a move conversion are copied
+    boolvec = ('vector', 'bool', 0)
+    assert_equal(ts.cython_c2py('x', boolvec, view=False, cached=False, move=True),
+                 ts.cython_c2py('x', boolvec, view=False, cached=False))
+    assert_equal(ts.cython_c2py('x', 'float64', view=False, cached=False, move=True),
+                 (None, None, 'float(x)', False))
+    assert_raises(ValueError, ts.cython_c2py, 'x', vec, cached=False, move=True)
+
+
+@unit
+def test_cython_py2c_vector_bulk():
+    for t in [('vector', 'float64', 0), (('vector', 'int32', 0), '&'),
+              ((('vector', 'float64', 0), 'const'), '&')]:
+        decl, body, rtn = ts.cython_py2c('x', t)
+        assert_true('memcpy(&x_proxy[0], &x_view[0]' in body)
+        assert_true('[::1] x_view = None' in decl)
+        assert_equal(rtn, 'x_proxy')
+    # vector<bool> has no contiguous storage and strings are not plain old data
+    for t in [('vector', 'bool', 0), ('vector', 'str', 0)]:
+        decl, body, rtn = ts.cython_py2c('x', t)
+        assert_false('memcpy' in body)
+    # only native byte order arrays are copied straight from their data
+    decl, body, rtn = ts.cython_py2c('x', ('vector', 'float64', 0))
+    assert_true('np.PyArray_ISNOTSWAPPED(<np.ndarray> x)' in body)
+    # references to vectors of other types are built without the reference
+    for t in [('vector', 'str', '&'), ('vector', 'bool', '&')]:
+        decl, body, rtn = ts.cython_py2c('x', t)
+        assert_false('&' in decl)
+        assert_false('] &(' in body)
 
 def check_cython_py2c(name, t, inst_name, exp):
     obs = ts.cython_py2c(name, t, inst_name=inst_name)
@@ -639,3 +704,127 @@ def test_io():
     hoover.extra_types = "excellent"
     hoover.dump(filename, format='pkl.gz')
     hoover = TypeSystem.load(filename, format='pkl.gz')
+
+@unit
+@with_setup(lambda: None, lambda: os.remove('hoover.tss'))
+def test_io_snapshot():
+    filename = 'hoover.tss'
+    hoover = TypeSystem()
+    hoover.register_class('Hoover', cython_c_type='cpp_hoover.Hoover',
+                          cython_cy_type='hoover.Hoover', cython_py_type='Hoover')
+    hoover.dump(filename)
+    hoover = TypeSystem.load(filename)
+    assert_equal(hoover.cython_ctype('Hoover'), 'cpp_hoover.Hoover')
+    t = ('map', 'str', ('vector', 'int32', 0), 0)
+    assert_equal(hoover.cython_c2py('x', t), ts.cython_c2py('x', t))
+    assert_false('Hoover' in ts.base_types)
+
+@unit
+def test_shared_defaults():
+    x = TypeSystem()
+    y = TypeSystem()
+    assert_true(x.cython_c2py_conv._tms is y.cython_c2py_conv._tms)
+    x.cython_c2py_conv[TypeMatcher(('hoover', MatchAny))] = ('{var}', False)
+    assert_false(x.cython_c2py_conv._tms is y.cython_c2py_conv._tms)
+    assert_true(('hoover', 'int32') in x.cython_c2py_conv)
+    assert_false(('hoover', 'int32') in y.cython_c2py_conv)
+    x.from_pytypes['str'].append('bytes')
+    assert_equal(['basestring'], y.from_pytypes['str'])
+
+def _ismemoized(x, meth, *args):
+    return args in x._cache.get(meth, {})
+
+@unit
+def test_selective_invalidation():
+    x = TypeSystem()
+    assert_equal(x.cython_ctype('int32'), 'int')
+    assert_equal(x.cython_cytype(('set', 'int32')), 'stlcontainers._SetInt')
+    assert_true(_ismemoized(x, 'cython_ctype', 'int32'))
+    # registering a class only invalidates what depends on its name
+    assert_true(x.isdependent('Joan') is False)
+    x.register_class('Joan', cython_c_type='cpp_joan.Joan',
+                      cython_cy_type='joan.Joan', cython_py_type='Joan')
+    assert_false(_ismemoized(x, 'isdependent', 'Joan'))
+    assert_true(_ismemoized(x, 'cython_ctype', 'int32'))
+    assert_equal(x.cython_ctype('Joan'), 'cpp_joan.Joan')
+    with x.local_classes(['Joan'], frozenset(['c'])):
+        assert_equal(x.cython_ctype('Joan'), 'Joan')
+        assert_true(_ismemoized(x, 'cython_ctype', 'int32'))
+    assert_equal(x.cython_ctype('Joan'), 'cpp_joan.Joan')
+    # module swaps only invalidate the results which refer to that module
+    with x.swap_stlcontainers(None):
+        assert_true(_ismemoized(x, 'cython_ctype', 'int32'))
+        assert_false(_ismemoized(x, 'cython_cytype', ('set', 'int32')))
+        assert_equal(x.cython_cytype(('set', 'int32')), '_SetInt')
+    assert_equal(x.cython_cytype(('set', 'int32')), 'stlcontainers._SetInt')
+    x.deregister_class('Joan')
+    assert_true(_ismemoized(x, 'cython_ctype', 'int32'))
+    assert_false(_ismemoized(x, 'cython_ctype', 'Joan'))
+
+@unit
+def test_lazy_resolved():
+    x = TypeSystem()
+    v = x.cython_cytypes['set']
+    assert_true(v is x.cython_cytypes['set'])
+    assert_true(x.cython_cimports['set'] is x.cython_cimports['set'])
+    assert_true(x.cython_py2c_conv['set'] is x.cython_py2c_conv['set'])
+    x.stlcontainers = 'mystl'
+    assert_equal('mystl._Set{value_type}', x.cython_cytypes['set'])
+    x.stlcontainers = 'stlcontainers'
+    assert_equal(v, x.cython_cytypes['set'])
+    x.cython_cytypes['set'] = 'Set'
+    assert_equal('Set', x.cython_cytypes['set'])
+
+@unit
+def test_freeze_overlay():
+    x = TypeSystem()
+    x.register_class('Joan', cython_c_type='cpp_joan.Joan',
+                     cython_cy_type='joan.Joan', cython_py_type='Joan')
+    assert_equal(x.cython_ctype('int32'), 'int')
+    assert_equal(x.cython_cytype('Joan'), 'joan.Joan')
+    f = x.freeze()
+    assert_true(f.frozen)
+    assert_true(f.freeze() is f)
+    assert_true(_ismemoized(f, 'cython_ctype', 'int32'))
+    assert_raises(TypeError, f.register_class, 'Joe')
+    x.deregister_class('Joan')
+    assert_equal(f.cython_cytype('Joan'), 'joan.Joan')
+    o = f.overlay(['Joan'], stlcontainers=None)
+    assert_true(o.frozen)
+    assert_true(_ismemoized(o, 'cython_ctype', 'int32'))
+    assert_false(_ismemoized(o, 'cython_cytype', 'Joan'))
+    assert_equal(o.cython_cytype('Joan'), 'Joan')
+    assert_equal(o.cython_cytype(('set', 'int32')), '_SetInt')
+    assert_equal(f.cython_cytype('Joan'), 'joan.Joan')
+    assert_equal(f.cython_cytype(('set', 'int32')), 'stlcontainers._SetInt')
+    with f.localized(['Joan']) as lts:
+        assert_equal(lts.cython_pytype('Joan'), 'Joan')
+    with x.localized(stlcontainers=None) as lts:
+        assert_true(lts is x)
+        assert_equal(x.cython_cytype(('set', 'int32')), '_SetInt')
+    assert_equal(x.cython_cytype(('set', 'int32')), 'stlcontainers._SetInt')
+
+@unit
+def test_canon_interned():
+    t = ts.canon(('set', 'float64', 0))
+    assert_true(isinstance(t, CanonType))
+    assert_true(t is ts.canon(('set', 'float64', 0)))
+    assert_true(t is CanonType(('set', 'float64', 0)))
+    assert_equal(t, ('set', 'float64', 0))
+    assert_equal(('set', 'float64', 0), t)
+    assert_equal(hash(t), hash(('set', 'float64', 0)))
+    assert_equal({('set', 'float64', 0): 42}[t], 42)
+    assert_equal(t[1:], ('float64', 0))
+    assert_equal(repr(t), "('set', 'float64', 0)")
+    u = CanonType((('vector', 'int32', 0), '&'))
+    assert_true(isinstance(u[0], CanonType))
+    assert_true(u != t)
+    assert_true(CanonType(('x', 1)) is not CanonType(('x', True)))
+    assert_true(pickle.loads(pickle.dumps(u)) is u)
+    # a twin that escaped interning, eg from racing threads, is still equal
+    twin = object.__new__(CanonType)
+    twin._t, twin._hash = t._t, t._hash
+    assert_true(twin is not t)
+    assert_equal(twin, t)
+    assert_false(twin != t)
+    assert_equal({t: 42}[twin], 42)
@@ -1,11 +1,13 @@
 from __future__ import print_function
 import os
+import threading
 
 import numpy as np
 
 from xdress.utils import NotSpecified, RunControl, flatten, split_template_args, \
     ishashable, memoize, memoize_method, apiname, ensure_apiname, sortedbytype, \
-    c_literal, touch
+    c_literal, touch, DescriptionCache, FileFingerprints, MemoDependencies, \
+    PersistentCache
 
 from nose.tools import assert_equal, with_setup, assert_true, assert_false, \
     assert_not_equal
@@ -114,6 +116,11 @@ def test_memoize_method():
             self.v += arg
             return self.v
 
+        @memoize_method
+        def total(self, args):
+            self.call_count += 1
+            return sum(args)
+
     j = Joan()
     assert_equal(j.inc(2), 2)
     assert_equal(j.inc(2), j.inc(2))
@@ -121,6 +128,33 @@ def test_memoize_method():
     assert_not_equal(Joan.inc(j, 2), Joan.inc(j, 2))
     assert_equal(j.inc.__name__, "inc")
     assert_equal(j.inc.__doc__, "I am inc's docstr")
+    assert_true(j.inc is j.inc)
+    assert_equal(j.inc(arg=2), j.inc(arg=2))
+    assert_equal(j.call_count, 4)
+    # unhashable arguments are not memoized
+    assert_equal(j.total([1, 2]), j.total([1, 2]))
+    assert_equal(j.call_count, 6)
+
+@unit
+def test_memo_dependencies_threads():
+    deps = MemoDependencies()
+    deps.push()
+    deps.consult('Joan')
+    seen = []
+    def compute():
+        # results being computed in other threads are not this thread's
+        seen.append(deps.active())
+        deps.push()
+        deps.consult('Phone')
+        deps.pop(('f', ('x',)), ('x',))
+    t = threading.Thread(target=compute)
+    t.start()
+    t.join()
+    assert_equal(seen, [False])
+    deps.pop(('g', ('y',)), ('y',))
+    assert_false(deps.active())
+    assert_equal(deps._deps[('f', ('x',))], frozenset(['Phone', 'x', ('x',)]))
+    assert_equal(deps._deps[('g', ('y',))], frozenset(['Joan', 'y', ('y',)]))
 
 def check_ensure_apiname(x, exp):
     obs = ensure_apiname(x)
@@ -197,3 +231,115 @@ def test_literal():
         }
     for s, x in cases.items():
         yield check_literal, s, x
+
+@unit
+def test_description_cache():
+    if not os.path.isdir('build'):
+        os.mkdir('build')
+    cachefile = os.path.join('build', 'test-desc.cache')
+    if os.path.exists(cachefile):
+        os.remove(cachefile)
+    srcfile = os.path.join('build', 'test-desc-cache.h')
+    touch(srcfile)
+    name = apiname('Joan', (srcfile,), 'joan', 'Joan', None, (), 'c++')
+    cache = DescriptionCache(cachefile=cachefile)
+    assert_false(cache.isvalid(name, 'class'))
+    cache[name, 'class'] = {'name': 'Joan'}
+    assert_true(cache.isvalid(name, 'class'))
+    assert_false(os.path.exists(cachefile))
+    cache.dump()
+    # entries are only read from disk when they are asked for
+    cache = DescriptionCache(cachefile=cachefile)
+    assert_equal(cache._entries, {})
+    assert_true(cache.isvalid(name, 'class'))
+    assert_equal(cache[name, 'class'], {'name': 'Joan'})
+    assert_equal(len(cache._dirty), 0)
+    cache[name, 'class'] = {'name': 'Joan'}
+    assert_equal(len(cache._dirty), 0)
+    with open(srcfile, 'a') as f:
+        f.write('int x;\n')
+    assert_false(cache.isvalid(name, 'class'))
+    del cache[name, 'class']
+    cache.dump()
+    cache = DescriptionCache(cachefile=cachefile)
+    assert_false(cache.isvalid(name, 'class'))
+    assert_equal(cache.cache, {})
+    os.remove(cachefile)
+    os.remove(srcfile)
+
+@unit
+def test_description_cache_deps():
+    if not os.path.isdir('build'):
+        os.mkdir('build')
+    cachefile = os.path.join('build', 'test-desc-deps.cache')
+    if os.path.exists(cachefile):
+        os.remove(cachefile)
+    srcfile = os.path.join('build', 'test-desc-deps.h')
+    depfile = os.path.join('build', 'test-desc-deps-inc.h')
+    touch(srcfile)
+    touch(depfile)
+    name = apiname('Joan', (srcfile,), 'joan', 'Joan', None, (), 'c++')
+    other = apiname('Jane', (srcfile,), 'jane', 'Jane', None, (), 'c++')
+    cache = DescriptionCache(cachefile=cachefile)
+    cache.set((name, 'class'), {'name': 'Joan'}, deps=(srcfile, depfile))
+    cache[other, 'class'] = {'name': 'Jane'}
+    cache.dump()
+    cache = DescriptionCache(cachefile=cachefile)
+    assert_true(cache.isvalid(name, 'class'))
+    assert_true(cache.isvalid(other, 'class'))
+    # only the entry which includes the changed file is invalidated
+    with open(depfile, 'a') as f:
+        f.write('int x;\n')
+    assert_false(cache.isvalid(name, 'class'))
+    assert_true(cache.isvalid(other, 'class'))
+    os.remove(cachefile)
+    os.remove(srcfile)
+    os.remove(depfile)
+
+@unit
+def test_persistent_cache_close():
+    if not os.path.isdir('build'):
+        os.mkdir('build')
+    cachefile = os.path.join('build', 'test-persistent.cache')
+    if os.path.exists(cachefile):
+        os.remove(cachefile)
+    # entries without source files are always valid
+    with PersistentCache(cachefile) as cache:
+        assert_false(cache.isvalid('joan'))
+        cache['joan'] = 42
+        assert_true(cache.isvalid('joan'))
+    assert_true(cache._db is None)
+    # closing writes the entries out
+    with PersistentCache(cachefile) as cache:
+        assert_equal(cache['joan'], 42)
+        assert_true(cache._db is not None)
+    assert_true(cache._db is None)
+    cache.close()
+    os.remove(cachefile)
+
+@unit
+def test_file_fingerprints():
+    if not os.path.isdir('build'):
+        os.mkdir('build')
+    filename = os.path.join('build', 'test-fingerprints.h')
+    with open(filename, 'w') as f:
+        f.write('int x;\n')
+    fps = FileFingerprints()
+    fp = fps.fingerprint(filename)
+    assert_equal(fp, fps.fingerprint(filename))
+    assert_equal(len(fps._hashes), 1)
+    assert_true(fps.matches(filename, fp))
+    # same stat, no hashing needed
+    fps.clear()
+    assert_true(fps.matches(filename, fp))
+    assert_equal(len(fps._hashes), 0)
+    # changed stat, same contents
+    stat, h = fp
+    assert_true(fps.matches(filename, ((filename, 0, 0, 0), h)))
+    assert_equal(len(fps._hashes), 1)
+    with open(filename, 'a') as f:
+        f.write('int y;\n')
+    assert_false(fps.matches(filename, fp))
+    assert_false(fps.matches(filename + '.nope', fp))
+    assert_false(fps.matches(filename, 'd41d8cd98f00b204e9800998ecf8427e'))
+    os.remove(filename)
@@ -9,6 +9,7 @@ AST Parsers API
 from __future__ import print_function
 import os
 import io
+import re
 import sys
 from copy import deepcopy
 import linecache
@@ -19,6 +20,7 @@ import functools
 import collections
 from pprint import pprint, pformat
 from warnings import warn
+from hashlib import md5
 import gzip
 try:
     import cPickle as pickle
@@ -107,20 +109,150 @@ def _makekey(obj):
     else:
         return obj
 
+class ParserCache(object):
+    """A least-recently-used cache of parsed files that is shared by all of
+    the parsers.  Rather than holding a fixed number of entries, the cache is
+    bounded by an estimate of the memory that the parsed trees take up, see
+    estimate_ast_size().  When a new tree would put the cache over budget, the
+    trees which were used longest ago are evicted.  The most recent tree is
+    always kept, even if it alone is over budget.
+    """
+
+    def __init__(self, maxsize=None, verbose=False):
+        """Parameters
+        -------------
+        maxsize : int or None, optional
+            The memory budget in bytes, unbounded if None.
+        verbose : bool, optional
+            Flag for printing evictions as they happen.
+
+        """
+        self.maxsize = maxsize
+        self.verbose = verbose
+        self.size = 0
+        self.hits = self.misses = self.evictions = self.evicted = 0
+        self._entries = collections.OrderedDict()  # key -> (value, size)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def __getitem__(self, key):
+        value, size = self._entries.pop(key)
+        self._entries[key] = (value, size)  # mark as most recently used
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self._entries:
+            self.size -= self._entries.pop(key)[1]
+        size = estimate_ast_size(value)
+        self._entries[key] = (value, size)
+        self.size += size
+        self._evict()
+
+    def get(self, key, default=None):
+        """Returns the value for a key, and records the hit or miss."""
+        if key in self._entries:
+            self.hits += 1
+            return self[key]
+        self.misses += 1
+        return default
+
+    def _evict(self):
+        maxsize = self.maxsize
+        if maxsize is None:
+            return
+        entries = self._entries
+        while self.size > maxsize and len(entries) > 1:
+            key, (value, size) = entries.popitem(last=False)
+            self.size -= size
+            self.evictions += 1
+            self.evicted += size
+            _forget_ast(value)
+            if self.verbose:
+                print("parser cache: evicted {0} ({1:.1f} MB)".format(
+                      key[1] if len(key) > 1 else key, size / 2.0**20))
+
+    def clear(self):
+        """Removes all entries, the statistics are kept."""
+        for value, size in self._entries.values():
+            _forget_ast(value)
+        self._entries.clear()
+        self.size = 0
+
+    def stats(self):
+        """Returns a string summarizing the use of the cache."""
+        budget = 'unbounded' if self.maxsize is None else \
+                 '{0:.1f} MB'.format(self.maxsize / 2.0**20)
+        return ("parser cache: {0} hits, {1} misses, {2} evictions ({3:.1f} MB), "
+                "holding {4} trees ({5:.1f} MB of {6})").format(self.hits,
+                self.misses, self.evictions, self.evicted / 2.0**20, len(self),
+                self.size / 2.0**20, budget)
+
+parser_cache = ParserCache()
+"""The cache shared by all parsers."""
+
+_ETREE_ELEM_BYTES = 160
+_ETREE_ATTR_BYTES = 64
+_CLANG_BYTES_PER_SOURCE_BYTE = 8
+_PYCPARSER_NODE_BYTES = 320
+
+def estimate_ast_size(ast):
+    """Returns a rough estimate of the memory, in bytes, that a parsed tree takes
+    up.  GCC-XML etrees are measured by their elements and attributes, clang
+    translation units by the size of their source files, and pycparser ASTs by
+    their number of nodes.
+    """
+    if pycparser is not None and isinstance(ast, pycparser.c_ast.Node):
+        n = 0
+        stack = [ast]
+        while 0 < len(stack):
+            node = stack.pop()
+            n += 1
+            stack.extend([child for name, child in node.children()])
+        return n * _PYCPARSER_NODE_BYTES
+    if clang is not None and isinstance(ast, cindex.TranslationUnit):
+        size = 0
+        for filename in set([ast.spelling] + _clang_includes(ast)):
+            try:
+                size += os.path.getsize(filename)
+            except OSError:
+                pass
+        return size * _CLANG_BYTES_PER_SOURCE_BYTE
+    if hasattr(ast, 'iter'):
+        size = 0
+        for elem in ast.iter():
+            attrib = elem.attrib
+            size += _ETREE_ELEM_BYTES + _ETREE_ATTR_BYTES * len(attrib)
+            size += sum([len(v) for v in attrib.values()])
+        return size
+    return sys.getsizeof(ast)
+
+def _forget_ast(ast):
+    """Drops the indexes and memos built on a parsed tree, see gccxml_index(),
+    clang_symbols(), and clang_type_memo()."""
+    key = id(ast)
+    for cache in (gccxml_index.cache, clang_symbols.cache, clang_type_memo.cache):
+        idx = cache.get(key, None)
+        if idx is not None and (getattr(idx, 'root', None) is ast or
+                                getattr(idx, 'tu', None) is ast):
+            del cache[key]
+
 def _memoize_parser(f):
     # based off code from http://wiki.python.org/moin/PythonDecoratorLibrary
-    cache = f.cache = {}
+    cache = f.cache = parser_cache
+    name = f.__name__
     @functools.wraps(f)
     def memoizer(*args, **kwargs):
-        key = _makekey(args) + _makekey(kwargs)
-        if key in cache:
-            value = cache[key]
-        else:
-            value = f(*args, **kwargs)
-            try:
-                cache[key] = value
-            except TypeError:
-                pass
+        key = (name,) + _makekey(args) + _makekey(kwargs)
+        try:
+            value = cache.get(key, NotSpecified)
+        except TypeError:
+            return f(*args, **kwargs)
+        if value is NotSpecified:
+            value = cache[key] = f(*args, **kwargs)
         return value
     return memoizer
 
@@ -143,6 +275,60 @@ def not_implemented(obj):
         raise NotImplementedError(msg)
     return func
 
+#
+# Include closures
+#
+
+def include_closure(filename):
+    """Returns the files which were included, directly or indirectly, by the
+    most recent parse of a file in this process.  This is None if the file has
+    not been parsed since the memoizations were last cleared.
+
+    Parameters
+    ----------
+    filename : str
+        The path to the file that was parsed.
+
+    Returns
+    -------
+    closure : tuple of str or None
+        The sorted paths to the included files, not including filename itself.
+    """
+    return include_closure.cache.get(filename, None)
+
+include_closure.cache = {}
+
+def _record_include_closure(filename, files):
+    """Records the include closure of a file that was just parsed and returns
+    it, see include_closure()."""
+    closure = set([f for f in files if f and f != filename and os.path.isfile(f)])
+    closure = tuple(sorted(closure))
+    include_closure.cache[filename] = closure
+    return closure
+
+def _load_deps(depsfile):
+    """Returns the files listed in a dependency file if none of them have
+    changed since it was written, and None otherwise."""
+    if not os.path.isfile(depsfile):
+        return None
+    try:
+        with io.open(depsfile, 'rb') as f:
+            deps = pickle.load(f)
+    except Exception:
+        return None
+    for dep, fp in deps.items():
+        if not utils.fingerprints.matches(dep, fp):
+            return None
+    return sorted(deps.keys())
+
+def _save_deps(depsfile, files):
+    """Writes a dependency file that holds the fingerprints of some files."""
+    deps = dict([(f, utils.fingerprints.fingerprint(f)) for f in files \
+                 if os.path.isfile(f)])
+    ensuredirs(depsfile)
+    with io.open(depsfile, 'wb') as f:
+        pickle.dump(deps, f, pickle.HIGHEST_PROTOCOL)
+
 #
 # GCC-XML Describers
 #
@@ -150,7 +336,7 @@ def not_implemented(obj):
 @_memoize_parser
 def gccxml_parse(filename, includes=(), defines=('XDRESS',), undefines=(),
                  extra_parser_args=(), verbose=False, debug=False, builddir='build',
-                 clang_includes=()):
+                 clang_includes=(), onlyin=None):
     """Use GCC-XML to parse a file. This function is automatically memoized.
 
     Parameters
@@ -172,6 +358,10 @@ def gccxml_parse(filename, includes=(), defines=('XDRESS',), undefines=(),
     builddir : str, optional
         Location of -- often temporary -- build files.
     clang_includes : ignored
+    onlyin : set of str, optional
+        If given, the GCC-XML output is streamed rather than loaded whole and
+        only the declarations in these files, along with everything that they
+        reference, are kept.  See gccxml_stream().
 
     Returns
     -------
@@ -191,22 +381,239 @@ def gccxml_parse(filename, includes=(), defines=('XDRESS',), undefines=(),
     cmd += extra_parser_args
     if verbose:
         print(" ".join(cmd))
-    if os.path.isfile(xmlname):
-        f = io.open(xmlname, 'r+b')
-    else:
+    depsfile = xmlname + '.deps'
+    fresh = not os.path.isfile(xmlname) or (os.path.isfile(depsfile) and
+                                            _load_deps(depsfile) is None)
+    if fresh:
         ensuredirs(xmlname)
         f = io.open(xmlname, 'w+b')
         subprocess.call(cmd)
+    else:
+        f = io.open(xmlname, 'r+b')
     f.seek(0)
     try:
-        root = etree.parse(f)
+        root = etree.parse(f) if onlyin is None else gccxml_stream(f, onlyin)
     except etree.XMLSyntaxError:
         raise etree.XMLSyntaxError("failed to parse GCC-XML results, this likely "
                                    "means that the C/C++ code is not valid. please "
                                    "see the top most build error.")
     f.close()
+    files = [filename] + [node.attrib.get('name', '') for node in root.iter('File')]
+    closure = _record_include_closure(filename, files)
+    if fresh:
+        _save_deps(depsfile, (filename,) + closure)
     return root
 
+_GCCXML_REF_ATTRS = ('type', 'returns', 'context', 'basetype', 'members', 'bases',
+                     'throw')
+_GCCXML_LITERAL_ENUM_NAMES = re.compile(r'\(\w+::(\w+)\)')
+
+def _gccxml_iterparse(f, keep):
+    """Incrementally parses a GCC-XML file, calling keep() on each top-level
+    element once it is complete.  Elements for which keep() returns True are
+    placed into a new root element, which is returned. All others are
+    discarded as soon as they have been seen.
+    """
+    root = newroot = None
+    depth = 0
+    for event, elem in etree.iterparse(f, events=('start', 'end')):
+        if event == 'start':
+            depth += 1
+            if root is None:
+                root = elem
+                newroot = etree.Element(elem.tag, dict(elem.attrib))
+            continue
+        depth -= 1
+        if depth != 1:
+            continue
+        if keep(elem):
+            newroot.append(elem)
+        else:
+            elem.clear()
+        root.clear()
+    return newroot
+
+def _gccxml_refs(elem):
+    """Returns the ids that a top-level GCC-XML element and its children refer
+    to.  Namespace members are not followed since they would pull in everything.
+    """
+    refs = []
+    isns = elem.tag == 'Namespace'
+    for node in elem.iter():
+        attrib = node.attrib
+        for key in _GCCXML_REF_ATTRS:
+            value = attrib.get(key, None)
+            if value is None or (isns and key == 'members'):
+                continue
+            refs.extend([ref.rsplit(':', 1)[-1] for ref in value.split()])
+    return tuple(refs)
+
+def _gccxml_template_names(elem):
+    """Returns the names of the template arguments of an element, which the
+    describers look up by name rather than by id."""
+    names = []
+    for key in ('name', 'demangled'):
+        value = elem.attrib.get(key, '')
+        if '<' not in value:
+            continue
+        for targ in utils.split_template_args(value):
+            names.append(targ)
+            names.extend(_GCCXML_LITERAL_ENUM_NAMES.findall(targ))
+    return tuple(names)
+
+def gccxml_stream(f, onlyin):
+    """Reads a GCC-XML file in two streaming passes, keeping only the File
+    elements, the declarations which live in the onlyin files, and the
+    transitive closure of the elements that these refer to.  Only this
+    subset is ever held in memory as a tree.
+
+    Parameters
+    ----------
+    f : str or file
+        The GCC-XML file or path.  File objects must be seekable.
+    onlyin : set of str
+        The paths to the files whose declarations should be kept.
+
+    Returns
+    -------
+    root : XML etree
+        An in memory tree of the kept elements.
+    """
+    onlyin = [onlyin] if isinstance(onlyin, basestring) else onlyin
+    # first pass, record the reference graph
+    refs = {}
+    byname = {}
+    byfile = {}
+    files = {}
+    def record(elem):
+        attrib = elem.attrib
+        id = attrib.get('id', None)
+        if elem.tag == 'File':
+            files[attrib['name']] = id
+            return False
+        if id is None:
+            return False
+        refs[id] = (_gccxml_refs(elem), _gccxml_template_names(elem))
+        name = attrib.get('name', None)
+        if name is not None:
+            byname.setdefault(name, []).append(id)
+        fid = attrib.get('file', None)
+        if fid is not None:
+            byfile.setdefault(fid, []).append(id)
+        return False
+    if hasattr(f, 'seek'):
+        f.seek(0)
+    _gccxml_iterparse(f, record)
+    # compute the closure
+    seeds = []
+    for fname in onlyin:
+        fid = files.get(fname, None)
+        if fid is None:
+            fid = files.get('./' + fname, None)
+        seeds.extend(byfile.get(fid, ()))
+    kept = set(seeds)
+    seen_names = set()
+    stack = list(seeds)
+    while 0 < len(stack):
+        elemrefs, tnames = refs.get(stack.pop(), ((), ()))
+        for tname in tnames:
+            if tname in seen_names:
+                continue
+            seen_names.add(tname)
+            elemrefs += tuple(byname.get(tname, ()))
+        for ref in elemrefs:
+            if ref not in kept:
+                kept.add(ref)
+                stack.append(ref)
+    del refs, byname, byfile
+    # second pass, keep only what is needed
+    if hasattr(f, 'seek'):
+        f.seek(0)
+    root = _gccxml_iterparse(f, lambda elem: elem.tag == 'File' or \
+                                             elem.attrib.get('id', None) in kept)
+    return etree.ElementTree(root)
+
+class GccxmlIndex(object):
+    """An index over a GCC-XML element tree which provides constant time
+    lookups of nodes by id, by name, and of the top-level nodes by tag and
+    name.  Build these with gccxml_index() so that they are shared by everyone
+    looking at the same tree.
+    """
+
+    def __init__(self, root):
+        """Parameters
+        -------------
+        root : XML etree or element
+            The GCC-XML tree to index.
+
+        """
+        self.root = root
+        top = root.getroot() if hasattr(root, 'getroot') else root
+        self.ids = ids = {}
+        self.names = names = {}
+        self.tags = tags = {}
+        self.tagnames = tagnames = {}
+        self.files = files = {}
+        for child in top:
+            attrib = child.attrib
+            tags.setdefault(child.tag, []).append(child)
+            name = attrib.get('name', None)
+            if name is None:
+                continue
+            tagnames.setdefault((child.tag, name), []).append(child)
+            if child.tag == 'File':
+                files[name] = child
+        for node in top.iter():
+            if node is top:
+                continue
+            attrib = node.attrib
+            id = attrib.get('id', None)
+            if id is not None:
+                ids[id] = node
+            name = attrib.get('name', None)
+            if name is not None and name not in names:
+                names[name] = node
+
+    def find_id(self, id):
+        """Returns the node with the given id or None."""
+        return self.ids.get(id, None)
+
+    def find_name(self, name):
+        """Returns the first node, in document order, with the given name or None."""
+        return self.names.get(name, None)
+
+    def find_file(self, name):
+        """Returns the top-level File node for a file name or None.  A './'
+        prefix is also tried for relative paths."""
+        node = self.files.get(name, None)
+        if node is None:
+            node = self.files.get('./' + name, None)
+        return node
+
+    def iterchildren(self, tag, name=None):
+        """Returns the top-level nodes with the given tag, and optionally the
+        given name, in document order."""
+        if name is None:
+            return self.tags.get(tag, ())
+        return self.tagnames.get((tag, name), ())
+
+    def find_child(self, tag, name):
+        """Returns the first top-level node with the given tag and name or None."""
+        nodes = self.tagnames.get((tag, name), ())
+        return nodes[0] if len(nodes) > 0 else None
+
+def gccxml_index(root):
+    """Returns the GccxmlIndex for a tree, building it only on the first
+    call for any given root.  This cache is cleared by clearmemo()."""
+    cache = gccxml_index.cache
+    key = id(root)
+    idx = cache.get(key, None)
+    if idx is None or idx.root is not root:
+        idx = cache[key] = GccxmlIndex(root)
+    return idx
+
+gccxml_index.cache = {}
+
 #
 # clang parser
 #
@@ -229,11 +636,14 @@ def clang_parse(filename, includes=(), defines=('XDRESS',), undefines=(),
     extra_parser_args : list of str, optional
         Further command line arguments to pass to the parser.
     verbose : bool, optional
-        Flag to display extra information while describing the class.  Ignored.
+        Flag to display extra information while describing the class.
     debug : bool, optional
         Flag to enable/disable debug mode.  Currently ignored.
     builddir : str, optional
-        Ignored.  Exists only for compatibility with gccxml_describe.
+        Location of -- often temporary -- build files.  Parsed translation units
+        are cached on disk here and reloaded by later runs as long as the file,
+        everything it includes, and the parser flags are unchanged.  If None,
+        the on-disk cache is not used.
     language : str
         Valid language flag.
     clang_includes : list of str, optional
@@ -243,14 +653,24 @@ def clang_parse(filename, includes=(), defines=('XDRESS',), undefines=(),
     -------
     tu : libclang TranslationUnit object
     """
-    index = cindex.Index.create()
-    options = cindex.TranslationUnit.PARSE_SKIP_FUNCTION_BODIES
-    tu = index.parse(filename, options=options,
-                     args=['-x', language]
-                        + ['-I' + i for i in tuple(clang_includes) + tuple(includes)]
-                        + ['-D' + d for d in defines]
-                        + ['-U' + u for u in undefines]
-                        + list(extra_parser_args))
+    index = clang_index()
+    options = cindex.TranslationUnit.PARSE_SKIP_FUNCTION_BODIES | \
+              cindex.TranslationUnit.PARSE_PRECOMPILED_PREAMBLE
+    args = ['-x', language] \
+           + ['-I' + i for i in tuple(clang_includes) + tuple(includes)] \
+           + ['-D' + d for d in defines] \
+           + ['-U' + u for u in undefines] \
+           + list(extra_parser_args)
+    astfile = None
+    if builddir is not None:
+        astfile = _clang_ast_filename(filename, args, options, builddir)
+        tu = _clang_load_ast(astfile, index)
+        if tu is not None:
+            if verbose:
+                print("loaded cached translation unit for {0}".format(filename))
+            _record_include_closure(filename, _clang_includes(tu))
+            return tu
+    tu = index.parse(filename, options=options, args=args)
     # Check for fatal errors
     failed = False
     for d in tu.diagnostics:
@@ -259,8 +679,186 @@ def clang_parse(filename, includes=(), defines=('XDRESS',), undefines=(),
             failed = True
     if failed:
         raise RuntimeError('failed to parse {0}'.format(filename))
+    _record_include_closure(filename, _clang_includes(tu))
+    if astfile is not None:
+        _clang_save_ast(tu, astfile, verbose=verbose)
     return tu
 
+_clang_index = [None, None]
+
+def clang_index():
+    """Returns the libclang Index that is shared by all parses in this process."""
+    pid = os.getpid()
+    if _clang_index[0] != pid:
+        # forked processes get their own index
+        _clang_index[:] = [pid, cindex.Index.create()]
+    return _clang_index[1]
+
+def _clang_ast_filename(filename, args, options, builddir):
+    """Returns the path to the cached translation unit for a file, which is
+    keyed by the file's contents and all of the parser flags."""
+    key = repr((os.path.abspath(filename), utils.fingerprints.hash(filename),
+                tuple(args), options))
+    key = md5(key.encode()).hexdigest()
+    return os.path.join(builddir, 'clang-ast', key + '.ast')
+
+def _clang_includes(tu):
+    """Returns the names of all files included by a translation unit."""
+    return [inc.include.name for inc in tu.get_includes()]
+
+def _clang_load_ast(astfile, index):
+    """Loads a cached translation unit if it exists and none of the files it
+    includes have changed since it was saved.  Returns None otherwise."""
+    if not os.path.isfile(astfile) or _load_deps(astfile + '.deps') is None:
+        return None
+    try:
+        tu = cindex.TranslationUnit.from_ast_file(astfile, index=index)
+    except cindex.TranslationUnitLoadError:
+        return None
+    return tu
+
+def _clang_save_ast(tu, astfile, verbose=False):
+    """Saves a translation unit along with the fingerprints of its include
+    closure."""
+    ensuredirs(astfile)
+    try:
+        tu.save(astfile)
+    except cindex.TranslationUnitSaveError:
+        if verbose:
+            print("could not cache translation unit in {0}".format(astfile))
+        return
+    _save_deps(astfile + '.deps', _clang_includes(tu))
+
+class ClangSymbolIndex(object):
+    """A symbol table for a clang translation unit.  This records every
+    declaration in the global scope and in all (nested) namespaces once so that
+    declarations may be looked up by name rather than by walking the tree.
+    Build these with clang_symbols() so that they are shared by everyone
+    looking at the same translation unit.
+    """
+
+    def __init__(self, tu):
+        """Parameters
+        -------------
+        tu : libclang TranslationUnit object
+            The translation unit to index.
+
+        """
+        self.tu = tu
+        # scopes are (cursor, filename, toplevel, spelling) in pre-order
+        self.scopes = scopes = [(tu.cursor, None, False, None)]
+        # entries are (cursor, spelling, kind, filename, topfile, scope position)
+        # in document order
+        self.entries = entries = []
+        namespace_kind = cindex.CursorKind.NAMESPACE
+        def visit(scope, pos, topfile):
+            toplevel = pos == 0
+            for c in scope.get_children():
+                kind = c.kind
+                f = c.location.file
+                fname = None if f is None else f.name
+                if toplevel:
+                    f = c.extent.start.file
+                    topfile = None if f is None else f.name
+                entries.append((c, c.spelling, kind, fname, topfile, pos))
+                if kind == namespace_kind:
+                    scopes.append((c, fname, toplevel, c.spelling))
+                    visit(c, len(scopes) - 1, topfile)
+        visit(tu.cursor, 0, None)
+        # lookups search the innermost scopes first
+        self.byname = byname = {}
+        for entry in sorted(entries, key=lambda e: -e[-1]):
+            byname.setdefault(entry[1], []).append(entry)
+
+    def find(self, name, kinds, onlyin=None, namespace=None):
+        """Finds all declarations of the given name and kinds.  If namespace is
+        None, the global scope and all namespaces are searched, innermost
+        first.  Otherwise only the top-level namespaces with this name are
+        searched.  If onlyin is given, both the declarations and the namespaces
+        they live in must come from these files.
+        """
+        decls = []
+        scopes = self.scopes
+        for c, spelling, kind, fname, topfile, pos in self.byname.get(name, ()):
+            if kind not in kinds:
+                continue
+            if onlyin is not None and fname not in onlyin:
+                continue
+            _, sfname, stoplevel, sname = scopes[pos]
+            if namespace is None:
+                if pos != 0 and onlyin is not None and sfname not in onlyin:
+                    continue
+            elif not stoplevel or sname != namespace or \
+                 (onlyin is not None and sfname not in onlyin):
+                continue
+            decls.append(c)
+        return decls
+
+    def iterentries(self, kinds, onlyin=None):
+        """Yields the (cursor, spelling) pairs of the given kinds, in document
+        order, whose top-level enclosing declaration starts in one of the onlyin
+        files."""
+        for c, spelling, kind, fname, topfile, pos in self.entries:
+            if kind not in kinds:
+                continue
+            if onlyin is not None and topfile not in onlyin:
+                continue
+            yield c, spelling
+
+def clang_symbols(tu):
+    """Returns the ClangSymbolIndex for a translation unit, building it only on
+    the first call for any given unit.  This cache is cleared by clearmemo()."""
+    cache = clang_symbols.cache
+    key = id(tu)
+    idx = cache.get(key, None)
+    if idx is None or idx.tu is not tu:
+        idx = cache[key] = ClangSymbolIndex(tu)
+    return idx
+
+clang_symbols.cache = {}
+
+class ClangTypeMemo(object):
+    """The already translated types for a single translation unit, along with
+    the number of lookups that were and were not found here.  Canonical types
+    are keyed by their spelling, which is unique within a unit, and the
+    template arguments of declarations by their USR.
+    """
+
+    def __init__(self, tu):
+        """Parameters
+        -------------
+        tu : clang.cindex.TranslationUnit
+            The translation unit whose types are memoized.
+
+        """
+        self.tu = tu
+        self.types = {}
+        self.template_args = {}
+        self.hits = 0
+        self.misses = 0
+
+    def hit_rate(self):
+        """The fraction of lookups which were already translated."""
+        total = self.hits + self.misses
+        return self.hits / float(total) if 0 < total else 0.0
+
+    def __str__(self):
+        return ("{0} hits, {1} misses ({2:.1%} hit rate)"
+                .format(self.hits, self.misses, self.hit_rate()))
+
+def clang_type_memo(tu):
+    """Returns the ClangTypeMemo for a translation unit, creating it on first
+    use.  This cache is cleared by clearmemo() and its entries are dropped
+    when their unit is evicted from the parser cache."""
+    cache = clang_type_memo.cache
+    key = id(tu)
+    memo = cache.get(key, None)
+    if memo is None or memo.tu is not tu:
+        memo = cache[key] = ClangTypeMemo(tu)
+    return memo
+
+clang_type_memo.cache = {}
+
 #
 # pycparser Describers
 #
@@ -299,9 +897,12 @@ def pycparser_parse(filename, includes=(), defines=('XDRESS',), undefines=(),
     """
     pklgzname = filename.replace(os.path.sep, '_').rsplit('.', 1)[0] + '.pkl.gz'
     pklgzname = os.path.join(builddir, pklgzname)
-    if os.path.isfile(pklgzname):
+    depsfile = pklgzname + '.deps'
+    if os.path.isfile(pklgzname) and (not os.path.isfile(depsfile) or
+                                      _load_deps(depsfile) is not None):
         with gzip.open(pklgzname, 'rb') as f:
             root = pickle.loads(f.read())
+        _record_include_closure(filename, _pycparser_files(root))
         return root
     kwargs = {'cpp_args': [r'-D__attribute__(x)=',  # Workaround for GNU libc
                 r'-D__asm__(x)=', r'-D__const=',
@@ -316,8 +917,15 @@ def pycparser_parse(filename, includes=(), defines=('XDRESS',), undefines=(),
     root = pycparser.parse_file(filename, use_cpp=True, **kwargs)
     with gzip.open(pklgzname, 'wb') as f:
         f.write(pickle.dumps(root, pickle.HIGHEST_PROTOCOL))
+    closure = _record_include_closure(filename, _pycparser_files(root))
+    _save_deps(depsfile, (filename,) + closure)
     return root
 
+def _pycparser_files(root):
+    """Returns the names of the files that the top-level declarations of a
+    pycparser AST come from.  Files which only define macros are not seen."""
+    return [node.coord.file for node in root.ext if node.coord is not None]
+
 #
 #  General utilities
 #
@@ -433,7 +1041,7 @@ class ParserPlugin(Plugin):
         classes=(),
         parsers={'c': ['pycparser', 'clang', 'gccxml'],
                  'c++':['clang', 'gccxml', 'pycparser']},
-        clear_parser_cache_period=50,
+        parser_cache_mb=1024,
         dumpast=NotSpecified,
         extra_parser_args=(),
         )
@@ -453,9 +1061,9 @@ class ParserPlugin(Plugin):
         'classes': ("A list of class names in sequence, mapping, "
                     "or apiname format"),
         'parsers': "Parser(s) name, list, or dict",
-        'clear_parser_cache_period': ("Number of parser calls to perform before "
-                                      "clearing the internal cache.  This prevents "
-                                      "nasty memory overflow issues."),
+        'parser_cache_mb': ("Estimated memory budget, in MB, for the cache of "
+                            "parsed files.  The least recently used parses are "
+                            "evicted when this is exceeded.  None means unbounded."),
         'dumpast': "Prints the abstract syntax tree of a file.",
         'clang_includes': "clang-specific include paths",
         'extra_parser_args': "Further command line arguments to pass to the parser"
@@ -471,9 +1079,9 @@ class ParserPlugin(Plugin):
                             nargs="+", type=str, help=rcdocs["undefines"])
         parser.add_argument('-p', action='store', dest='parsers',
                             help=rcdocs["parsers"])
-        parser.add_argument('--clear-parser-cache-period', action='store',
-                            dest='clear_parser_cache_period', type=int,
-                            help=rcdocs["clear_parser_cache_period"])
+        parser.add_argument('--parser-cache-mb', action='store',
+                            dest='parser_cache_mb', type=float, metavar="MB",
+                            help=rcdocs["parser_cache_mb"])
         parser.add_argument('--dumpast', action='store', dest='dumpast',
                             metavar="FILE", help=rcdocs["dumpast"])
         parser.add_argument('--clang-includes', action='store', dest='clang_includes',
@@ -487,6 +1095,9 @@ class ParserPlugin(Plugin):
         if isinstance(rc.parsers, basestring):
             if '[' in rc.parsers or '{' in rc.parsers:
                 rc.parsers = eval(rc.parsers)
+        mb = rc.parser_cache_mb
+        parser_cache.maxsize = None if mb is None else int(mb * 2**20)
+        parser_cache.verbose = rc.verbose
         # This should go last
         if rc.dumpast is not NotSpecified:
             dumpast(rc.dumpast, rc.parsers, rc.sourcedir, includes=rc.includes,
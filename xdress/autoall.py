@@ -33,13 +33,8 @@ import os
 import io
 import re
 import sys
-from hashlib import md5
 from pprint import pprint, pformat
 from warnings import warn
-try:
-    import cPickle as pickle
-except ImportError:
-    import pickle
 
 try:
     import pycparser
@@ -85,7 +80,8 @@ class GccxmlFinder(object):
         origonlyin = onlyin
         onlyin = [onlyin] if isinstance(onlyin, basestring) else onlyin
         onlyin = set() if onlyin is None else set(onlyin)
-        onlyin = [root.find("File[@name='{0}']".format(oi)) for oi in onlyin]
+        files = astparsers.gccxml_index(root).files
+        onlyin = [files.get(oi, None) for oi in onlyin]
         self.onlyin = set([oi.attrib['id'] for oi in onlyin if oi is not None])
         if 0 == len(self.onlyin):
             msg = ("None of these files are present: {0!r}; "
@@ -249,27 +245,17 @@ def clang_findall(filename, includes=(), defines=('XDRESS',), undefines=(),
     tu = astparsers.clang_parse(filename, includes=includes, defines=defines,
                                 undefines=undefines, 
                                 extra_parser_args=extra_parser_args, verbose=verbose, 
-                                debug=debug, language=language, 
+                                debug=debug, builddir=builddir, language=language, 
                                 clang_includes=clang_includes)
     basename = filename.rsplit('.', 1)[0]
     onlyin = frozenset([filename] +
                        [basename + '.' + h for h in utils._hdr_exts if h.startswith('h')])
-    variables, functions, classes = [],[],[]
-    def visit(node):
-        kind = node.kind
-        if kind == CursorKind.NAMESPACE:
-            for kid in node.get_children():
-                visit(kid)
-        elif kind == CursorKind.ENUM_DECL:
-            variables.append(node.spelling)
-        elif kind == CursorKind.FUNCTION_DECL:
-            functions.append(node.spelling)
-        elif kind in (CursorKind.CLASS_DECL,CursorKind.STRUCT_DECL):
-            classes.append(node.spelling)
-    for node in tu.cursor.get_children():
-        file = node.extent.start.file
-        if file and file.name in onlyin:
-            visit(node)
+    symbols = astparsers.clang_symbols(tu)
+    def names(*kinds):
+        return [spelling for c, spelling in symbols.iterentries(kinds, onlyin)]
+    variables = names(CursorKind.ENUM_DECL)
+    functions = names(CursorKind.FUNCTION_DECL)
+    classes = names(CursorKind.CLASS_DECL, CursorKind.STRUCT_DECL)
     return variables, functions, classes
 
 
@@ -490,10 +476,10 @@ def findall(filename, includes=(), defines=('XDRESS',), undefines=(),
 # Persisted Cache for great speed up
 #
 
-class AutoNameCache(object):
+class AutoNameCache(utils.PersistentCache):
     """A quick persistent cache for name lists automatically found in files.  
-    The keys are (classname, filename, kind) tuples.  The values are 
-    (hashes-of-the-file, finder-results) tuples."""
+    The keys are filenames.  The values are (fingerprints-of-the-file,
+    finder-results) tuples."""
 
     def __init__(self, cachefile=os.path.join('build', 'autoname.cache')):
         """Parameters
@@ -502,49 +488,10 @@ class AutoNameCache(object):
             Path to description cachefile.
 
         """
-        self.cachefile = cachefile
-        if os.path.isfile(cachefile):
-            with io.open(cachefile, 'rb') as f:
-                self.cache = pickle.load(f)
-        else:
-            self.cache = {}
-
-    def isvalid(self, filename):
-        """Boolean on whether the cach value for a filename matches the state 
-        of the file on the system."""
-        key = filename
-        if key not in self.cache:
-            return False
-        cachehash = self.cache[key][0]
-        with io.open(filename, 'rb') as f:
-            filebytes = f.read()
-        currhash = md5(filebytes).hexdigest()
-        return cachehash == currhash
-
-    def __getitem__(self, key):
-        return self.cache[key][1]  # return the results of the finder only
-
-    def __setitem__(self, key, value):
-        filename = key
-        with io.open(filename, 'rb') as f:
-            filebytes = f.read()
-        currhash = md5(filebytes).hexdigest()
-        self.cache[key] = (currhash, value)
-
-    def __delitem__(self, key):
-        del self.cache[key]
-
-    def dump(self):
-        """Writes the cache out to the filesystem."""
-        if not os.path.exists(self.cachefile):
-            pardir = os.path.split(self.cachefile)[0]
-            if not os.path.exists(pardir):
-                os.makedirs(pardir)
-        with io.open(self.cachefile, 'wb') as f:
-            pickle.dump(self.cache, f, pickle.HIGHEST_PROTOCOL)
+        super(AutoNameCache, self).__init__(cachefile)
 
-    def __str__(self):
-        return pformat(self.cache)
+    def _srcfiles(self, key):
+        return (key,)
 
 #
 # Plugin
@@ -624,27 +571,26 @@ class XDressPlugin(astparsers.ParserPlugin):
         # second pass -- find all
         allfiles = {}
         cachefile = os.path.join(rc.builddir, 'autoname.cache')
-        autonamecache = AutoNameCache(cachefile=cachefile)
-        for i, (srcfile, lang) in enumerate(allsrc.items()):
-            print("autoall: searching {0}".format(srcfile))
-            if autonamecache.isvalid(srcfile):
-                found = autonamecache[srcfile]
-            else:
-                found = findall(srcfile, includes=rc.includes, defines=rc.defines, 
-                                undefines=rc.undefines, 
-                                extra_parser_args=rc.extra_parser_args, 
-                                parsers=rc.parsers, verbose=rc.verbose, 
-                                debug=rc.debug, builddir=rc.builddir, language=lang,
-                                clang_includes=rc.clang_includes)
-                autonamecache[srcfile] = found
-                autonamecache.dump()
-            allfiles[srcfile] = found
-            for k, kind in enumerate(kinds):
-                if 0 < len(found[k]):
-                    fstr = ", ".join([str(_) for _ in found[k]])
-                    print("autoall: found {0}: {1}".format(kind, fstr))
-            if 0 == i%rc.clear_parser_cache_period:
-                astparsers.clearmemo()
+        with AutoNameCache(cachefile=cachefile) as autonamecache:
+            for srcfile, lang in allsrc.items():
+                print("autoall: searching {0}".format(srcfile))
+                if autonamecache.isvalid(srcfile):
+                    found = autonamecache[srcfile]
+                else:
+                    found = findall(srcfile, includes=rc.includes, defines=rc.defines, 
+                                    undefines=rc.undefines, 
+                                    extra_parser_args=rc.extra_parser_args, 
+                                    parsers=rc.parsers, verbose=rc.verbose, 
+                                    debug=rc.debug, builddir=rc.builddir, language=lang,
+                                    clang_includes=rc.clang_includes)
+                    autonamecache[srcfile] = found
+                allfiles[srcfile] = found
+                for k, kind in enumerate(kinds):
+                    if 0 < len(found[k]):
+                        fstr = ", ".join([str(_) for _ in found[k]])
+                        print("autoall: found {0}: {1}".format(kind, fstr))
+        if rc.verbose:
+            print(astparsers.parser_cache.stats())
 
         # third pass -- replace *s
         if self.varhasstar:
@@ -237,6 +237,7 @@ import itertools
 import functools
 import pickle
 import collections
+import multiprocessing
 from hashlib import md5
 from numbers import Number
 from pprint import pprint, pformat
@@ -260,6 +261,7 @@ from .utils import exec_file, RunControl, NotSpecified, Arg, merge_descriptions,
     find_source, FORBIDDEN_NAMES, find_filenames, warn_forbidden_name, apiname, \
     ensure_apiname, c_literal, extra_filenames, newoverwrite, _lang_exts
 from . import astparsers
+from .astparsers import ClangTypeMemo, clang_type_memo
 from .types.system import TypeSystem
 
 try:
@@ -417,20 +419,42 @@ def gccxml_describe(filename, name, kind, includes=(), defines=('XDRESS',),
         A dictionary describing the class which may be used to generate
         API bindings.
     """
+    descs = gccxml_describe_many(filename, [(name, kind)], includes=includes,
+                                 defines=defines, undefines=undefines,
+                                 extra_parser_args=extra_parser_args, ts=ts,
+                                 verbose=verbose, debug=debug, builddir=builddir,
+                                 onlyin=onlyin, language=language,
+                                 clang_includes=clang_includes)
+    return descs[0]
+
+def gccxml_describe_many(filename, names, includes=(), defines=('XDRESS',),
+                         undefines=(), extra_parser_args=(), ts=None, verbose=False,
+                         debug=False, builddir='build', onlyin=None, language='c++',
+                         clang_includes=()):
+    """Use GCC-XML to describe many API elements from a single parse of the file.
+    The names argument is a sequence of (name, kind) tuples and a list of
+    descriptions in the same order is returned.  All other arguments are the
+    same as for gccxml_describe().
+    """
     # GCC-XML and/or Cygwin wants posix paths on Windows.
     posixfilename = posixpath.join(*ntpath.split(filename)) if os.name == 'nt' \
                     else filename
+    if onlyin is None:
+        onlyin = set([filename])
     root = astparsers.gccxml_parse(posixfilename, includes=includes, defines=defines,
                                    undefines=undefines,
                                    extra_parser_args=extra_parser_args,
-                                   verbose=verbose, debug=debug, builddir=builddir)
-    if onlyin is None:
-        onlyin = set([filename])
+                                   verbose=verbose, debug=debug, builddir=builddir,
+                                   onlyin=onlyin)
     describers = {'class': GccxmlClassDescriber, 'func': GccxmlFuncDescriber,
                   'var': GccxmlVarDescriber}
-    describer = describers[kind](name, root, onlyin=onlyin, ts=ts, verbose=verbose)
-    describer.visit()
-    return describer.desc
+    descs = []
+    for name, kind in names:
+        describer = describers[kind](name, root, onlyin=onlyin, ts=ts,
+                                     verbose=verbose)
+        describer.visit()
+        descs.append(describer.desc)
+    return descs
 
 
 class GccxmlBaseDescriber(object):
@@ -462,22 +486,21 @@ class GccxmlBaseDescriber(object):
         self.ts = ts or TypeSystem()
         self.verbose = verbose
         self._root = root
+        self._index = index = astparsers.gccxml_index(root)
         origonlyin = onlyin
         onlyin = [onlyin] if isinstance(onlyin, basestring) else onlyin
         onlyin = set() if onlyin is None else set(onlyin)
         self.onlyin = set()
         self._filemap = {}
-        for fnode in root.iterfind("File"):
+        for fnode in index.iterchildren("File"):
             fid = fnode.attrib['id']
             fname = fnode.attrib['name']
 
             self._filemap[fid] = fname
         for fname in onlyin:
-            fnode = root.find("File[@name='{0}']".format(fname))
+            fnode = index.find_file(fname)
             if fnode is None:
-                fnode = root.find("File[@name='./{0}']".format(fname))
-                if fnode is None:
-                    continue
+                continue
             fid = fnode.attrib['id']
             self.onlyin.add(fid)
         if 0 == len(self.onlyin):
@@ -510,8 +533,7 @@ class GccxmlBaseDescriber(object):
         if m is None:
             return None
         enumname, val = m.groups()
-        query = ".//*[@name='{0}']"
-        node = self._root.find(query.format(enumname))
+        node = self._index.find_name(enumname)
         if node is None:
             return None
         for child in node.iterfind('EnumValue'):
@@ -532,9 +554,8 @@ class GccxmlBaseDescriber(object):
         targ_nodes = []
         targ_islit = []
         # gross but string parsing of node name is needed.
-        query = ".//*[@name='{0}']"
         for targ in template_args:
-            targ_node = self._root.find(query.format(targ))
+            targ_node = self._index.find_name(targ)
             if targ_node is None:
                 try:
                     targ_node = c_literal(targ)
@@ -566,8 +587,8 @@ class GccxmlBaseDescriber(object):
         name = node.attrib['name']
         members = node.attrib.get('members', '').strip().split()
         if 0 < len(members):
-            children = [child for m in members for child in \
-                        self._root.iterfind(".//*[@id='{0}']".format(m))]
+            ids = self._index.ids
+            children = [ids[m] for m in members if m in ids]
             tags = [child.tag for child in children]
             template_name = children[tags.index('Constructor')].attrib['name']  # 'map'
         else:
@@ -586,9 +607,8 @@ class GccxmlBaseDescriber(object):
         else:
             # gross but string parsing of node name is needed.
             targs = utils.split_template_args(name)
-            query = ".//*[@name='{0}']"
             for targ in targs:
-                targ_node = self._root.find(query.format(targ))
+                targ_node = self._index.find_name(targ)
                 if targ_node is None:
                     targ_node = c_literal(targ)
                     targ_islit.append(True)
@@ -736,7 +756,7 @@ class GccxmlBaseDescriber(object):
     def visit_field(self, node):
         """visits a member variable."""
         self._pprint(node)
-        context = self._root.find(".//*[@id='{0}']".format(node.attrib['context']))
+        context = self._index.find_id(node.attrib['context'])
         if context.attrib['name'] == self.name:
             # assert this field is member of the class we are trying to parse
             name = node.attrib['name']
@@ -835,7 +855,7 @@ class GccxmlBaseDescriber(object):
 
     def type(self, id):
         """Resolves the type from its id and information in the root element tree."""
-        node = self._root.find(".//*[@id='{0}']".format(id))
+        node = self._index.find_id(id)
         tag = node.tag.lower()
         meth_name = 'visit_' + tag
         meth = getattr(self, meth_name, None)
@@ -854,7 +874,7 @@ class GccxmlBaseDescriber(object):
 
     def context(self, id):
         """Resolves the context from its id and information in the element tree."""
-        node = self._root.find(".//*[@id='{0}']".format(id))
+        node = self._index.find_id(id)
         tag = node.tag.lower()
         meth_name = 'visit_' + tag
         meth = getattr(self, meth_name, None)
@@ -904,8 +924,7 @@ class GccxmlClassDescriber(GccxmlBaseDescriber):
     def _find_class_node(self):
         basename = self.name[0]
         namet = self.desc['type']
-        query = "Class"
-        for node in self._root.iterfind(query):
+        for node in self._index.iterchildren("Class"):
             if node.attrib['file'] not in self.onlyin:
                 continue
             nodename = node.attrib['name']
@@ -935,15 +954,13 @@ class GccxmlClassDescriber(GccxmlBaseDescriber):
         if node is None:
             if not isinstance(self.name, basestring) and self.name not in self.ts.argument_kinds:
                 node = self._find_class_node()
+            gccxmlname = self.ts.gccxml_type(self.name)
             if node is None:
-                query = "Class[@name='{0}']".format(self.ts.gccxml_type(self.name))
-                node = self._root.find(query)
+                node = self._index.find_child("Class", gccxmlname)
             if node is None:
-                query = "Struct[@name='{0}']".format(self.ts.gccxml_type(self.name))
-                node = self._root.find(query)
+                node = self._index.find_child("Struct", gccxmlname)
             if node is None:
-                query = "Union[@name='{0}']".format(self.ts.gccxml_type(self.name))
-                node = self._root.find(query)
+                node = self._index.find_child("Union", gccxmlname)
             if node is None and not isinstance(self.name, basestring):
                 # Must be a template with some wacky argument values
                 node = self._find_class_node()
@@ -961,7 +978,7 @@ class GccxmlClassDescriber(GccxmlBaseDescriber):
             self.desc['construct'] = node.tag.lower()
             self.visit_class(node)
         members = node.attrib.get('members', '').strip().split()
-        children = [self._root.find(".//*[@id='{0}']".format(m)) for m in members]
+        children = [self._index.find_id(m) for m in members]
         children = [c for c in children if c.attrib['access'] == 'public']
         self._level += 1
         for child in children:
@@ -1008,7 +1025,14 @@ class GccxmlVarDescriber(GccxmlBaseDescriber):
 
         """
         root = node or self._root
-        for n in root.iterfind("Variable[@name='{0}']".format(self.name)):
+        index = self._index
+        if root is self._root:
+            variables = index.iterchildren("Variable", self.name)
+            enums = index.iterchildren("Enumeration", self.name)
+        else:
+            variables = root.iterfind("Variable[@name='{0}']".format(self.name))
+            enums = root.iterfind("Enumeration[@name='{0}']".format(self.name))
+        for n in variables:
             if n.attrib['file'] in self.onlyin:
                 ns = self.context(n.attrib['context'])
                 if ns is not None and ns != "::":
@@ -1022,7 +1046,7 @@ class GccxmlVarDescriber(GccxmlBaseDescriber):
                 raise RuntimeError(msg)
 
         # Variables can also be enums
-        for n in root.iterfind("Enumeration[@name='{0}']".format(self.name)):
+        for n in enums:
             if n.attrib['file'] in self.onlyin:
                 ns = self.context(n.attrib['context'])
                 if ns is not None and ns != "::":
@@ -1093,7 +1117,11 @@ class GccxmlFuncDescriber(GccxmlBaseDescriber):
             namet = tuple(namet)
         if not isinstance(name, basestring):
             pattern = re.compile(r'(?: |::)'+basename+'.*>')
-        for n in root.iterfind("Function[@name='{0}']".format(basename)):
+        if root is self._root:
+            funcs = self._index.iterchildren("Function", basename)
+        else:
+            funcs = root.iterfind("Function[@name='{0}']".format(basename))
+        for n in funcs:
             if not isinstance(name, basestring):
                 # Must be a template function
                 if n.attrib['file'] not in self.onlyin:
@@ -1144,7 +1172,7 @@ def clang_describe(filename, name, kind, includes=(), defines=('XDRESS',),
     debug : bool, optional
         Flag to enable/disable debug mode.  Currently ignored.
     builddir : str, optional
-        Ignored.  Exists only for compatibility with gccxml_describe.
+        Location of the on-disk translation unit cache, None disables it.
     onlyin : set of str, optional
         The paths to the files that the definition is allowed to exist in.
     language : str
@@ -1156,28 +1184,51 @@ def clang_describe(filename, name, kind, includes=(), defines=('XDRESS',),
         A dictionary describing the class which may be used to generate
         API bindings.
     """
+    descs = clang_describe_many(filename, [(name, kind)], includes=includes,
+                                defines=defines, undefines=undefines,
+                                extra_parser_args=extra_parser_args, ts=ts,
+                                verbose=verbose, debug=debug, builddir=builddir,
+                                onlyin=onlyin, language=language,
+                                clang_includes=clang_includes)
+    return descs[0]
+
+def clang_describe_many(filename, names, includes=(), defines=('XDRESS',),
+                        undefines=(), extra_parser_args=(), ts=None, verbose=False,
+                        debug=False, builddir=None, onlyin=None, language='c++',
+                        clang_includes=()):
+    """Use Clang to describe many API elements from a single translation unit.
+    The names argument is a sequence of (name, kind) tuples and a list of
+    descriptions in the same order is returned.  All other arguments are the
+    same as for clang_describe().
+    """
     tu = astparsers.clang_parse(filename, includes=includes, defines=defines,
                                 undefines=undefines,
                                 extra_parser_args=extra_parser_args, verbose=verbose,
-                                debug=debug, language=language,
+                                debug=debug, builddir=builddir, language=language,
                                 clang_includes=clang_includes)
     ts = ts or TypeSystem()
     if onlyin is None:
         onlyin = None if filename is None else frozenset([filename])
     onlyin = clang_fix_onlyin(onlyin)
-    if kind == 'class':
-        cls = clang_find_class(tu, name, ts=ts, filename=filename, onlyin=onlyin)
-        desc = clang_describe_class(cls)
-    elif kind == 'func':
-        fns = clang_find_function(tu, name, ts=ts, filename=filename, onlyin=onlyin)
-        desc = clang_describe_functions(fns)
-    elif kind == 'var':
-        var = clang_find_var(tu, name, ts=ts, filename=filename, onlyin=onlyin)
-        desc = clang_describe_var(var)
-    else:
-        raise ValueError('bad description kind {0}, name {1}'.format(kind,name))
+    descs = []
+    for name, kind in names:
+        if kind == 'class':
+            cls = clang_find_class(tu, name, ts=ts, filename=filename, onlyin=onlyin)
+            desc = clang_describe_class(cls)
+        elif kind == 'func':
+            fns = clang_find_function(tu, name, ts=ts, filename=filename,
+                                      onlyin=onlyin)
+            desc = clang_describe_functions(fns)
+        elif kind == 'var':
+            var = clang_find_var(tu, name, ts=ts, filename=filename, onlyin=onlyin)
+            desc = clang_describe_var(var)
+        else:
+            raise ValueError('bad description kind {0}, name {1}'.format(kind,name))
+        descs.append(desc)
     linecache.clearcache() # Clean up results of clang_range_str
-    return desc
+    if verbose:
+        print("clang type memo for {0}: {1}".format(filename, clang_type_memo(tu)))
+    return descs
 
 def clang_fix_onlyin(onlyin):
     '''Make sure onlyin is a set and add ./path versions for each relative path'''
@@ -1206,36 +1257,10 @@ def clang_range_str(source_range):
     s = "".join(lines)
     return s
 
-def clang_find_scopes(tu, onlyin, namespace=None):
-    """Find all 'toplevel' scopes, optionally restricting to a given namespace"""
-    namespace_kind = CursorKind.NAMESPACE
-    if namespace is None:
-        def all_namespaces(node):
-            for n in node.get_children():
-                if n.kind == namespace_kind:
-                    if onlyin is None or n.location.file.name in onlyin:
-                        yield n
-                    for c in all_namespaces(n):
-                        yield c
-        return (tu.cursor,)+tuple(all_namespaces(tu.cursor))
-    else:
-        scopes = []
-        for n in tu.cursor.get_children():
-            if n.kind == namespace_kind and n.spelling == namespace:
-                if onlyin is None or n.location.file.name in onlyin:
-                    scopes.append(n)
-        return scopes
-
 def clang_find_decls(tu, name, kinds, onlyin, namespace=None):
     """Find all declarations of the given name and kind in the given scopes."""
-    scopes = clang_find_scopes(tu, onlyin, namespace=namespace)
-    decls = []
-    for s in scopes[::-1]:
-        for c in s.get_children():
-            if c.kind in kinds and c.spelling == name:
-                if onlyin is None or c.location.file.name in onlyin:
-                    decls.append(c)
-    return decls
+    return astparsers.clang_symbols(tu).find(name, kinds, onlyin=onlyin,
+                                             namespace=namespace)
 
 # TODO: This functionality belongs in TypeSystem
 def canon_template_arg(ts, kind, arg):
@@ -1512,9 +1537,26 @@ def clang_describe_args(func):
         defaults.append(_none_arg if default is None else clang_describe_expression(default))
     return tuple(descs), tuple(defaults)
 
+def _clang_memo_get(memo, table, key):
+    if key in table:
+        memo.hits += 1
+        return True, table[key]
+    memo.misses += 1
+    return False, None
+
 def clang_describe_type(typ, loc):
-    """Describe the type reference at the given cursor"""
+    """Describe the type reference at the given cursor.  Translations are
+    memoized per translation unit on the canonical spelling of the type."""
     typ = typ.get_canonical()
+    memo = clang_type_memo(typ.translation_unit)
+    key = typ.spelling
+    found, desc = _clang_memo_get(memo, memo.types, key)
+    if not found:
+        desc = memo.types[key] = _clang_translate_type(typ, loc)
+    return desc
+
+def _clang_translate_type(typ, loc):
+    """Translates a canonical clang type, see clang_describe_type()."""
     kind = typ.kind
     try:
         desc = _clang_base_types[kind]
@@ -1603,12 +1645,20 @@ def clang_describe_template_args(node):
 
     TODO: Needs a better docstring.
     """
+    usr = node.get_usr()
+    if usr:
+        memo = clang_type_memo(node.translation_unit)
+        key = (node.kind, usr)
+        found, args = _clang_memo_get(memo, memo.template_args, key)
+        if found:
+            return args
     loc = node.location
     args = tuple(clang_describe_template_arg(a, loc) for a in node.get_template_args())
     if node.spelling in hack_template_args:
-        return args[:len(hack_template_args[node.spelling])]
-    else:
-        return args
+        args = args[:len(hack_template_args[node.spelling])]
+    if usr:
+        memo.template_args[key] = args
+    return args
 
 def clang_expand_template_args(node, args):
     """TODO: Broken version handling defaults
@@ -1629,6 +1679,17 @@ def clang_describe_template_arg(arg, loc):
     kind = arg.kind
     if kind == CursorKind.TYPE_TEMPLATE_ARG:
         return clang_describe_type(arg.type, loc)
+    memo = clang_type_memo(arg.translation_unit)
+    key = (kind, arg.spelling, arg.type.get_canonical().spelling)
+    found, desc = _clang_memo_get(memo, memo.template_args, key)
+    if not found:
+        desc = memo.template_args[key] = _clang_translate_template_arg(arg, loc)
+    return desc
+
+def _clang_translate_template_arg(arg, loc):
+    """Translates a non-type template argument, see
+    clang_describe_template_arg()."""
+    kind = arg.kind
     try:
         s = arg.spelling.strip()
         lit = c_literal(s)
@@ -2141,6 +2202,23 @@ def pycparser_describe(filename, name, kind, includes=(), defines=('XDRESS',),
         A dictionary describing the class which may be used to generate
         API bindings.
     """
+    descs = pycparser_describe_many(filename, [(name, kind)], includes=includes,
+                                    defines=defines, undefines=undefines,
+                                    extra_parser_args=extra_parser_args, ts=ts,
+                                    verbose=verbose, debug=debug, builddir=builddir,
+                                    onlyin=onlyin, language=language,
+                                    clang_includes=clang_includes)
+    return descs[0]
+
+def pycparser_describe_many(filename, names, includes=(), defines=('XDRESS',),
+                            undefines=(), extra_parser_args=(), ts=None,
+                            verbose=False, debug=False, builddir='build',
+                            onlyin=None, language='c', clang_includes=()):
+    """Use pycparser to describe many API elements from a single parse of the
+    file.  The names argument is a sequence of (name, kind) tuples and a list of
+    descriptions in the same order is returned.  All other arguments are the
+    same as for pycparser_describe().
+    """
     assert language=='c'
     root = astparsers.pycparser_parse(filename, includes=includes, defines=defines,
                                       undefines=undefines,
@@ -2148,10 +2226,13 @@ def pycparser_describe(filename, name, kind, includes=(), defines=('XDRESS',),
                                       verbose=verbose, debug=debug, builddir=builddir)
     if onlyin is None:
         onlyin = set([filename])
-    describer = _pycparser_describers[kind](name, root, onlyin=onlyin, ts=ts,
-                                            verbose=verbose)
-    describer.visit()
-    return describer.desc
+    descs = []
+    for name, kind in names:
+        describer = _pycparser_describers[kind](name, root, onlyin=onlyin, ts=ts,
+                                                verbose=verbose)
+        describer.visit()
+        descs.append(describer.desc)
+    return descs
 
 
 #
@@ -2175,12 +2256,29 @@ def _make_includer(filenames, builddir, language, verbose=False):
     newoverwrite(newfile, newname, verbose=verbose)
     return newname
 
+def _parse_target(filename, builddir, language, verbose=False):
+    """Returns the file that should actually be parsed for a file or list of
+    files along with the set of files that definitions may come from."""
+    if isinstance(filename, basestring):
+        onlyin = set([filename])
+    else:
+        onlyin = set(filename)
+        filename = filename[0] if len(filename) == 0 \
+                   else _make_includer(filename, builddir, language, verbose=verbose)
+    return filename, onlyin
+
 _describers = {
     'clang': clang_describe,
     'gccxml': gccxml_describe,
     'pycparser': pycparser_describe,
     }
 
+_many_describers = {
+    'clang': clang_describe_many,
+    'gccxml': gccxml_describe_many,
+    'pycparser': pycparser_describe_many,
+    }
+
 def describe(filename, name=None, kind='class', includes=(), defines=('XDRESS',),
              undefines=(), extra_parser_args=(), parsers='gccxml', ts=None,
              verbose=False, debug=False, builddir='build', language='c++',
@@ -2232,12 +2330,7 @@ def describe(filename, name=None, kind='class', includes=(), defines=('XDRESS',)
         A dictionary describing the class which may be used to generate
         API bindings.
     """
-    if isinstance(filename, basestring):
-        onlyin = set([filename])
-    else:
-        onlyin = set(filename)
-        filename = filename[0] if len(filename) == 0 \
-                   else _make_includer(filename, builddir, language, verbose=verbose)
+    filename, onlyin = _parse_target(filename, builddir, language, verbose=verbose)
     if name is None:
         name = os.path.split(filename)[-1].rsplit('.', 1)[0].capitalize()
     parser = astparsers.pick_parser(language, parsers)
@@ -2248,6 +2341,169 @@ def describe(filename, name=None, kind='class', includes=(), defines=('XDRESS',)
                      language=language, clang_includes=clang_includes)
     return desc
 
+def _group_by_source(names):
+    """Groups a sequence of (apiname, kind) tuples by their source files and
+    language.  Returns an ordered dictionary mapping (srcfiles, language) keys to
+    lists of indices into names.
+    """
+    groups = collections.OrderedDict()
+    for i, (name, kind) in enumerate(names):
+        srcfiles = name.srcfiles
+        if not isinstance(srcfiles, basestring):
+            srcfiles = tuple(srcfiles)
+        groups.setdefault((srcfiles, name.language), []).append(i)
+    return groups
+
+def describe_many(names, includes=(), defines=('XDRESS',), undefines=(),
+                  extra_parser_args=(), parsers='gccxml', ts=None, verbose=False,
+                  debug=False, builddir='build', clang_includes=(), closures=None):
+    """Automatically describes many API elements at once.  The elements are
+    grouped by their source files and language so that each translation unit
+    is parsed exactly once and every element which lives in it is described
+    from that same parse.  Parses are then kept in the parser cache, within
+    its memory budget, for later use.
+
+    Parameters
+    ----------
+    names : sequence of (apiname, kind) tuples
+        The API elements to describe and the kind of each, valid kinds are
+        'class', 'func', and 'var'.
+    includes: list of str, optional
+        The list of extra include directories to search for header files.
+    defines: list of str, optional
+        The list of extra macro definitions to apply.
+    undefines: list of str, optional
+        The list of extra macro undefinitions to apply.
+    extra_parser_args : list of str, optional
+        Further command line arguments to pass to the parser.
+    parsers : str, list, or dict, optional
+        The parser / AST to use to use for the file, see describe().
+    ts : TypeSystem, optional
+        A type system instance.
+    verbose : bool, optional
+        Flag to diplay extra information while describing.
+    debug : bool, optional
+        Flag to enable/disable debug mode.
+    builddir : str, optional
+        Location of -- often temporary -- build files.
+    clang_includes : list of str, optional
+        clang-specific include paths.
+    closures : list, optional
+        If given, this list is filled with the include closure of the translation
+        unit that each element was described from, in the same order as names.
+        See astparsers.include_closure().
+
+    Returns
+    -------
+    descs : list of dicts
+        The descriptions in the same order as names.
+    """
+    names = list(names)
+    descs = [None] * len(names)
+    if closures is not None:
+        closures[:] = [()] * len(names)
+    for (srcfiles, language), idx in _group_by_source(names).items():
+        filename, onlyin = _parse_target(srcfiles, builddir, language,
+                                         verbose=verbose)
+        parser = astparsers.pick_parser(language, parsers)
+        describer = _many_describers[parser]
+        groupnames = [(names[i][0].srcname, names[i][1]) for i in idx]
+        groupdescs = describer(filename, groupnames, includes=includes,
+                               defines=defines, undefines=undefines,
+                               extra_parser_args=extra_parser_args, ts=ts,
+                               verbose=verbose, debug=debug, builddir=builddir,
+                               onlyin=onlyin, language=language,
+                               clang_includes=clang_includes)
+        for i, desc in zip(idx, groupdescs):
+            descs[i] = desc
+        if closures is not None:
+            closure = astparsers.include_closure(filename) or ()
+            for i in idx:
+                closures[i] = closure
+    if verbose:
+        print(astparsers.parser_cache.stats())
+    return descs
+
+_pool_describe_state = {}
+
+def _pool_describe(i):
+    """Describes the i-th group of API elements which share source files.  This
+    is run in a forked worker process by parallel_describe() and relies on the
+    state that was set up in the parent prior to forking.
+    """
+    names = _pool_describe_state['groups'][i]
+    kwargs = _pool_describe_state['kwargs']
+    ts = kwargs['ts']
+    kinds_before = dict(ts.argument_kinds)
+    closures = [] if kwargs.get('closures', None) is not None else None
+    kwargs = dict(kwargs, closures=closures)
+    descs = describe_many(names, **kwargs)
+    newkinds = [(t, k) for t, k in ts.argument_kinds.items() \
+                if kinds_before.get(t, None) != k]
+    return descs, newkinds, closures
+
+def parallel_describe(names, jobs, **kwargs):
+    """Describes many API elements using a pool of worker processes.  Names
+    which share the same source files and language are described by the same
+    worker so that each translation unit is only parsed by a single process.
+
+    Parameters
+    ----------
+    names : sequence of (apiname, kind) tuples
+        The API elements to describe and the kind of each.
+    jobs : int
+        The maximum number of worker processes.
+    kwargs : optional
+        Other keyword arguments to pass to describe_many(), such as includes,
+        parsers, ts, builddir, and closures.  Any template argument kinds which
+        the workers register are copied back into this type system.
+
+    Returns
+    -------
+    descs : list of dicts
+        The descriptions in the same order as names.
+    """
+    names = list(names)
+    kwargs = dict(kwargs)
+    groups = _group_by_source(names)
+    jobs = max(1, min(jobs, len(groups)))
+    ts = kwargs.setdefault('ts', None)
+    if ts is None:
+        kwargs['ts'] = ts = TypeSystem()
+    if jobs == 1 or not hasattr(os, 'fork'):
+        return describe_many(names, **kwargs)
+    builddir = kwargs.get('builddir', 'build')
+    verbose = kwargs.get('verbose', False)
+    for srcfiles, language in groups:
+        # write includers before forking so that workers never race on them
+        _parse_target(srcfiles, builddir, language, verbose=verbose)
+    _pool_describe_state['groups'] = [[names[i] for i in idx] \
+                                      for idx in groups.values()]
+    _pool_describe_state['kwargs'] = kwargs
+    try:
+        ctx = multiprocessing.get_context('fork') \
+              if hasattr(multiprocessing, 'get_context') else multiprocessing
+        pool = ctx.Pool(jobs)
+        try:
+            results = pool.map(_pool_describe, range(len(groups)), chunksize=1)
+        finally:
+            pool.close()
+            pool.join()
+    finally:
+        _pool_describe_state.clear()
+    descs = [None] * len(names)
+    closures = kwargs.get('closures', None)
+    if closures is not None:
+        closures[:] = [()] * len(names)
+    for idx, (groupdescs, newkinds, groupclosures) in zip(groups.values(), results):
+        for i, desc in zip(idx, groupdescs):
+            descs[i] = desc
+        if closures is not None:
+            for i, closure in zip(idx, groupclosures):
+                closures[i] = closure
+        for t, argkinds in newkinds:
+            ts.register_argument_kinds(t, argkinds)
+    return descs
 
 #
 # Plugin
@@ -2267,6 +2523,7 @@ class XDressPlugin(astparsers.ParserPlugin):
         rc._update(super(XDressPlugin, self).defaultrc)
         # target enviroment made up of module dicts made up of descriptions
         rc.env = {}
+        rc.jobs = 1
         return rc
 
     def rcdocs(self):
@@ -2274,8 +2531,16 @@ class XDressPlugin(astparsers.ParserPlugin):
         docs = {}
         docs.update(super(XDressPlugin, self).rcdocs)
         docs['env'] = "The target environment computed by the autodescriber."
+        docs['jobs'] = ("Number of worker processes to use when describing API "
+                        "elements")
         return docs
 
+    def update_argparser(self, parser):
+        super(XDressPlugin, self).update_argparser(parser)
+        rcdocs = self.rcdocs() if callable(self.rcdocs) else self.rcdocs
+        parser.add_argument('-j', '--jobs', action='store', dest='jobs', type=int,
+                            metavar="N", help=rcdocs["jobs"])
+
     def setup(self, rc):
         """Expands variables, functions, and classes in the rc based on
         copying src filenames to tar filename."""
@@ -2299,6 +2564,7 @@ class XDressPlugin(astparsers.ParserPlugin):
     def execute(self, rc):
         print("autodescribe: scraping C/C++ APIs from source")
         self.load_sidecars(rc)
+        self.precompute_descs(rc)
         self.compute_classes(rc)
         self.compute_functions(rc)
         self.compute_variables(rc)
@@ -2380,13 +2646,7 @@ class XDressPlugin(astparsers.ParserPlugin):
             srcdesc = cache[name, kind]
         else:
             srcdesc = describe(name.srcfiles, name=name.srcname, kind=kind,
-                               includes=rc.includes, defines=rc.defines,
-                               undefines=rc.undefines,
-                               extra_parser_args=rc.extra_parser_args,
-                               parsers=rc.parsers, ts=rc.ts, verbose=rc.verbose,
-                               debug=rc.debug, builddir=rc.builddir,
-                               language=name.language,
-                               clang_includes=rc.clang_includes)
+                               language=name.language, **self._describe_kwargs(rc))
             srcdesc['name'] = dict(zip(name._fields, name))
             cache[name, kind] = srcdesc
         descs = [srcdesc]
@@ -2395,6 +2655,47 @@ class XDressPlugin(astparsers.ParserPlugin):
         desc = merge_descriptions(descs)
         return desc
 
+    def _describe_kwargs(self, rc):
+        """Returns the keyword arguments to describe() from the run control."""
+        return dict(includes=rc.includes, defines=rc.defines,
+                    undefines=rc.undefines, extra_parser_args=rc.extra_parser_args,
+                    parsers=rc.parsers, ts=rc.ts, verbose=rc.verbose, debug=rc.debug,
+                    builddir=rc.builddir, clang_includes=rc.clang_includes)
+
+    def precompute_descs(self, rc):
+        """Describes all of the API elements whose descriptions are not already
+        in the cache.  Elements are grouped by translation unit so that each is
+        parsed only once and, if rc.jobs is greater than one, the groups are
+        described by a pool of worker processes.  The new descriptions are
+        added to the cache in the order of the compute phase -- classes, then
+        functions, then variables -- so that subsequent calls to compute_desc()
+        are identical to describing each element serially.
+        Each description also depends on the include closure of the translation
+        unit that it came from, so changing any header that it includes
+        invalidates exactly the descriptions which could see that header.
+        """
+        cache = rc._cache
+        names = [(cls, 'class') for cls in rc.classes]
+        names += [(fnc, 'func') for fnc in rc.functions]
+        names += [(var, 'var') for var in rc.variables]
+        names = [(name, kind) for name, kind in names \
+                 if not cache.isvalid(name, kind)]
+        if len(names) == 0:
+            return
+        jobs = rc.jobs if 'jobs' in rc else 1
+        kwargs = self._describe_kwargs(rc)
+        kwargs['closures'] = closures = []
+        if jobs is None or jobs <= 1:
+            srcdescs = describe_many(names, **kwargs)
+        else:
+            print("autodescribe: describing {0} API elements with {1} jobs".format(
+                  len(names), jobs))
+            srcdescs = parallel_describe(names, jobs, **kwargs)
+        for (name, kind), srcdesc, closure in zip(names, srcdescs, closures):
+            srcdesc['name'] = dict(zip(name._fields, name))
+            cache.set((name, kind), srcdesc, deps=closure)
+        cache.dump()
+
     _extrajoinkeys = ['pxd_header', 'pxd_footer', 'pyx_header', 'pyx_footer',
                       'cpppxd_header', 'cpppxd_footer']
 
@@ -2433,44 +2734,38 @@ class XDressPlugin(astparsers.ParserPlugin):
         ts = rc.ts
         env = rc.env
         cache = rc._cache
-        for i, var in enumerate(rc.variables):
+        for var in rc.variables:
             print("autodescribe: describing {0}".format(var.srcname))
             desc = self.compute_desc(var, 'var', rc)
             if rc.verbose:
                 pprint(desc)
-            cache.dump()
             self.adddesc2env(desc, env, var)
             ts.register_variable_namespace(desc['name']['srcname'], desc['namespace'],
                                            desc['type'])
-            if 0 == i%rc.clear_parser_cache_period:
-                astparsers.clearmemo()
+        cache.dump()
 
     def compute_functions(self, rc):
         """Computes function descriptions and loads them into the environment."""
         env = rc.env
         cache = rc._cache
-        for i, fnc in enumerate(rc.functions):
+        for fnc in rc.functions:
             print("autodescribe: describing {0}".format(fnc.srcname))
             desc = self.compute_desc(fnc, 'func', rc)
             if rc.verbose:
                 pprint(desc)
-            cache.dump()
             self.adddesc2env(desc, env, fnc)
-            if 0 == i%rc.clear_parser_cache_period:
-                astparsers.clearmemo()
+        cache.dump()
 
     def compute_classes(self, rc):
         """Computes class descriptions and loads them into the environment."""
         # compute all class descriptions first
         cache = rc._cache
         env = rc.env  # target environment, not source one
-        for i, cls in enumerate(rc.classes):
+        for cls in rc.classes:
             print("autodescribe: describing {0}".format(cls.srcname))
             desc = self.compute_desc(cls, 'class', rc)
-            cache.dump()
             if rc.verbose:
                 pprint(desc)
             self.adddesc2env(desc, env, cls)
-            if 0 == i%rc.clear_parser_cache_period:
-                astparsers.clearmemo()
+        cache.dump()
 
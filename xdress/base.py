@@ -129,6 +129,10 @@ class XDressPlugin(Plugin):
             print(str(rc._cache))
             sys.exit()
 
+    def teardown(self, rc):
+        """Closes the description cache."""
+        rc._cache.close()
+
     def report_debug(self, rc):
         msg = 'Version Information:\n\n{0}\n\n'
         msg += nyansep + "\n\n"
@@ -15,6 +15,7 @@ Cython Generation API
 """
 from __future__ import print_function
 import os
+import re
 import sys
 import math
 import warnings
@@ -43,7 +44,7 @@ AUTOGEN_WARNING = \
 ################################################
 """
 
-def gencpppxd(env, exceptions=True, ts=None):
+def gencpppxd(env, exceptions=True, ts=None, nogil=False):
     """Generates all cpp_*.pxd Cython header files for an environment of modules.
 
     Parameters
@@ -57,6 +58,9 @@ def gencpppxd(env, exceptions=True, ts=None):
         '+' or '-1') to apply to everywhere.
     ts : TypeSystem, optional
         A type system instance.
+    nogil : bool, optional
+        Whether functions and methods are declared nogil by default, see
+        the 'nogil' rc option.
 
     Returns
     -------
@@ -69,7 +73,7 @@ def gencpppxd(env, exceptions=True, ts=None):
     for name, mod in env.items():
         if mod['srcpxd_filename'] is None:
             continue
-        cpppxds[name] = modcpppxd(mod, exceptions, ts=ts)
+        cpppxds[name] = modcpppxd(mod, exceptions, ts=ts, nogil=nogil)
     return cpppxds
 
 def _addotherclsnames(t, classes, name, others, ts):
@@ -123,7 +127,7 @@ def cpppxd_sorted_names(mod, ts):
     return names
 
 
-def modcpppxd(mod, exceptions=True, ts=None):
+def modcpppxd(mod, exceptions=True, ts=None, nogil=False):
     """Generates a cpp_*.pxd Cython header file for exposing a C/C++ module to
     other Cython wrappers based off of a dictionary description of the module.
 
@@ -137,6 +141,9 @@ def modcpppxd(mod, exceptions=True, ts=None):
         '+' or '-1') to apply to everywhere.
     ts : TypeSystem, optional
         A type system instance.
+    nogil : bool, optional
+        Whether functions and methods are declared nogil by default, see
+        the 'nogil' rc option.
 
     Returns
     -------
@@ -150,8 +157,8 @@ def modcpppxd(mod, exceptions=True, ts=None):
     attrs = []
     cimport_tups = set()
     classnames = _classnames_in_mod(mod, ts)
-    with ts.local_classes(classnames, frozenset(['c'])):
-        for name in cpppxd_sorted_names(mod, ts):
+    with ts.localized(classnames, frozenset(['c'])) as lts:
+        for name in cpppxd_sorted_names(mod, lts):
             desc = mod[name]
             incfiles = desc['name']['incfiles']
             if 0 == len(incfiles):
@@ -161,11 +168,11 @@ def modcpppxd(mod, exceptions=True, ts=None):
                 msg = "multiple include files found for {0}, choosing the first: {1}"
                 warnings.warn(msg.format(name, incfiles[0]), RuntimeWarning)
             if isvardesc(desc):
-                ci_tup, attr_str = varcpppxd(desc, exceptions, ts)
+                ci_tup, attr_str = varcpppxd(desc, exceptions, lts)
             elif isfuncdesc(desc):
-                ci_tup, attr_str = funccpppxd(desc, exceptions, ts)
+                ci_tup, attr_str = funccpppxd(desc, exceptions, lts, nogil)
             elif isclassdesc(desc):
-                ci_tup, attr_str = classcpppxd(desc, exceptions, ts)
+                ci_tup, attr_str = classcpppxd(desc, exceptions, lts, nogil)
             else:
                 continue
             cimport_tups |= ci_tup
@@ -217,9 +224,9 @@ def varcpppxd(desc, exceptions=True, ts=None):
          'namespace': _format_ns(desc),
          }
 
-    inc = set(['c'])
+    inc = frozenset(['c'])
     cimport_tups = set()
-    ts.cython_cimport_tuples(t, cimport_tups, inc)
+    cimport_tups |= ts.cython_cimport_set(t, inc)
 
     vlines = []
     if ts.isenum(t):
@@ -250,7 +257,7 @@ cdef extern from "{header_filename}" {namespace}:
 {extra}
 """
 
-def funccpppxd(desc, exceptions=True, ts=None):
+def funccpppxd(desc, exceptions=True, ts=None, nogil=False):
     """Generates a cpp_*.pxd Cython header snippet for exposing a C/C++ function
     to other Cython wrappers based off of a dictionary description.
 
@@ -264,6 +271,9 @@ def funccpppxd(desc, exceptions=True, ts=None):
         '+' or '-1') to apply to everywhere.
     ts : TypeSystem, optional
         A type system instance.
+    nogil : bool, optional
+        Whether functions and methods are declared nogil by default, see
+        the 'nogil' rc option.
 
     Returns
     -------
@@ -278,10 +288,11 @@ def funccpppxd(desc, exceptions=True, ts=None):
          'header_filename':  desc['name']['incfiles'][0],
          'namespace': _format_ns(desc),
          }
-    inc = set(['c'])
+    inc = frozenset(['c'])
     cimport_tups = set()
 
     flines = []
+    nogils = _nogil_flags(desc, desc['signatures'].items(), nogil, ts)
     funcitems = sorted(expand_default_args(desc['signatures'].items()))
     for fkey, frtn in funcitems:
         fname, fargs = fkey[0], fkey[1:]
@@ -294,14 +305,16 @@ def funccpppxd(desc, exceptions=True, ts=None):
             continue
         argfill = ", ".join([ts.cython_ctype(a[1]) for a in fargs])
         for a in fargs:
-            ts.cython_cimport_tuples(a[1], cimport_tups, inc)
+            cimport_tups |= ts.cython_cimport_set(a[1], inc)
         estr = _exception_str(exceptions, desc['name']['language'], frtn, ts)
+        if nogils[fkey]:
+            estr = _nogil_str(estr)
         if fname == cppname == cyname:
             line = "{0}({1}) {2}".format(fname, argfill, estr)
         else:
             line = '{0} "{1}" ({2}) {3}'.format(cyname, cppname, argfill, estr)
         rtype = ts.cython_ctype(frtn)
-        ts.cython_cimport_tuples(frtn, cimport_tups, inc)
+        cimport_tups |= ts.cython_cimport_set(frtn, inc)
         line = rtype + " " + line
         if line not in flines:
             flines.append(line)
@@ -333,7 +346,7 @@ _cpppxd_class_template = \
 {extra}
 """
 
-def classcpppxd(desc, exceptions=True, ts=None):
+def classcpppxd(desc, exceptions=True, ts=None, nogil=False):
     """Generates a cpp_*.pxd Cython header snippet for exposing a C/C++ class or
     struct to other Cython wrappers based off of a dictionary description of the
     class or struct.
@@ -348,6 +361,9 @@ def classcpppxd(desc, exceptions=True, ts=None):
         '+' or '-1') to apply to everywhere.
     ts : TypeSystem, optional
         A type system instance.
+    nogil : bool, optional
+        Whether functions and methods are declared nogil by default, see
+        the 'nogil' rc option.
 
     Returns
     -------
@@ -378,11 +394,11 @@ def classcpppxd(desc, exceptions=True, ts=None):
     else:  # C
         construct_kinds.update({'struct': 'struct'})
         d['construct_kind'] = construct_kinds[desc.get('construct', 'struct')]
-    inc = set(['c'])
+    inc = frozenset(['c'])
 
     cimport_tups = set()
     for parent in desc['parents']:
-        ts.cython_cimport_tuples(parent, cimport_tups, inc)
+        cimport_tups |= ts.cython_cimport_set(parent, inc)
 
     alines = []
     attritems = sorted(desc['attrs'].items())
@@ -395,11 +411,12 @@ def classcpppxd(desc, exceptions=True, ts=None):
         else:
             aline = "{0} {1}".format(actype, aname)
         alines.append(aline)
-        ts.cython_cimport_tuples(atype, cimport_tups, inc)
+        cimport_tups |= ts.cython_cimport_set(atype, inc)
     d['attrs_block'] = indent(alines, 8)
 
     mlines = []
     clines = []
+    nogils = _nogil_flags(desc, desc['methods'].items(), nogil, ts)
     dargs = expand_default_args(desc['methods'].items())
     methitems = sorted(x for x in dargs if isinstance(x[0][0], basestring))
     methitems += sorted(x for x in dargs if not isinstance(x[0][0], basestring))
@@ -416,12 +433,8 @@ def classcpppxd(desc, exceptions=True, ts=None):
             continue  # private or destructor
         argfill = ", ".join([ts.cython_ctype(a[1]) for a in margs])
         for a in margs:
-            ts.cython_cimport_tuples(a[1], cimport_tups, inc)
+            cimport_tups |= ts.cython_cimport_set(a[1], inc)
         estr = _exception_str(exceptions, src_lang, mrtn, ts)
-        if mname == mcppname == mcyname:
-            line = "{0}({1}) {2}".format(mname, argfill, estr)
-        else:
-            line = '{0} "{1}" ({2}) {3}'.format(mcyname, mcppname, argfill, estr)
         if mrtn is None:
             # this must be a constructor
             line = "{0}({1}) {2}".format(d['name'], argfill, estr)
@@ -429,10 +442,16 @@ def classcpppxd(desc, exceptions=True, ts=None):
                 clines.append(line)
         else:
             # this is a normal method
+            if nogils.get(mkey, False):
+                estr = _nogil_str(estr)
+            if mname == mcppname == mcyname:
+                line = "{0}({1}) {2}".format(mname, argfill, estr)
+            else:
+                line = '{0} "{1}" ({2}) {3}'.format(mcyname, mcppname, argfill, estr)
             if MATCH_REF.matches(mrtn):
                 mrtn = mrtn[0]
             rtype = ts.cython_ctype(mrtn)
-            ts.cython_cimport_tuples(mrtn, cimport_tups, inc)
+            cimport_tups |= ts.cython_cimport_set(mrtn, inc)
             line = rtype + " " + line
             if line not in mlines:
                 mlines.append(line)
@@ -530,11 +549,11 @@ def modpxd(mod, classes=(), ts=None, max_callbacks=8):
     attrs = []
     cimport_tups = set()
     classnames = _classnames_in_mod(mod, ts)
-    with ts.local_classes(classnames):
+    with ts.localized(classnames) as lts:
         for name in pxd_sorted_names(mod):
             desc = mod[name]
             if isclassdesc(desc):
-                ci_tup, attr_str = classpxd(desc, classes, ts=ts,
+                ci_tup, attr_str = classpxd(desc, classes, ts=lts,
                                             max_callbacks=max_callbacks)
             else:
                 # no need to wrap functions again
@@ -599,12 +618,12 @@ def classpxd(desc, classes=(), ts=None, max_callbacks=8):
 
     cimport_tups = set()
     for parent in desc['parents']:
-        ts.cython_cimport_tuples(parent, cimport_tups, set(['cy']))
+        cimport_tups |= ts.cython_cimport_set(parent, frozenset(['cy']))
 
     from_cpppxd = desc['srcpxd_filename'].rsplit('.', 1)[0]
     tarname = desc['name']['tarname']
     d['name_type'] = ts.cython_ctype(tarname)
-    ts.cython_cimport_tuples(tarname, cimport_tups, set(['c']))
+    cimport_tups |= ts.cython_cimport_set(tarname, frozenset(['c']))
 
     body = [] if desc['parents'] else ['cdef void * _inst', 'cdef public bint _free_inst']
     attritems = sorted(desc['attrs'].items())
@@ -614,7 +633,7 @@ def classpxd(desc, classes=(), ts=None, max_callbacks=8):
             continue  # skip private
         _, _, cachename, iscached = ts.cython_c2py(aname, atype, cache_prefix=None)
         if iscached:
-            ts.cython_cimport_tuples(atype, cimport_tups)
+            cimport_tups |= ts.cython_cimport_set(atype)
             if _isclassptr(atype, classes):
                 atype_nopred = ts.strip_predicates(atype)
                 cyt = ts.cython_cytype(atype_nopred)
@@ -645,7 +664,8 @@ def classpxd(desc, classes=(), ts=None, max_callbacks=8):
     return cimport_tups, pxd
 
 
-def genpyx(env, classes=None, ts=None, max_callbacks=8):
+def genpyx(env, classes=None, ts=None, max_callbacks=8, nogil=False,
+           array_args=False):
     """Generates all pyx Cython implementation files for an environment of modules.
 
     Parameters
@@ -661,6 +681,12 @@ def genpyx(env, classes=None, ts=None, max_callbacks=8):
         A type system instance.
     max_callbacks : int, optional
         The default maximum number of callbacks for function pointers.
+    nogil : bool, optional
+        Whether the GIL is released around calls by default, see the 'nogil'
+        rc option.
+    array_args : bool, optional
+        Whether adjacent pointer and length arguments are wrapped as arrays by
+        default, see the 'array_args' rc option.
 
     Returns
     -------
@@ -681,7 +707,8 @@ def genpyx(env, classes=None, ts=None, max_callbacks=8):
     for name, mod in env.items():
         if mod['pyx_filename'] is None:
             continue
-        pyxs[name] = modpyx(mod, classes=classes, ts=ts, max_callbacks=max_callbacks)
+        pyxs[name] = modpyx(mod, classes=classes, ts=ts, max_callbacks=max_callbacks,
+                            nogil=nogil, array_args=array_args)
     return pyxs
 
 
@@ -697,7 +724,8 @@ _pyx_mod_template = AUTOGEN_WARNING + \
 {extra}
 '''
 
-def modpyx(mod, classes=None, ts=None, max_callbacks=8):
+def modpyx(mod, classes=None, ts=None, max_callbacks=8, nogil=False,
+           array_args=False):
     """Generates a pyx Cython implementation file for exposing C/C++ data to
     other Cython wrappers based off of a dictionary description.
 
@@ -713,6 +741,12 @@ def modpyx(mod, classes=None, ts=None, max_callbacks=8):
         A type system instance.
     max_callbacks : int, optional
         The default maximum number of callbacks for function pointers.
+    nogil : bool, optional
+        Whether the GIL is released around calls by default, see the 'nogil'
+        rc option.
+    array_args : bool, optional
+        Whether adjacent pointer and length arguments are wrapped as arrays by
+        default, see the 'array_args' rc option.
 
     Returns
     -------
@@ -728,15 +762,18 @@ def modpyx(mod, classes=None, ts=None, max_callbacks=8):
     import_tups = set()
     cimport_tups = set()
     classnames = _classnames_in_mod(mod, ts)
-    with ts.local_classes(classnames):
+    with ts.localized(classnames) as lts:
         for name, desc in mod.items():
             if isvardesc(desc):
-                i_tup, ci_tup, attr_str = varpyx(desc, ts=ts)
+                i_tup, ci_tup, attr_str = varpyx(desc, ts=lts)
             elif isfuncdesc(desc):
-                i_tup, ci_tup, attr_str = funcpyx(desc, ts=ts)
+                i_tup, ci_tup, attr_str = funcpyx(desc, ts=lts, nogil=nogil,
+                                                  array_args=array_args)
             elif isclassdesc(desc):
-                i_tup, ci_tup, attr_str = classpyx(desc, classes=classes, ts=ts,
-                                                   max_callbacks=max_callbacks)
+                i_tup, ci_tup, attr_str = classpyx(desc, classes=classes, ts=lts,
+                                                   max_callbacks=max_callbacks,
+                                                   nogil=nogil,
+                                                   array_args=array_args)
             else:
                 continue
             import_tups |= i_tup
@@ -744,11 +781,11 @@ def modpyx(mod, classes=None, ts=None, max_callbacks=8):
             attrs.append(attr_str)
         # Add dispatcher for template functions
         template_funcs = _template_funcnames_in_mod(mod)
-        template_dispatcher = _gen_template_func_dispatcher(template_funcs, ts)
+        template_dispatcher = _gen_template_func_dispatcher(template_funcs, lts)
         attrs.append(template_dispatcher)
         # Add dispatcher for template classes
         template_classes = _template_classnames_in_mod(mod)
-        template_dispatcher = _gen_template_class_dispatcher(template_classes, ts)
+        template_dispatcher = _gen_template_class_dispatcher(template_classes, lts)
         attrs.append(template_dispatcher)
     import_tups.discard((mod["name"],))
     #cimport_tups.discard((mod["name"],))  # remain commented for decls
@@ -1028,8 +1065,11 @@ def _gen_argfill(args, defaults):
     return ", ".join(afill), names
 
 def _gen_function(name, name_mangled, args, rtn, defaults, ts, doc=None,
-                  inst_name="self._inst", is_method=False):
-    argfill, names = _gen_argfill(args, defaults)
+                  inst_name="self._inst", is_method=False, nogil=False,
+                  arrays=None):
+    arrays = arrays or {}
+    names = _gen_argfill(args, defaults)[1]
+    argfill = _gen_argfill(*_array_pyargs(args, defaults, arrays))[0]
     if is_method:
         argfill = "self, " + argfill
     lines  = ['def {0}({1}):'.format(name_mangled, argfill)]
@@ -1037,31 +1077,48 @@ def _gen_function(name, name_mangled, args, rtn, defaults, ts, doc=None,
     decls = []
     argbodies = []
     argrtns = {}
+    lens = set(arrays.values())
     for n,a in zip(names, args):
+        if n in arrays or n in lens:
+            continue
         adecl, abody, artn = ts.cython_py2c(n, a[1])
         if adecl is not None:
             decls += indent(adecl, join=False)
         if abody is not None:
             argbodies += indent(abody, join=False)
         argrtns[n] = artn
+    if 0 < len(arrays):
+        _gen_array_args(name, args, arrays, ts, decls, argbodies, argrtns)
     rtype_orig = ts.cython_ctype(rtn)
     rtype = rtype_orig.replace('const ', "").replace(' &', '')
     hasrtn = rtype not in set(['None', None, 'NULL', 'void'])
+    if nogil:
+        _check_nogil_type(name, 'return', None, rtn, rtype, ts)
+        for n, a in zip(names, args):
+            if n in arrays or n in lens:
+                continue  # already plain C values
+            _gen_nogil_arg(name, n, a[1], ts, decls, argbodies, argrtns)
     argvals = ', '.join(argrtns[n] for n in names)
     fcall = '{0}.{1}({2})'.format(inst_name, name, argvals)
     if hasrtn:
-        fcdecl, fcbody, fcrtn, fccached = ts.cython_c2py('rtnval', rtn, cached=False, view=False)
+        fcdecl, fcbody, fcrtn, fccached = ts.cython_c2py('rtnval', rtn, cached=False,
+                                                         view=False, move=True)
         decls += indent("cdef {0} {1}".format(rtype, 'rtnval'), join=False)
         if 'const ' in rtype_orig:
-            func_call = indent('rtnval = <{0}> {1}'.format(rtype, fcall), join=False)
+            fcall = 'rtnval = <{0}> {1}'.format(rtype, fcall)
         else:
-            func_call = indent('rtnval = {0}'.format(fcall), join=False)
+            fcall = 'rtnval = {0}'.format(fcall)
+        if nogil:
+            fcall = ['with nogil:', indent(fcall)]
+        func_call = indent(fcall, join=False)
         if fcdecl is not None:
             decls += indent(fcdecl, join=False)
         if fcbody is not None:
             func_call += indent(fcbody, join=False)
         func_rtn = indent("return {0}".format(fcrtn), join=False)
     else:
+        if nogil:
+            fcall = ['with nogil:', indent(fcall)]
         func_call = indent(fcall, join=False)
         func_rtn = []
     lines += decls
@@ -1131,25 +1188,45 @@ def _gen_constructor(name, name_mangled, classname, args, defaults, ts,
     lines += ['', ""]
     return lines
 
-def _gen_dispatcher(name, name_mangled, ts, doc=None, hasrtn=True, is_method=True):
-    argfill = ", ".join(['self', '*args', '**kwargs'])
+def _gen_dispatcher(name, name_mangled, ts, doc=None, hasrtn=True, is_method=True,
+                    arrays=None):
+    arrays = arrays or {}
+    cache_name = "_dispatch_" + name
     if is_method is True:
         # string to format for arg checking
         arg_chk_str = "if types <= self.{0}_argtypes:"
 
-        # string to format for dispatching and returning
-        dispatch_str_ret = "return self.{0}(*args, **kwargs)"
-        dispatch_str_no_ret = "self.{0}(*args, **kwargs)"
+        # string to format for dispatching, methods are memoized by name
+        dispatch_str = "self.{0}(*args, **kwargs)"
+        cached_str = "getattr(self, f)(*args)"
+        memo_val_str = '"{0}"'
+        cache = "self." + cache_name
 
         # Make self a method argument or not
         argfill = ", ".join(['self', '*args', '**kwargs'])
     else:
         arg_chk_str = "if types <= {0}_argtypes:"
-        dispatch_str_ret = "return {0}(*args, **kwargs)"
-        dispatch_str_no_ret = "{0}(*args, **kwargs)"
+        dispatch_str = "{0}(*args, **kwargs)"
+        cached_str = "f(*args)"
+        memo_val_str = "{0}"
+        cache = cache_name
         argfill = ", ".join(['*args', '**kwargs'])
+    rtn = (lambda call: "return " + call) if hasrtn else \
+          (lambda call: [call, "return"])
+    memo_str = "{0}[key] = {1}".format(cache, memo_val_str)
+    memo_lines = lambda mname: ["if key is not None:",
+                                indent(memo_str.format(mname))]
     lines  = ['def {0}({1}):'.format(name, argfill)]
     lines += [] if doc is None else indent('\"\"\"{0}\"\"\"'.format(doc), join=False)
+    fast = ["# positional calls with previously seen types skip the search",
+            "if kwargs:",
+            indent("key = None"),
+            "else:",
+            indent("key = tuple([type(a) for a in args])"),
+            indent("f = {0}.get(key, None)".format(cache)),
+            indent("if f is not None:"),]
+    fast += indent(indent(rtn(cached_str), join=False), join=False)
+    lines += indent(fast, join=False)
     types = ["types = set([(i, type(a)) for i, a in enumerate(args)])",
              "types.update([(k, type(v)) for k, v in kwargs.items()])",]
     lines += indent(types, join=False)
@@ -1159,33 +1236,31 @@ def _gen_dispatcher(name, name_mangled, ts, doc=None, hasrtn=True, is_method=Tru
     mtypeslines = []
     lines += indent("# vtable-like dispatch for exactly matching types", join=False)
     for key, mangled_name in mangitems:
-        cargs = key[1:]
+        karrays = arrays.get(key, {})
+        cargs = [ca for ca in key[1:] if ca[0] not in karrays.values()]
         arang = range(len(cargs))
         anames = [ca[0] for ca in cargs]
-        pytypes = [ts.cython_pytype(ca[1]) for ca in cargs]
+        pytypes = ['np.ndarray' if ca[0] in karrays else ts.cython_pytype(ca[1])
+                   for ca in cargs]
         mtypes = ", ".join(
             ["({0}, {1})".format(i, pyt) for i, pyt in zip(arang, pytypes)] + \
             ['("{0}", {1})'.format(n, pyt) for n, pyt in zip(anames, pytypes)])
         mtups = '(' + mtypes + ')' if 0 < len(mtypes) else mtypes
         mtypeslines.append(mangled_name + "_argtypes = frozenset(" + mtups + ")")
         cond = [arg_chk_str.format(mangled_name),]
-        if hasrtn:
-            rline = dispatch_str_ret.format(mangled_name)
-        else:
-            rline = [dispatch_str_no_ret.format(mangled_name), "return"]
-        cond += indent(rline, join=False)
+        cond += indent(memo_lines(mangled_name), join=False)
+        cond += indent(rtn(dispatch_str.format(mangled_name)), join=False)
         lines += indent(cond, join=False)
-    lines = sorted(mtypeslines) + [''] +  lines
+    lines = sorted(mtypeslines) + [cache_name + " = {}", ''] +  lines
     lines += indent("# duck-typed dispatch based on whatever works!", join=False)
     refineopp = lambda x: (-1*sum([int(ts.isrefinement(a[1])) for a in x[0][1:]]), len(x[0]), x[1])
     mangitems = sorted(name_mangled.items(), key=refineopp)
     for key, mangled_name in mangitems:
+        # the types of the arguments do not determine which of these succeeds,
+        # so the winner is never memoized
         lines += indent('try:', join=False)
-        if hasrtn:
-            rline = dispatch_str_ret.format(mangled_name)
-        else:
-            rline = [dispatch_str_no_ret.format(mangled_name), "return"]
-        lines += indent(indent(rline, join=False), join=False)
+        lines += indent(indent(rtn(dispatch_str.format(mangled_name)),
+                               join=False), join=False)
         lines += indent(["except (RuntimeError, TypeError, NameError):",
                          indent("pass", join=False)[0],], join=False)
     errmsg = "raise RuntimeError('method {0}() could not be dispatched')".format(name)
@@ -1262,7 +1337,8 @@ cdef class {name}{parents}:
 {extra}
 '''
 
-def classpyx(desc, classes=None, ts=None, max_callbacks=8):
+def classpyx(desc, classes=None, ts=None, max_callbacks=8, nogil=False,
+             array_args=False):
     """Generates a ``*.pyx`` Cython wrapper implementation for exposing a C/C++
     class based off of a dictionary description.  The environment is a
     dictionary of all class names known to their descriptions.
@@ -1279,6 +1355,12 @@ def classpyx(desc, classes=None, ts=None, max_callbacks=8):
         A type system instance.
     max_callbacks : int, optional
         The default maximum number of callbacks for function pointers.
+    nogil : bool, optional
+        Whether the GIL is released around calls by default, see the 'nogil'
+        rc option.
+    array_args : bool, optional
+        Whether adjacent pointer and length arguments are wrapped as arrays by
+        default, see the 'array_args' rc option.
 
     Returns
     -------
@@ -1307,11 +1389,13 @@ def classpyx(desc, classes=None, ts=None, max_callbacks=8):
     import_tups = set()
     cimport_tups = set()
     for parent in desc['parents']:
-        ts.cython_import_tuples(parent, import_tups)
-        ts.cython_cimport_tuples(parent, cimport_tups)
+        import_tups |= ts.cython_import_set(parent)
+        cimport_tups |= ts.cython_cimport_set(parent)
 
     cdefattrs = []
     mc = desc.get('extra', {}).get('max_callbacks', max_callbacks)
+    nogil = desc.get('extra', {}).get('nogil', nogil)
+    array_args = desc.get('extra', {}).get('array_args', array_args)
 
     alines = []
     pdlines = []
@@ -1333,8 +1417,8 @@ def classpyx(desc, classes=None, ts=None, max_callbacks=8):
         else:
             alines += _gen_property(aname, atype, ts, adoc, cached_names=cached_names,
                                     inst_name=inst_name, classes=classes)
-        ts.cython_import_tuples(atype, import_tups)
-        ts.cython_cimport_tuples(atype, cimport_tups)
+        import_tups |= ts.cython_import_set(atype)
+        cimport_tups |= ts.cython_cimport_set(atype)
     if len(fplines) > 0:
         fplines.append("_MAX_CALLBACKS_{0} = {1}".format(name, mc))
     d['attrs_block'] = indent(alines)
@@ -1347,6 +1431,7 @@ def classpyx(desc, classes=None, ts=None, max_callbacks=8):
     methcounts = _count0(desc['methods'])
     currcounts = dict([(k, 0) for k in methcounts])
     mangled_mnames = {}
+    marrays = {}
     mitems = list(desc['methods'].items())
     methitems = sorted(x for x in mitems if isinstance(x[0][0], basestring))
     methitems += sorted(x for x in mitems if not isinstance(x[0][0], basestring))
@@ -1368,12 +1453,12 @@ def classpyx(desc, classes=None, ts=None, max_callbacks=8):
         currcounts[mname] += 1
         mangled_mnames[mkey] = mname_mangled
         for a in margs:
-            ts.cython_import_tuples(a[1], import_tups)
-            ts.cython_cimport_tuples(a[1], cimport_tups)
+            import_tups |= ts.cython_import_set(a[1])
+            cimport_tups |= ts.cython_cimport_set(a[1])
         minst_name, mcname = _method_instance_names(desc, classes, mkey, mrtn, ts)
         if mcname != d['name']:
-            ts.cython_import_tuples(mcname, import_tups)
-            ts.cython_cimport_tuples(mcname, cimport_tups)
+            import_tups |= ts.cython_import_set(mcname)
+            cimport_tups |= ts.cython_cimport_set(mcname)
         if mrtn is None:
             # this must be a constructor
             if mname not in (d['name'], '__init__',
@@ -1403,19 +1488,26 @@ def classpyx(desc, classes=None, ts=None, max_callbacks=8):
                 clines += _gen_dispatcher('__init__', nm, ts, doc=mdoc, hasrtn=False)
         else:
             # this is a normal method
-            ts.cython_import_tuples(mrtn, import_tups)
-            ts.cython_cimport_tuples(mrtn, cimport_tups)
+            import_tups |= ts.cython_import_set(mrtn)
+            cimport_tups |= ts.cython_cimport_set(mrtn)
+            marrays[mkey] = _array_args(mcyname, margs, mval, ts, array_args)
+            if 0 < len(marrays[mkey]):
+                import_tups.add(('numpy', 'as', 'np'))
             mdoc = desc.get('docstrings', {}).get('methods', {})\
                                              .get(mname, nodocmsg.format(mname))
-            mdoc = _doc_add_sig(mdoc, mcyname, margs, mdefs)
+            mdoc = _doc_add_sig(mdoc, mcyname,
+                                *_array_pyargs(margs, mdefs, marrays[mkey]))
             mlines += _gen_function(mcyname, mname_mangled, margs, mrtn, mdefs,
                                     ts, mdoc, inst_name=minst_name,
-                                    is_method=True)
+                                    is_method=True,
+                                    nogil=_nogil_flag(mkey, mval, nogil, ts),
+                                    arrays=marrays[mkey])
             if 1 < methcounts[mname] and currcounts[mname] == methcounts[mname]:
                 # write dispatcher
                 nm = dict([(k, v) for k, v in mangled_mnames.items() \
                            if k[0] == mbasename])
-                mlines += _gen_dispatcher(mcyname, nm, ts, doc=mdoc)
+                mlines += _gen_dispatcher(mcyname, nm, ts, doc=mdoc,
+                                          arrays=marrays)
     if 0 == len(desc['methods']) or 0 == len(clines):
         # provide a default constructor
         mdocs = desc.get('docstrings', {}).get('methods', {})
@@ -1496,7 +1588,7 @@ def varpyx(desc, ts=None):
     return import_tups, cimport_tups, pyx
 
 
-def funcpyx(desc, ts=None):
+def funcpyx(desc, ts=None, nogil=False, array_args=False):
     """Generates a ``*.pyx`` Cython wrapper implementation for exposing a C/C++
     function based off of a dictionary description.
 
@@ -1506,6 +1598,12 @@ def funcpyx(desc, ts=None):
         function description dictonary.
     ts : TypeSystem, optional
         A type system instance.
+    nogil : bool, optional
+        Whether the GIL is released around calls by default, see the 'nogil'
+        rc option.
+    array_args : bool, optional
+        Whether adjacent pointer and length arguments are wrapped as arrays by
+        default, see the 'array_args' rc option.
 
     Returns
     -------
@@ -1516,6 +1614,8 @@ def funcpyx(desc, ts=None):
     ts = ts or TypeSystem()
     nodocmsg = "no docstring for {0}, please file a bug report!"
     inst_name = desc['extra']['srcpxd_filename'].rsplit('.', 1)[0]
+    nogil = desc['extra'].get('nogil', nogil)
+    array_args = desc['extra'].get('array_args', array_args)
 
     import_tups = set()
     cimport_tups = set(((inst_name,),))
@@ -1528,6 +1628,7 @@ def funcpyx(desc, ts=None):
     funccounts = _count0(desc['signatures'])
     currcounts = dict([(k, 0) for k in funccounts])
     mangled_fnames = {}
+    farrays = {}
     funcitems = sorted(desc['signatures'].items())
     for fkey, fval in funcitems:
         fname, fargs = fkey[0], fkey[1:]
@@ -1548,18 +1649,26 @@ def funcpyx(desc, ts=None):
         currcounts[fname] += 1
         mangled_fnames[fkey] = fname_mangled
         for a in fargs:
-            ts.cython_import_tuples(a[1], import_tups)
-            ts.cython_cimport_tuples(a[1], cimport_tups)
-        ts.cython_import_tuples(frtn, import_tups)
-        ts.cython_cimport_tuples(frtn, cimport_tups)
+            import_tups |= ts.cython_import_set(a[1])
+            cimport_tups |= ts.cython_cimport_set(a[1])
+        import_tups |= ts.cython_import_set(frtn)
+        cimport_tups |= ts.cython_cimport_set(frtn)
+        farrays[fkey] = _array_args(fcyname, fargs, fval, ts, array_args)
+        if 0 < len(farrays[fkey]):
+            import_tups.add(('numpy', 'as', 'np'))
         fdoc = desc.get('docstring', nodocmsg.format(fcyname))
-        fdoc = _doc_add_sig(fdoc, fcyname, fargs, fdefs, ismethod=False)
+        fdoc = _doc_add_sig(fdoc, fcyname,
+                            *_array_pyargs(fargs, fdefs, farrays[fkey]),
+                            ismethod=False)
         flines += _gen_function(fcyname, fname_mangled, fargs, frtn, fdefs, ts,
-                                fdoc, inst_name=inst_name, is_method=False)
+                                fdoc, inst_name=inst_name, is_method=False,
+                                nogil=_nogil_flag(fkey, fval, nogil, ts),
+                                arrays=farrays[fkey])
         if 1 < funccounts[fname] and currcounts[fname] == funccounts[fname]:
             # write dispatcher
             nm = dict([(k, v) for k, v in mangled_fnames.items() if k[0] == fname])
-            flines += _gen_dispatcher(fcytopname, nm, ts, doc=fdoc, is_method=False)
+            flines += _gen_dispatcher(fcytopname, nm, ts, doc=fdoc, is_method=False,
+                                      arrays=farrays)
     flines.append(desc.get('extra', {}).get('pyx', ''))
     pyx = '\n'.join(flines)
     extra = desc['extra']
@@ -1578,15 +1687,28 @@ class XDressPlugin(Plugin):
     requires = ('xdress.autodescribe',)
     """This plugin requires autodescribe."""
 
-    defaultrc = {'max_callbacks': 8}
+    defaultrc = {'max_callbacks': 8, 'nogil': False, 'array_args': False}
 
     rcdocs = {
+        "array_args": ("Wrap pointer arguments which are directly followed by an "
+                       "integer length argument (n, size, len, count, etc.) as "
+                       "contiguous arrays, such as numpy arrays.  Individual "
+                       "signatures may instead map pointer names to length names "
+                       "with an 'arrays' entry."),
         "max_callbacks": "The maximum number of callbacks for function pointers",
+        "nogil": ("Release the GIL around calls to all wrapped functions and "
+                  "methods whose types allow it, warning about the others.  "
+                  "Individual signatures and descriptions may also set "
+                  "'nogil'."),
         }
 
     def update_argparser(self, parser):
         parser.add_argument('--max-callbacks', type=int, dest="max_callbacks",
                     help=self.rcdocs["max_callbacks"])
+        parser.add_argument('--nogil', action='store_true', dest="nogil",
+                    help=self.rcdocs["nogil"])
+        parser.add_argument('--array-args', action='store_true', dest="array_args",
+                    help=self.rcdocs["array_args"])
 
     def setup(self, rc):
         if rc.max_callbacks < 1:
@@ -1608,9 +1730,10 @@ class XDressPlugin(Plugin):
                     classes[name] = desc
 
         # generate all files
-        cpppxds = gencpppxd(env, ts=rc.ts)
+        cpppxds = gencpppxd(env, ts=rc.ts, nogil=rc.nogil)
         pxds = genpxd(env, classes, ts=rc.ts, max_callbacks=rc.max_callbacks)
-        pyxs = genpyx(env, classes, ts=rc.ts, max_callbacks=rc.max_callbacks)
+        pyxs = genpyx(env, classes, ts=rc.ts, max_callbacks=rc.max_callbacks,
+                      nogil=rc.nogil, array_args=rc.array_args)
 
         # write out all files
         for key, cpppxd in cpppxds.items():
@@ -1690,6 +1813,214 @@ def _exception_str(exceptions, lang, rtntype, ts):
     else:
         return ""
 
+def _nogil_flags(desc, items, nogil=False, ts=None):
+    """Maps each signature in items, with its default arguments expanded, to
+    whether the GIL is released around calls to it, see _nogil_flag().
+    """
+    default = desc.get('extra', {}).get('nogil', nogil)
+    flags = {}
+    for key, val in items:
+        flag = _nogil_flag(key, val, default, ts)
+        for ekey, _ in expand_default_args([(key, val)]):
+            flags[ekey] = flags.get(ekey, False) or flag
+    return flags
+
+def _nogil_flag(key, val, default, ts=None):
+    """Whether the GIL is released around calls to the signature key.
+    Signatures may set this with a 'nogil' entry, otherwise the default (the
+    description's extra 'nogil' value or the 'nogil' rc option) is used.  Only
+    an explicit entry insists on signatures whose types require Python objects,
+    a default merely warns and keeps the GIL for them.
+    """
+    if 'nogil' in val:
+        return bool(val['nogil'])
+    if not default:
+        return False
+    ts = ts or TypeSystem()
+    name = key[0] if isinstance(key[0], basestring) else key[0][0]
+    rtn = val.get('return', None)
+    whats = [('argument ' + a[0], a[0], a[1]) for a in key[1:]]
+    if rtn is not None:
+        whats.append(('return', None, rtn))
+    for what, n, t in whats:
+        problem = _nogil_problem(n, t, ts.cython_ctype(t), ts)
+        if problem is not None:
+            msg = "keeping the GIL when calling {0}(), the {1} type {2!r} {3}"
+            warnings.warn(msg.format(name, what, t, problem), RuntimeWarning)
+            return False
+    return True
+
+def _nogil_str(estr):
+    return "nogil " + estr if estr else "nogil"
+
+def _nogil_problem(n, t, ctype, ts):
+    """Returns why the GIL may not be released around a call with an argument
+    n (or a return value, if n is None) of type t, or None if it may be.
+    """
+    if ts.isfunctionpointer(t) or \
+       ctype.replace('const ', "").replace(' &', '') == 'object':
+        return "requires Python objects"
+    if n is not None and ctype.endswith(' &') and \
+       not ctype.startswith('const ') and _nogil_needs_temp(n, t, ts):
+        return "is a non-const reference whose value would be copied"
+    return None
+
+def _check_nogil_type(name, what, n, t, ctype, ts):
+    problem = _nogil_problem(n, t, ctype, ts)
+    if problem is not None:
+        msg = "cannot release the GIL when calling {0}(), the {1} type {2!r} {3}"
+        raise TypeError(msg.format(name, what, t, problem))
+
+_cdef_names = re.compile(r'^\s*cdef\s+[^=]*?(\w+)\s*(?:=.*)?$', re.M)
+_assigned_names = re.compile(r'^\s*(\w+)\s*=(?!=)', re.M)
+
+def _nogil_needs_temp(n, t, ts):
+    """Whether the converted value of argument n refers to Python objects, such
+    as casts of the argument itself, and so must be stored in a C temporary
+    before the GIL is released.  Names declared with cdef in the conversion
+    are C variables, while the argument and anything else assigned in the
+    conversion are taken to be Python objects.
+    """
+    adecl, abody, artn = ts.cython_py2c(n, t)
+    cdefs = set(_cdef_names.findall(adecl or ''))
+    pynames = set([n]) | set(_assigned_names.findall(abody or ''))
+    pynames -= cdefs
+    return any([re.search(r'(?<![\w.]){0}\b'.format(pn), artn) for pn in pynames])
+
+def _gen_nogil_arg(name, n, t, ts, decls, argbodies, argrtns):
+    """Ensures that the converted value of argument n may be used without the
+    GIL, see _nogil_needs_temp().  Non-const references are never copied
+    into a temporary, since that would hide changes from the caller, so those
+    which would need one raise a TypeError like other types which cannot be
+    made GIL-free.
+    """
+    ctype = ts.cython_ctype(t)
+    _check_nogil_type(name, 'argument ' + n, n, t, ctype, ts)
+    if not _nogil_needs_temp(n, t, ts):
+        return
+    tmp = n + '_nogil'
+    ctype = ctype.replace('const ', "").replace(' &', '')
+    decls += indent("cdef {0} {1}".format(ctype, tmp), join=False)
+    argbodies += indent("{0} = {1}".format(tmp, argrtns[n]), join=False)
+    argrtns[n] = tmp
+
+# element types which may be viewed in place, complex numbers are left out since
+# their buffer formats do not match the extra_types struct
+_array_elem_nptypes = frozenset(['np.NPY_UBYTE', 'np.NPY_INT16', 'np.NPY_INT32',
+                                 'np.NPY_INT64', 'np.NPY_UINT16', 'np.NPY_UINT32',
+                                 'np.NPY_UINT64', 'np.NPY_FLOAT32',
+                                 'np.NPY_FLOAT64'])
+_array_len_types = frozenset(['int16', 'int32', 'int64', 'uint16', 'uint32',
+                              'uint64'])
+_array_len_names = re.compile(r'^(?:n|n[a-z]|nelems?|num|len|length|size|count|'
+                              r'n_\w+|num_?\w+|\w+_(?:len|length|size|count))$')
+
+def _unconst(t):
+    if not isinstance(t, basestring) and 2 == len(t) and t[1] == 'const':
+        return t[0]
+    return t
+
+def _array_elem(t, ts):
+    """Returns the (element type, is const) of a pointer argument which may
+    be passed as an array, or None if it may not be.
+    """
+    if t is None:
+        return None
+    t = ts.canon(t)
+    if isinstance(t, basestring) or 2 != len(t) or t[1] != '*':
+        return None
+    elem = _unconst(t[0])
+    if not isinstance(elem, basestring) or \
+       ts.cython_nptype(elem) not in _array_elem_nptypes:
+        return None
+    return elem, elem is not t[0]
+
+def _array_args(name, args, val, ts, array_args=False):
+    """Maps the names of pointer arguments which are wrapped as contiguous
+    arrays to the names of the integer arguments holding their lengths.
+    Signatures may give this explicitly with an 'arrays' entry, otherwise
+    when array_args is true, a pointer followed by an integer argument named
+    like a length (n, size, len, count, etc.) is paired up automatically.
+    """
+    types = dict(args)
+    arrays = val.get('arrays', None)
+    if arrays is not None:
+        for p, l in arrays.items():
+            if _array_elem(types.get(p, None), ts) is None:
+                raise ValueError("the array argument {0!r} of {1}() is not a "
+                                 "pointer to a numeric type".format(p, name))
+            if l not in types or \
+               _unconst(ts.canon(types[l])) not in _array_len_types:
+                raise ValueError("the length argument {0!r} of {1}() is not an "
+                                 "integer".format(l, name))
+        return dict(arrays)
+    arrays = {}
+    if not array_args:
+        return arrays
+    for (p, pt), (l, lt) in zip(args[:-1], args[1:]):
+        if not p or _array_elem(pt, ts) is None or lt is None or \
+           _array_len_names.match(l or '') is None:
+            continue
+        if _unconst(ts.canon(lt)) in _array_len_types:
+            arrays[p] = l
+    return arrays
+
+def _array_pyargs(args, defaults, arrays):
+    """Returns the arguments, and their defaults, seen from Python.  Lengths
+    of array arguments are left out since they come from the arrays.
+    """
+    lens = set(arrays.values())
+    keep = [a[0] not in lens for a in args]
+    args = tuple([a for a, k in zip(args, keep) if k])
+    defaults = tuple([d for d, k in zip(defaults, keep) if k])
+    return args, defaults
+
+def _gen_array_args(name, args, arrays, ts, decls, argbodies, argrtns):
+    """Converts the array arguments of a function to typed memoryviews of
+    contiguous buffers, such as numpy arrays, whose data pointers and lengths
+    are passed to the C/C++ function without any copies.  Pointers to const
+    accept read-only buffers, while the C/C++ function may write through other
+    pointers.  None is passed as a NULL pointer of length zero.  Arrays which
+    are too long for the C type of their length raise an OverflowError.
+    """
+    types = dict(args)
+    lens = {}
+    for n, _ in args:
+        if n not in arrays:
+            continue
+        elem, isconst = _array_elem(types[n], ts)
+        ctype = ("const " if isconst else "") + ts.cython_ctype(elem)
+        l = arrays[n]
+        view = n + '_view'
+        ptr = n + '_ptr'
+        size = "(0 if {0} is None else {0}.shape[0])".format(view)
+        decls += indent(["cdef {0}[::1] {1}".format(ctype, view),
+                         "cdef {0} * {1} = NULL".format(ctype, ptr)], join=False)
+        body = ["# {0} is a contiguous array of {1} elements".format(n, l),
+                "{0} = {1}".format(view, n),
+                "if {0} is not None and 0 < {0}.shape[0]:".format(view),
+                indent("{0} = &{1}[0]".format(ptr, view))]
+        if l in lens:
+            # arrays sharing a length must agree with the first of them
+            lenvar, first = lens[l]
+            msg = "{0}() arrays {1} and {2} must have the same length"
+            body += ["if {0} != {1}:".format(size, lenvar),
+                     indent("raise ValueError({0!r})".format(msg.format(name,
+                                                                first, n)))]
+        else:
+            lenvar = l + '_len'
+            lens[l] = (lenvar, n)
+            lctype = ts.cython_ctype(_unconst(ts.canon(types[l])))
+            decls += indent("cdef Py_ssize_t {0}".format(lenvar), join=False)
+            body.append("{0} = {1}".format(lenvar, size))
+            msg = "{0}() array {1} has too many elements for its length {2}"
+            body += ["if <Py_ssize_t> (<{0}> {1}) != {1}:".format(lctype, lenvar),
+                     indent("raise OverflowError({0!r})".format(msg.format(name,
+                                                                   n, l)))]
+            argrtns[l] = "<{0}> {1}".format(lctype, lenvar)
+        argbodies += indent(body, join=False)
+        argrtns[n] = ptr
+
 def _template_method_names(methods):
     methnames = set()
     for sig, val in methods.items():
@@ -129,7 +129,7 @@ from __future__ import print_function
 import sys
 import collections
 from .utils import isclassdesc, NotSpecified
-from .types.matching import TypeMatcher
+from .types.matching import TypeMatcher, TypeMatcherIndex
 from .plugins import Plugin
 
 if sys.version_info[0] >= 3:
@@ -140,51 +140,39 @@ def modify_desc(skips, desc):
 
     Parameters
     ----------
-    skips : dict or list
+    skips : list or TypeMatcherIndex
         The attribute rc.skiptypes from the run controller managing
         the desc dictionary. This is filled with
         xdress.types.system.TypeMatcher objects and should have been
-        populated as such by xdress.descfilter.setup
+        populated as such by xdress.descfilter.setup.  A list is indexed
+        here, so pass an index when filtering many descriptions.
 
     desc : dictionary
         The class dictionary that is to be altered or tested to see
         if any methods need to be removed.
 
     """
+    if not isinstance(skips, TypeMatcherIndex):
+        skips = TypeMatcherIndex(skips)
+
     # remove attrs with bad types
     for at_name, at_t in desc['attrs'].copy().items():
-        for tm in skips:
-            if tm.flatmatches(at_t):
-                del desc['attrs'][at_name]
-                break
+        if skips.flatmatches(at_t):
+            del desc['attrs'][at_name]
 
     # remove methods with bad parameter types or return types
     for m_key, m_ret in desc['methods'].copy().items():
-        _deleted = False
         # Check return types
-        for tm in skips:
-            if m_ret and tm.flatmatches(m_ret['return']):
-                del desc['methods'][m_key]
-                _deleted = True
-                break
-
-        # Stop here if we already got it
-        if _deleted:
+        if m_ret and skips.flatmatches(m_ret['return']):
+            del desc['methods'][m_key]
             continue
 
         m_args = m_key[1:]
 
         for arg in m_args:
             t = arg[1]  # Just use type, not parameter name or default val
-            for tm in skips:
-                # c1 = tm.flatmatches(t)
-                # c2 =
-                if tm.flatmatches(t):
-                    del desc['methods'][m_key]
-                    _deleted = True
-                    break
-
-            if _deleted:
+            if skips.flatmatches(t):
+                del desc['methods'][m_key]
                 break
 
 
@@ -230,19 +218,24 @@ class XDressPlugin(Plugin):
         print("descfilter: removing unwanted types from desc dictionary")
         if isinstance(rc.skiptypes, collections.Mapping):
             skip_classes = rc.skiptypes.keys()
+            indexes = {}
             for mod_key, mod in rc.env.items():
                 for kls_key, desc in mod.items():
                     if isclassdesc(desc):
                         if desc['name']['tarname'] in skip_classes:
                             # Pull out skiptypes
-                            skips = rc.skips[desc['name']['tarname']]
+                            skips = indexes.get(desc['name']['tarname'], None)
+                            if skips is None:
+                                skips = rc.skiptypes[desc['name']['tarname']]
+                                skips = TypeMatcherIndex(skips)
+                                indexes[desc['name']['tarname']] = skips
                             # let modify_desc remove unwanted methods
                             modify_desc(skips, desc)
         elif isinstance(rc.skiptypes, collections.Sequence):
+            skips = TypeMatcherIndex(rc.skiptypes)
             for mod_key, mod in rc.env.items():
                 for kls_key, desc in mod.items():
                     if isclassdesc(desc):
-                        skips = rc.skiptypes
                         modify_desc(skips, desc)
 
     def skip_methods(self, rc):
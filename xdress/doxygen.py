@@ -91,7 +91,7 @@ import sys
 from textwrap import TextWrapper
 
 from .plugins import Plugin
-from .types.matching import TypeMatcher, MatchAny
+from .types.matching import TypeMatcher, TypeMatcherIndex, MatchAny
 from .utils import newoverwrite, parse_template
 
 # XML conditional imports
@@ -1010,12 +1010,12 @@ class XDressPlugin(Plugin):
     def _process_dox(self, rc, xml_dir):
         """Process the dOxygen files."""
         classes, funcs = parse_index_xml(os.path.join(xml_dir, 'index.xml'))
-        tm_classes = {}
+        tm_classes = TypeMatcherIndex()
         for i in classes.keys():
             parsed_class = parse_template(i)
             if isinstance(parsed_class, basestring):
                 # This happens when it isn't a template type
-                tm_classes[i] = TypeMatcher(i)
+                tm_classes.add(TypeMatcher(i), i)
             else:  # It should now be a tuple
                 # Replace template identifiers with MatchAny
                 p_list = []
@@ -1032,7 +1032,7 @@ class XDressPlugin(Plugin):
                     else:
                         p_list.append(item)
 
-                tm_classes[i] = TypeMatcher(tuple(p_list))
+                tm_classes.add(TypeMatcher(tuple(p_list)), i)
         return funcs, classes, tm_classes
 
     def execute(self, rc):
@@ -1058,10 +1058,9 @@ class XDressPlugin(Plugin):
                 this_kls = classes[kls]
             else:
                 # See if maybe this is a template type...
-                for key, val in tm_classes.items():
-                    if val.matches(kls):
-                        this_kls = classes[key]
-                        break
+                key = tm_classes.first(kls)
+                if key is not None:
+                    this_kls = classes[key]
                 else:
                     print(fail_msg.format(tt='class', name=kls))
                 continue
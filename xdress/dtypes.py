@@ -418,18 +418,18 @@ def genpyx(types, header=None, ts=None):
     ts = ts or TypeSystem()
     """Returns a string of a pyx file representing the given types."""
     pyx = _pyxheader if header is None else header
-    with ts.swap_dtypes(None):
+    with ts.localized(dtypes=None) as lts:
         import_tups = set()
         cimport_tups = set()
         for t in types:
-            ts.cython_import_tuples(t, import_tups)
-            ts.cython_cimport_tuples(t, cimport_tups)
-        imports = "\n".join(ts.cython_import_lines(import_tups))
-        cimports = "\n".join(ts.cython_cimport_lines(cimport_tups))
-        pyx = pyx.format(extra_types=ts.extra_types, cimports=cimports, 
+            import_tups |= lts.cython_import_set(t)
+            cimport_tups |= lts.cython_cimport_set(t)
+        imports = "\n".join(lts.cython_import_lines(import_tups))
+        cimports = "\n".join(lts.cython_cimport_lines(cimport_tups))
+        pyx = pyx.format(extra_types=lts.extra_types, cimports=cimports, 
                          imports=imports)
         for t in types:
-            pyx += genpyx_dtype(t, ts=ts) + "\n\n" 
+            pyx += genpyx_dtype(t, ts=lts) + "\n\n" 
     return pyx
 
 
@@ -590,12 +590,12 @@ def genpxd(types, header=None, ts=None):
     """Returns a string of a pxd file representing the given dtypes."""
     ts = ts or TypeSystem()
     pxd = _pxdheader if header is None else header
-    with ts.swap_dtypes(None):
+    with ts.localized(dtypes=None) as lts:
         cimport_tups = set()
         for t in types:
-            ts.cython_cimport_tuples(t, cimport_tups, set(['c']))
-        cimports = "\n".join(ts.cython_cimport_lines(cimport_tups))
-        pxd = pxd.format(extra_types=ts.extra_types, cimports=cimports)
+            cimport_tups |= lts.cython_cimport_set(t, frozenset(['c']))
+        cimports = "\n".join(lts.cython_cimport_lines(cimport_tups))
+        pxd = pxd.format(extra_types=lts.extra_types, cimports=cimports)
     for t in types:
         pxd += genpxd_dtype(t, ts=ts) + "\n\n" 
     return pxd
@@ -24,7 +24,7 @@ This has the following usage::
                                 [-I INCLUDES [INCLUDES ...]]
                                 [-D DEFINES [DEFINES ...]]
                                 [-U UNDEFINES [UNDEFINES ...]] [-p PARSERS]
-                                [--clear-parser-cache-period CLEAR_PARSER_CACHE_PERIOD]
+                                [--parser-cache-mb MB]
                                 [--dumpast FILE] [--max-callbacks MAX_CALLBACKS]
                                 [--extra-types EXTRA_TYPES] [--make-extra-types]
                                 [--no-make-extra-types]
@@ -55,10 +55,9 @@ This has the following usage::
       -U UNDEFINES [UNDEFINES ...], --undefines UNDEFINES [UNDEFINES ...]
                             Unset additional macro definitions
       -p PARSERS            Parser(s) name, list, or dict
-      --clear-parser-cache-period CLEAR_PARSER_CACHE_PERIOD
-                            Number of parser calls to perform before clearing the
-                            internal cache. This prevents nasty memory overflow
-                            issues.
+      --parser-cache-mb MB  Estimated memory budget, in MB, for the cache of
+                            parsed files. The least recently used parses are
+                            evicted when this is exceeded. None means unbounded.
       --dumpast FILE        Prints the abstract syntax tree of a file.
       --max-callbacks MAX_CALLBACKS
                             The maximum number of callbacks for function pointers
@@ -15,6 +15,7 @@ import pprint
 
 from .plugins import Plugin
 from .types.system import TypeSystem
+from .types.parsing import parse_type
 from .utils import newoverwrite, newcopyover, ensuredirs, indent, indentstr, \
     RunControl, NotSpecified
 
@@ -787,19 +788,19 @@ def genpyx(template, header=None, ts=None):
     pyxfuncs = dict([(k[7:], v) for k, v in globals().items() \
                     if k.startswith('genpyx_') and callable(v)])
     pyx = _pyxheader if header is None else header
-    with ts.swap_stlcontainers(None):
+    with ts.localized(stlcontainers=None) as lts:
         import_tups = set()
         cimport_tups = set()
         for t in template:
             for arg in t[1:]:
-                ts.cython_import_tuples(arg, import_tups)
-                ts.cython_cimport_tuples(arg, cimport_tups)
-        imports = "\n".join(ts.cython_import_lines(import_tups))
-        cimports = "\n".join(ts.cython_cimport_lines(cimport_tups))
-        pyx = pyx.format(extra_types=ts.extra_types, cimports=cimports, 
+                import_tups |= lts.cython_import_set(arg)
+                cimport_tups |= lts.cython_cimport_set(arg)
+        imports = "\n".join(lts.cython_import_lines(import_tups))
+        cimports = "\n".join(lts.cython_cimport_lines(cimport_tups))
+        pyx = pyx.format(extra_types=lts.extra_types, cimports=cimports, 
                          imports=imports)
         for t in template:
-            pyx += pyxfuncs[t[0]](*t[1:], ts=ts) + "\n\n" 
+            pyx += pyxfuncs[t[0]](*t[1:], ts=lts) + "\n\n" 
     return pyx
 
 
@@ -840,13 +841,13 @@ def genpxd(template, header=None, ts=None):
     pxdfuncs = dict([(k[7:], v) for k, v in globals().items() \
                     if k.startswith('genpxd_') and callable(v)])
     pxd = _pxdheader if header is None else header
-    with ts.swap_stlcontainers(None):
+    with ts.localized(stlcontainers=None) as lts:
         cimport_tups = set()
         for t in template:
             for arg in t[1:]:
-                ts.cython_cimport_tuples(arg, cimport_tups, set(['c']))
-        cimports = "\n".join(ts.cython_cimport_lines(cimport_tups))
-        pxd = pxd.format(extra_types=ts.extra_types, cimports=cimports)
+                cimport_tups |= lts.cython_cimport_set(arg, frozenset(['c']))
+        cimports = "\n".join(lts.cython_cimport_lines(cimport_tups))
+        pxd = pxd.format(extra_types=lts.extra_types, cimports=cimports)
     for t in template:
         pxd += pxdfuncs[t[0]](*t[1:], ts=ts) + "\n\n" 
     return pxd
@@ -930,7 +931,9 @@ class XDressPlugin(Plugin):
         )
 
     rcdocs = {
-        "stlcontainers": "List of C++ standard library containers to wrap.",
+        "stlcontainers": ("List of C++ standard library containers to wrap. "
+                          "These may also be C++ spellings, such as "
+                          "'std::vector<double>'."),
         "make_stlcontainers": ("Flag for enabling / disabling creating the "
                                "C++ standard library container wrappers."),
         }
@@ -944,6 +947,9 @@ class XDressPlugin(Plugin):
     def setup(self, rc):
         print("stlwrap: registering C++ standard library types")
         ts = rc.ts
+        # C++ spellings become template tuples, without the trailing predicate
+        rc.stlcontainers = [parse_type(t)[:-1] if isinstance(t, basestring) and \
+                            '<' in t else t for t in rc.stlcontainers]
         # register dtypes
         for t in rc.stlcontainers:
             if t[0] == 'vector' and t[1] not in rc.dtypes:
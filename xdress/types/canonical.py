@@ -0,0 +1,111 @@
+"""Interned, immutable canonical type objects.  Non-string types are returned by
+``TypeSystem.canon()`` as CanonType instances.  These behave like the nested
+tuples that they are made from, and compare equal to and hash the same as
+them, but are only ever created once per distinct type.  Equal canonical
+types are therefore nearly always the very same object, which makes comparing
+them an identity check and hashing them a cached attribute lookup.
+
+Canonical Types API
+===================
+"""
+from collections import Sequence
+
+
+class CanonType(object):
+    """An immutable, interned canonical form of a non-string type.  Constructing
+    a CanonType from a tuple, or from another CanonType, returns the single
+    instance for that type.  Nested tuples are interned as well.  Indexing and
+    iterating give back the elements, slices are plain tuples, and instances
+    compare equal to the equivalent tuples.
+    """
+
+    __slots__ = ('_t', '_hash')
+
+    _interned = {}
+
+    def __new__(cls, t):
+        if isinstance(t, CanonType):
+            return t
+        t = tuple([CanonType(x) if isinstance(x, tuple) else x for x in t])
+        # element types are part of the key so that, eg, 1 and True stay distinct
+        key = (t, tuple([type(x) for x in t]))
+        self = cls._interned.get(key, None)
+        if self is None:
+            self = object.__new__(cls)
+            self._t = t
+            self._hash = hash(t)
+            # another thread may have interned this type in the meantime
+            self = cls._interned.setdefault(key, self)
+        return self
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if other is self:
+            return True
+        if isinstance(other, CanonType):
+            # interning makes this rare, but racing threads may create twins
+            return self._hash == other._hash and self._t == other._t
+        if isinstance(other, tuple):
+            return self._t == other
+        return NotImplemented
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    def _cmpvalue(self, other):
+        return other._t if isinstance(other, CanonType) else other
+
+    def __lt__(self, other):
+        return self._t < self._cmpvalue(other)
+
+    def __le__(self, other):
+        return self._t <= self._cmpvalue(other)
+
+    def __gt__(self, other):
+        return self._t > self._cmpvalue(other)
+
+    def __ge__(self, other):
+        return self._t >= self._cmpvalue(other)
+
+    def __len__(self):
+        return len(self._t)
+
+    def __iter__(self):
+        return iter(self._t)
+
+    def __contains__(self, x):
+        return x in self._t
+
+    def __getitem__(self, i):
+        return self._t[i]
+
+    def __add__(self, other):
+        return self._t + tuple(other)
+
+    def __radd__(self, other):
+        return tuple(other) + self._t
+
+    def count(self, x):
+        return self._t.count(x)
+
+    def index(self, x):
+        return self._t.index(x)
+
+    def __repr__(self):
+        return repr(self._t)
+
+    __str__ = __repr__
+
+    def __reduce__(self):
+        return (CanonType, (self._t,))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+Sequence.register(CanonType)
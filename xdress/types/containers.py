@@ -5,12 +5,42 @@ import sys
 if sys.version_info[0] > 2:
     basestring = str
 
-from .matching import TypeMatcher
+from .matching import TypeMatcher, TypeMatcherIndex
 
 _ensuremod = lambda x: x if x is not None and 0 < len(x) else ''
 _ensuremoddot = lambda x: x + '.' if x is not None and 0 < len(x) else ''
 
 
+_MODULE_TOKENS = ('{extra_types}', '{dtypes}', '{stlcontainers}')
+
+def _consult(ts, key, value=None):
+    """Records that the memoized type system results which are currently being
+    computed depend on a key, and on the module names that its value refers to.
+    See utils.MemoDependencies."""
+    deps = getattr(ts, '_memodeps', None)
+    if deps is None or not deps.active():
+        return
+    deps.consult(key)
+    if value is not None:
+        r = repr(value)
+        for token in _MODULE_TOKENS:
+            if token in r:
+                deps.consult(token)
+
+def _generation(ts):
+    """The module names which are substituted into lazy values.  Resolved
+    values are only valid for as long as these stay the same."""
+    return (ts.extra_types, ts.dtypes, ts.stlcontainers)
+
+def _resolved_cache(d):
+    """Returns the resolved value cache of a lazy dict, first emptying it if
+    the type system's module names have changed since it was filled."""
+    gen = _generation(d._ts)
+    if gen != d._gen:
+        d._resolved.clear()
+        d._gen = gen
+    return d._resolved
+
 def _recurse_replace(x, a, b):
     if isinstance(x, basestring):
         return x.replace(a, b)
@@ -20,16 +50,70 @@ def _recurse_replace(x, a, b):
         return x
 
 
+class _OverlayDict(MutableMapping):
+    """A mapping which layers local items over a parent mapping.  Lookups fall
+    through to the parent, while writes and deletions only ever affect the local
+    layer, so the parent is never modified."""
+
+    def __init__(self, parent):
+        self._parent = parent
+        self._local = {}
+        self._hidden = set()
+
+    def __len__(self):
+        return len(set(self))
+
+    def __contains__(self, key):
+        if key in self._local:
+            return True
+        return key not in self._hidden and key in self._parent
+
+    def __iter__(self):
+        for k in self._local:
+            yield k
+        for k in self._parent:
+            if k not in self._local and k not in self._hidden:
+                yield k
+
+    def __getitem__(self, key):
+        if key in self._local:
+            return self._local[key]
+        if key in self._hidden:
+            raise KeyError(key)
+        return self._parent[key]
+
+    def __setitem__(self, key, value):
+        self._local[key] = value
+        self._hidden.discard(key)
+
+    def __delitem__(self, key):
+        if key not in self:
+            raise KeyError(key)
+        self._local.pop(key, None)
+        if key in self._parent:
+            self._hidden.add(key)
+
+    def __str__(self):
+        return pformat(dict(self.items()))
+
+    def __repr__(self):
+        return self.__class__.__name__ + "(" + repr(dict(self.items())) + ")"
+
+
 class _LazyConfigDict(MutableMapping):
     def __init__(self, items, ts):
         self._d = items if isinstance(items, MutableMapping) else dict(items)
         self._ts = ts
+        self._resolved = {}
+        self._gen = None
 
     def __len__(self):
         return len(self._d)
 
     def __contains__(self, key):
-        return key in self._d
+        contained = key in self._d
+        _consult(self._ts, key)
+        return contained
 
     def __iter__(self):
         for k in self._d:
@@ -37,18 +121,25 @@ class _LazyConfigDict(MutableMapping):
 
     def __getitem__(self, key):
         value = self._d[key]
+        _consult(self._ts, key, value)
+        resolved = _resolved_cache(self)
+        if key in resolved:
+            return resolved[key]
         kw = {'extra_types': _ensuremoddot(self._ts.extra_types),
               'dtypes': _ensuremoddot(self._ts.dtypes),
               'stlcontainers': _ensuremoddot(self._ts.stlcontainers), }
         for k, v in kw.items():
             value = _recurse_replace(value, '{' + k + '}', v)
+        resolved[key] = value
         return value
 
     def __setitem__(self, key, value):
         self._d[key] = value
+        self._resolved.pop(key, None)
 
     def __delitem__(self, key):
         del self._d[key]
+        self._resolved.pop(key, None)
 
     def update(self, *args, **kwargs):
         if len(args) == 1 and len(kwargs) == 0:
@@ -60,6 +151,7 @@ class _LazyConfigDict(MutableMapping):
         else:
             raise TypeError("invalid update signature.")
         self._d.update(toup)
+        self._resolved.clear()
 
     def __str__(self):
         return pformat(self._d)
@@ -71,12 +163,16 @@ class _LazyImportDict(MutableMapping):
     def __init__(self, items, ts):
         self._d = items if isinstance(items, MutableMapping) else dict(items)
         self._ts = ts
+        self._resolved = {}
+        self._gen = None
 
     def __len__(self):
         return len(self._d)
 
     def __contains__(self, key):
-        return key in self._d
+        contained = key in self._d
+        _consult(self._ts, key)
+        return contained
 
     def __iter__(self):
         for k in self._d:
@@ -84,20 +180,27 @@ class _LazyImportDict(MutableMapping):
 
     def __getitem__(self, key):
         value = self._d[key]
+        _consult(self._ts, key, value)
         if callable(value):
             return value
+        resolved = _resolved_cache(self)
+        if key in resolved:
+            return resolved[key]
         kw = {'extra_types': _ensuremod(self._ts.extra_types),
               'dtypes': _ensuremod(self._ts.dtypes),
               'stlcontainers': _ensuremod(self._ts.stlcontainers),}
         newvalue = tuple(tuple(x.format(**kw) or None for x in imp if x is not None) \
                             for imp in value if imp is not None) or (None,)
+        resolved[key] = newvalue
         return newvalue
 
     def __setitem__(self, key, value):
         self._d[key] = value
+        self._resolved.pop(key, None)
 
     def __delitem__(self, key):
         del self._d[key]
+        self._resolved.pop(key, None)
 
     def update(self, *args, **kwargs):
         if len(args) == 1 and len(kwargs) == 0:
@@ -109,6 +212,7 @@ class _LazyImportDict(MutableMapping):
         else:
             raise TypeError("invalid update signature.")
         self._d.update(toup)
+        self._resolved.clear()
 
     def __str__(self):
         return pformat(self._d)
@@ -117,25 +221,31 @@ class _LazyImportDict(MutableMapping):
         return self.__class__.__name__ + "(" + repr(self._d) + ", TypeSystem())"
 
 class _LazyConverterDict(MutableMapping):
-    def __init__(self, items, ts):
+    def __init__(self, items, ts, tms=None):
         self._d = items if isinstance(items, MutableMapping) else dict(items)
-        self._tms = set([k for k in self._d if isinstance(k, TypeMatcher)])
+        # a prebuilt index of the matcher keys is shared until it is modified
+        self._tms_shared = tms is not None
+        if tms is None:
+            tms = TypeMatcherIndex([k for k in self._d if isinstance(k, TypeMatcher)])
+        self._tms = tms
         self._ts = ts
+        self._resolved = {}
+        self._gen = None
 
     def __len__(self):
         return len(self._d)
 
     def __contains__(self, key):
+        _consult(self._ts, key)
         if key in self._d:
             return True  # Check if key is present
         else:
             # check if any TypeMatcher keys actually match
-            for tm in self._tms:
-                if tm.matches(key):
-                    self[key] = self._d[tm]
-                    return True
-            else:
+            tm = self._tms.first(key)
+            if tm is None:
                 return False
+            self[key] = self._d[tm]
+            return True
 
     def __iter__(self):
         for k in self._d:
@@ -146,15 +256,17 @@ class _LazyConverterDict(MutableMapping):
             value = self._d[key]  # Check if key is present
         else:
             # check if any TypeMatcher keys actually match
-            for tm in self._tms:
-                if tm.matches(key):
-                    value = self._d[tm]
-                    self[key] = value
-                    break
-            else:
+            tm = self._tms.first(key)
+            if tm is None:
                 raise KeyError("{0} not found".format(key))
+            value = self._d[tm]
+            self[key] = value
+        _consult(self._ts, key, value)
         if value is None or value is NotImplemented or callable(value):
             return value
+        resolved = _resolved_cache(self)
+        if key in resolved:
+            return resolved[key]
         kw = {'extra_types': _ensuremoddot(self._ts.extra_types),
               'dtypes': _ensuremoddot(self._ts.dtypes),
               'stlcontainers': _ensuremoddot(self._ts.stlcontainers),}
@@ -165,17 +277,26 @@ class _LazyConverterDict(MutableMapping):
                 for k, v in kw.items():
                     newx = newx.replace('{' + k + '}', v)
             newvalue.append(newx)
-        return tuple(newvalue)
+        newvalue = resolved[key] = tuple(newvalue)
+        return newvalue
+
+    def _own_tms(self):
+        if self._tms_shared:
+            self._tms = self._tms.copy()
+            self._tms_shared = False
+        return self._tms
 
     def __setitem__(self, key, value):
         self._d[key] = value
+        self._resolved.pop(key, None)
         if isinstance(key, TypeMatcher):
-            self._tms.add(key)
+            self._own_tms().add(key)
 
     def __delitem__(self, key):
         del self._d[key]
+        self._resolved.pop(key, None)
         if isinstance(key, TypeMatcher):
-            self._tms.remove(key)
+            self._own_tms().remove(key)
 
     def update(self, *args, **kwargs):
         if len(args) == 1 and len(kwargs) == 0:
@@ -187,7 +308,10 @@ class _LazyConverterDict(MutableMapping):
         else:
             raise TypeError("invalid update signature.")
         self._d.update(toup)
-        self._tms.update([k for k in toup if isinstance(k, TypeMatcher)])
+        self._resolved.clear()
+        for k in toup:
+            if isinstance(k, TypeMatcher):
+                self._own_tms().add(k)
 
     def __str__(self):
         return pformat(self._d)
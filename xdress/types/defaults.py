@@ -6,6 +6,23 @@ from .matching import TypeMatcher, MatchAny
 if sys.version_info[0] > 2:
     basestring = str
 
+CYTHON_PY2C_CONV_VECTOR = ((
+        '# {var} is a {t.type}\n'
+        'cdef int i{var}\n'
+        'cdef int {var}_size\n'
+        'cdef {t.cython_npctypes[0]} * {var}_data\n'
+        '{var}_size = len({var})\n'
+        'if isinstance({var}, np.ndarray) and (<np.ndarray> {var}).descr.type_num == {t.cython_nptype}:\n'
+        '    {var}_data = <{t.cython_npctypes[0]} *> np.PyArray_DATA(<np.ndarray> {var})\n'
+        '    {proxy_name} = {t.cython_ctype}(<size_t> {var}_size)\n'
+        '    for i{var} in range({var}_size):\n'
+        '        {proxy_name}[i{var}] = {var}_data[i{var}]\n'
+        'else:\n'
+        '    {proxy_name} = {t.cython_ctype}(<size_t> {var}_size)\n'
+        '    for i{var} in range({var}_size):\n'
+        '        {proxy_name}[i{var}] = <{t.cython_npctypes[0]}> {var}[i{var}]\n'),
+        '{proxy_name}')     # FIXME There might be improvements here...
+
 CYTHON_PY2C_CONV_VECTOR_REF = ((
         '# {var} is a {t.type}\n'
         'cdef int i{var}\n'
@@ -23,6 +40,54 @@ CYTHON_PY2C_CONV_VECTOR_REF = ((
         '        {proxy_name}[i{var}] = <{t.cython_npctypes_nopred[0]}> {var}[i{var}]\n'),
         '{proxy_name}')     # FIXME There might be improvements here...
 
+CYTHON_PY2C_CONV_VECTOR_BULK = ((
+        '# {var} is a {t.type}\n'
+        'cdef size_t i{var}\n'
+        'cdef size_t {var}_size\n'
+        'cdef const {t.cython_npctypes_nopred[0]}[::1] {var}_view = None\n'
+        '{var}_size = len({var})\n'
+        '{proxy_name} = {t.cython_ctype_nopred}(<size_t> {var}_size)\n'
+        'if isinstance({var}, np.ndarray) and (<np.ndarray> {var}).descr.type_num == {t.cython_nptype} \\\n'
+        '        and np.PyArray_NDIM(<np.ndarray> {var}) == 1 and np.PyArray_ISCARRAY_RO(<np.ndarray> {var}) \\\n'
+        '        and np.PyArray_ISNOTSWAPPED(<np.ndarray> {var}):\n'
+        '    if 0 < {var}_size:\n'
+        '        memcpy(&{proxy_name}[0], np.PyArray_DATA(<np.ndarray> {var}), {var}_size * sizeof({t.cython_npctypes_nopred[0]}))\n'
+        'else:\n'
+        '    if PyObject_CheckBuffer({var}):\n'
+        '        try:\n'
+        '            {var}_view = {var}\n'
+        '        except (TypeError, ValueError, BufferError):\n'
+        '            pass\n'
+        '    if {var}_view is not None:\n'
+        '        if 0 < {var}_size:\n'
+        '            memcpy(&{proxy_name}[0], &{var}_view[0], {var}_size * sizeof({t.cython_npctypes_nopred[0]}))\n'
+        '    else:\n'
+        '        for i{var} in range({var}_size):\n'
+        '            {proxy_name}[i{var}] = <{t.cython_npctypes_nopred[0]}> {var}[i{var}]\n'),
+        '{proxy_name}')
+
+# NumPy types whose values are plain old data that may be copied into a vector
+# with memcpy, cython_py2c_conv_vector()
+_BULK_NPTYPES = frozenset(['np.NPY_UBYTE', 'np.NPY_INT16', 'np.NPY_INT32',
+                           'np.NPY_INT64', 'np.NPY_UINT16', 'np.NPY_UINT32',
+                           'np.NPY_UINT64', 'np.NPY_FLOAT32', 'np.NPY_FLOAT64',
+                           'np.NPY_COMPLEX128'])
+
+def cython_py2c_conv_vector(t, ts):
+    """Python to C++ conversion for vectors, and references to them.  Vectors of
+    plain numeric values are filled with a single memcpy() from C-contiguous,
+    native byte order arrays of the same dtype or from any other buffer whose
+    format matches.  Everything else is converted element by element.
+    """
+    v = t
+    while v[0] != 'vector':
+        v = v[0]
+    if ts.cython_nptype(v[1]) in _BULK_NPTYPES:
+        return CYTHON_PY2C_CONV_VECTOR_BULK
+    elif t[-1] == 0:
+        return CYTHON_PY2C_CONV_VECTOR
+    return CYTHON_PY2C_CONV_VECTOR_REF
+
 
 def get_defaults():
     """Returns a dictionary containing the default values for a TypeSystem
@@ -382,8 +447,8 @@ def _get_cython_cimports():
     def cython_cimports_functionish(t, ts, seen):
         seen.add(('cython.operator', 'dereference', 'deref'))
         for n, argt in t[1][2]:
-            ts.cython_cimport_tuples(argt, seen=seen, inc=('c',))
-        ts.cython_cimport_tuples(t[2][2], seen=seen, inc=('c',))
+            seen.update(ts.cython_cimport_set(argt, frozenset(['c'])))
+        seen.update(ts.cython_cimport_set(t[2][2], frozenset(['c'])))
 
     return {
         'char': (None,),
@@ -420,8 +485,8 @@ def _get_cython_cimports():
 def _get_cython_cyimports():
     def cython_cyimports_functionish(t, ts, seen):
         for n, argt in t[1][2]:
-            ts.cython_cimport_tuples(argt, seen=seen, inc=('cy',))
-        ts.cython_cimport_tuples(t[2][2], seen=seen, inc=('cy',))
+            seen.update(ts.cython_cimport_set(argt, frozenset(['cy'])))
+        seen.update(ts.cython_cimport_set(t[2][2], frozenset(['cy'])))
 
     return {
         'char': (None,),
@@ -445,7 +510,9 @@ def _get_cython_cyimports():
         'dict': (None,),
         'pair': (('{stlcontainers}',),),
         'set': (('{stlcontainers}',),),
-        'vector': (('numpy', 'as', 'np'), ('{dtypes}',)),
+        'vector': (('numpy', 'as', 'np'), ('{dtypes}',), ('{extra_types}',),
+                   ('libc.string', 'memcpy'),
+                   ('cpython.buffer', 'PyObject_CheckBuffer')),
         'nucid': (('pyne', 'nucname'),),
         'nucname': (('pyne', 'nucname'),),
         'function': cython_cyimports_functionish,
@@ -457,8 +524,8 @@ def _get_cython_pyimports():
     def cython_pyimports_functionish(t, ts, seen):
         seen.add(('warnings',))
         for n, argt in t[1][2]:
-            ts.cython_import_tuples(argt, seen=seen)
-        ts.cython_import_tuples(t[2][2], seen=seen)
+            seen.update(ts.cython_import_set(argt))
+        seen.update(ts.cython_import_set(t[2][2]))
 
     return {
         'char': (None,),
@@ -608,7 +675,7 @@ def _get_cython_c2py_conv():
         return s, s, caches
 
     return {
-        # Has tuple form of (copy, [view, [cached_view]])
+        # Has tuple form of (copy, [view, [cached_view, [move]]])
         # base types
         'char': ('chr(<int> {var})',),
         ('char', '*'): ('bytes({var}).decode()',),
@@ -685,6 +752,20 @@ def _get_cython_c2py_conv():
              '    {proxy_name}_shape[0] = <np.npy_intp> {var}.size()\n'
              '    {proxy_name} = np.PyArray_SimpleNewFromData(1, {proxy_name}_shape, {t.cython_nptypes[0]}, &{var}[0])\n'
              '    {cache_name} = {proxy_name}\n'
+            ),
+            # the array's base owns a heap vector which has taken var's buffer,
+            # empty vectors have no buffer to take
+            ('cdef {t.cython_ctype} * {proxy_name}_vec\n'
+             'cdef {extra_types}HeapCapsule[{t.cython_ctype}] {proxy_name}_keeper\n'
+             '{proxy_name}_shape[0] = <np.npy_intp> {var}.size()\n'
+             'if 0 == {proxy_name}_shape[0]:\n'
+             '    {proxy_name} = np.PyArray_SimpleNew(1, {proxy_name}_shape, {t.cython_nptypes[0]})\n'
+             'else:\n'
+             '    {proxy_name}_vec = new {t.cython_ctype}()\n'
+             '    {proxy_name}_vec.swap({var})\n'
+             '    {proxy_name}_base = {proxy_name}_keeper.capsule({proxy_name}_vec)\n'
+             '    {proxy_name} = np.PyArray_SimpleNewFromData(1, {proxy_name}_shape, {t.cython_nptypes[0]}, &{proxy_name}_vec[0][0])\n'
+             '    np.set_array_base({proxy_name}, {proxy_name}_base)\n'
             )),
         ('vector', 'bool', 0): (  # C++ standard is silly here
             ('cdef int i\n'
@@ -837,22 +918,7 @@ def _get_cython_py2c_conv():
                  '{proxy_name}.pair_ptr[0]'),
         'set': ('{proxy_name} = {t.cython_pytype}({var}, not isinstance({var}, {t.cython_cytype}))',
                 '{proxy_name}.set_ptr[0]'),
-        'vector': ((
-            '# {var} is a {t.type}\n'
-            'cdef int i{var}\n'
-            'cdef int {var}_size\n'
-            'cdef {t.cython_npctypes[0]} * {var}_data\n'
-            '{var}_size = len({var})\n'
-            'if isinstance({var}, np.ndarray) and (<np.ndarray> {var}).descr.type_num == {t.cython_nptype}:\n'
-            '    {var}_data = <{t.cython_npctypes[0]} *> np.PyArray_DATA(<np.ndarray> {var})\n'
-            '    {proxy_name} = {t.cython_ctype}(<size_t> {var}_size)\n'
-            '    for i{var} in range({var}_size):\n'
-            '        {proxy_name}[i{var}] = {var}_data[i{var}]\n'
-            'else:\n'
-            '    {proxy_name} = {t.cython_ctype}(<size_t> {var}_size)\n'
-            '    for i{var} in range({var}_size):\n'
-            '        {proxy_name}[i{var}] = <{t.cython_npctypes[0]}> {var}[i{var}]\n'),
-            '{proxy_name}'),     # FIXME There might be improvements here...
+        'vector': cython_py2c_conv_vector,
         ('vector', 'char', 0): ((
             '# {var} is a {t.type}\n'
             'cdef int i{var}\n'
@@ -870,13 +936,13 @@ def _get_cython_py2c_conv():
             '        _ = {var}[i{var}].encode()\n'
             '        {proxy_name}[i{var}] = deref(<char *> _)\n'),
             '{proxy_name}'),
-        TypeMatcher(('vector', MatchAny, '&')): CYTHON_PY2C_CONV_VECTOR_REF,
-        TypeMatcher((('vector', MatchAny, 0), '&')): CYTHON_PY2C_CONV_VECTOR_REF,
-        TypeMatcher((('vector', MatchAny, '&'), 0)): CYTHON_PY2C_CONV_VECTOR_REF,
-        TypeMatcher((('vector', MatchAny, '&'), 'const')): CYTHON_PY2C_CONV_VECTOR_REF,
-        TypeMatcher((('vector', MatchAny, 'const'), '&')): CYTHON_PY2C_CONV_VECTOR_REF,
-        TypeMatcher(((('vector', MatchAny, 0), 'const'), '&')): CYTHON_PY2C_CONV_VECTOR_REF,
-        TypeMatcher(((('vector', MatchAny, 0), '&'), 'const')): CYTHON_PY2C_CONV_VECTOR_REF,
+        TypeMatcher(('vector', MatchAny, '&')): cython_py2c_conv_vector,
+        TypeMatcher((('vector', MatchAny, 0), '&')): cython_py2c_conv_vector,
+        TypeMatcher((('vector', MatchAny, '&'), 0)): cython_py2c_conv_vector,
+        TypeMatcher((('vector', MatchAny, '&'), 'const')): cython_py2c_conv_vector,
+        TypeMatcher((('vector', MatchAny, 'const'), '&')): cython_py2c_conv_vector,
+        TypeMatcher(((('vector', MatchAny, 0), 'const'), '&')): cython_py2c_conv_vector,
+        TypeMatcher(((('vector', MatchAny, 0), '&'), 'const')): cython_py2c_conv_vector,
         # refinement types
         'nucid': ('nucname.zzaaam({var})', False),
         'nucname': ('nucname.name({var})', False),
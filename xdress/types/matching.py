@@ -1,6 +1,8 @@
 import sys
+from collections import Sequence
 
 from xdress.utils import flatten
+from .canonical import CanonType
 
 if sys.version_info[0] > 2:
     basestring = str
@@ -14,6 +16,10 @@ class MatchAny(object):
         # give consistent hash value across executions
         return hash(repr(self))
 
+    def __reduce__(self):
+        # pickle by reference to the singleton
+        return 'MatchAny'
+
 MatchAny = MatchAny()
 
 
@@ -104,7 +110,7 @@ class TypeMatcher(object):
         else:
             if isinstance(t, basestring):
                 return self.matches(t)
-            elif isinstance(t, (tuple, list)):
+            elif isinstance(t, (tuple, list, CanonType)):
                 return any([self.matches(i) for i in flatten(t)])
 
     def __eq__(self, other):
@@ -118,3 +124,155 @@ class TypeMatcher(object):
 
     def __repr__(self):
         return "{0}({1!r})".format(self.__class__.__name__, self._pattern)
+
+
+_SEQ = object()  # marks the start of a sequence in flattened types
+
+def _flatten_type(t, symbols, ends):
+    """Flattens a (nested) type or pattern into a preorder list of symbols.
+    Sequences become a (_SEQ, length) symbol followed by their elements.
+    ends[i] is set to the index just past the subterm which starts at i.
+    """
+    i = len(symbols)
+    if isinstance(t, Sequence) and not isinstance(t, basestring):
+        symbols.append((_SEQ, len(t)))
+        ends.append(None)
+        for x in t:
+            _flatten_type(x, symbols, ends)
+    else:
+        symbols.append(t)
+        ends.append(None)
+    ends[i] = len(symbols)
+
+
+class TypeMatcherIndex(object):
+    """A discrimination tree of TypeMatcher patterns, which finds all of the
+    patterns that match a type without testing each pattern in turn.  Patterns
+    are stored along their flattened, preorder paths, with MatchAny being a
+    wildcard edge that skips over a whole subterm of the type.  A lookup thus
+    only walks the paths which are consistent with the type, taking time
+    proportional to its size rather than to the number of patterns.  Each
+    pattern may be associated with a value, which defaults to the matcher.
+    """
+
+    def __init__(self, matchers=()):
+        """Parameters
+        ----------
+        matchers : iterable of TypeMatchers or patterns, optional
+            The initial patterns to index.
+
+        """
+        self._root = self._node()
+        self._entries = {}  # TypeMatcher -> (insertion order, value)
+        self._n = 0
+        for tm in matchers:
+            self.add(tm)
+
+    @staticmethod
+    def _node():
+        # [exact children, wildcard child, {TypeMatcher: None} at this leaf]
+        return [{}, None, {}]
+
+    def _leaf(self, pattern, create=False):
+        symbols, ends = [], []
+        _flatten_type(pattern, symbols, ends)
+        node = self._root
+        for sym in symbols:
+            if sym is MatchAny:
+                child = node[1]
+                if child is None and create:
+                    child = node[1] = self._node()
+            else:
+                child = node[0].get(sym, None)
+                if child is None and create:
+                    child = node[0][sym] = self._node()
+            if child is None:
+                return None
+            node = child
+        return node
+
+    def add(self, tm, value=None):
+        """Adds a TypeMatcher, or a pattern, to the index with an optional value
+        that lookups return instead of the matcher."""
+        tm = tm if isinstance(tm, TypeMatcher) else TypeMatcher(tm)
+        value = tm if value is None else value
+        if tm in self._entries:
+            order = self._entries[tm][0]
+        else:
+            order = self._n
+            self._n += 1
+        self._leaf(tm.pattern, create=True)[2][tm] = None
+        self._entries[tm] = (order, value)
+
+    def remove(self, tm):
+        """Removes a TypeMatcher, or a pattern, from the index."""
+        tm = tm if isinstance(tm, TypeMatcher) else TypeMatcher(tm)
+        del self._entries[tm]
+        del self._leaf(tm.pattern)[2][tm]
+
+    def copy(self):
+        """Returns an independent copy of the index."""
+        other = TypeMatcherIndex()
+        other._root = self._copy_node(self._root)
+        other._entries = dict(self._entries)
+        other._n = self._n
+        return other
+
+    @classmethod
+    def _copy_node(cls, node):
+        children = dict([(k, cls._copy_node(v)) for k, v in node[0].items()])
+        wild = None if node[1] is None else cls._copy_node(node[1])
+        return [children, wild, dict(node[2])]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(sorted(self._entries, key=lambda tm: self._entries[tm][0]))
+
+    def __contains__(self, tm):
+        return tm in self._entries
+
+    def _walk(self, t):
+        """Returns the matchers whose patterns match t, in insertion order."""
+        symbols, ends = [], []
+        _flatten_type(t, symbols, ends)
+        nsym = len(symbols)
+        found = []
+        stack = [(self._root, 0)]
+        while 0 < len(stack):
+            node, i = stack.pop()
+            if i == nsym:
+                found.extend(node[2])
+                continue
+            if node[1] is not None:
+                stack.append((node[1], ends[i]))
+            try:
+                child = node[0].get(symbols[i], None)
+            except TypeError:
+                child = None  # unhashable, can only match a wildcard
+            if child is not None:
+                stack.append((child, i + 1))
+        entries = self._entries
+        found.sort(key=lambda tm: entries[tm][0])
+        return found
+
+    def matches(self, t):
+        """Returns the values for all of the patterns which match the type t."""
+        entries = self._entries
+        return [entries[tm][1] for tm in self._walk(t)]
+
+    def first(self, t, default=None):
+        """Returns the value for the earliest added pattern which matches the
+        type t, or default if none do."""
+        found = self._walk(t)
+        return self._entries[found[0]][1] if 0 < len(found) else default
+
+    def flatmatches(self, t):
+        """Tests whether any pattern matches t itself or any of the elements of
+        t after flattening, see TypeMatcher.flatmatches()."""
+        if 0 < len(self._walk(t)):
+            return True
+        if isinstance(t, basestring) or not isinstance(t, (tuple, list, CanonType)):
+            return False
+        return any([0 < len(self._walk(i)) for i in flatten(t)])
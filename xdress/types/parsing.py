@@ -0,0 +1,198 @@
+"""Parses the C/C++ spellings of types, such as ``'unsigned int'`` or
+``'const std::map<int, std::vector<double> > &'``, into the type system's
+representation of them::
+
+    >>> parse_type('std::map<int, std::vector<double> >')
+    ('map', 'int32', ('vector', 'float64', 0), 0)
+    >>> parse_type('const char *')
+    (('char', 'const'), '*')
+
+Fundamental types are mapped to their type system names, namespaces are
+dropped from class names, and defaulted standard library template arguments
+such as allocators are removed.  The results are not canonical; pass them
+through ``TypeSystem.canon()`` for that, which will itself call parse_type()
+on strings that it does not otherwise know about.  Since the same spellings
+come up over and over, results are kept in a least-recently-used cache.
+
+Type Parsing API
+================
+"""
+import re
+import sys
+from collections import OrderedDict
+
+if sys.version_info[0] >= 3:
+    basestring = str
+
+_TOKENS = re.compile(r"\s*(?:(-?\d+)|([A-Za-z_]\w*(?:\s*::\s*[A-Za-z_]\w*)*)"
+                     r"|(::)|([<>,*&\[\]]))")
+
+_FUNDAMENTAL_WORDS = frozenset(['signed', 'unsigned', 'short', 'long', 'int',
+                                'char', 'float', 'double', 'void', 'bool'])
+
+# keyed by the sorted fundamental words, with 'int' dropped whenever it is
+# implied by the other words
+_FUNDAMENTAL_TYPES = {
+    ('char',): 'char',
+    ('char', 'signed'): 'char',
+    ('char', 'unsigned'): 'uchar',
+    ('short',): 'int16',
+    ('short', 'signed'): 'int16',
+    ('short', 'unsigned'): 'uint16',
+    ('int',): 'int32',
+    ('signed',): 'int32',
+    ('unsigned',): 'uint32',
+    ('long',): 'int32',
+    ('long', 'signed'): 'int32',
+    ('long', 'unsigned'): 'uint32',
+    ('long', 'long'): 'int64',
+    ('long', 'long', 'signed'): 'int64',
+    ('long', 'long', 'unsigned'): 'uint64',
+    ('float',): 'float32',
+    ('double',): 'float64',
+    ('double', 'long'): 'float128',
+    ('void',): 'void',
+    ('bool',): 'bool',
+    }
+
+_CLASS_NAMES = {
+    'string': 'str',
+    'basic_string': 'str',
+    }
+
+_QUALIFIERS = frozenset(['const', 'volatile'])
+
+# standard library template arguments which are defaulted and thus dropped
+_DEFAULTED_ARGS = frozenset(['allocator', 'less', 'char_traits', 'hash',
+                             'equal_to'])
+
+def tokenize_type(s):
+    """Splits the spelling of a C/C++ type into a list of tokens.  Qualified
+    names, such as ``'std::vector'``, are kept as single tokens.
+    """
+    tokens = []
+    pos = 0
+    s = s.strip()
+    n = len(s)
+    while pos < n:
+        m = _TOKENS.match(s, pos)
+        if m is None or m.end() == pos:
+            raise TypeError("could not tokenize type {0!r} at {1!r}".format(s,
+                            s[pos:]))
+        num, name, sep, punc = m.groups()
+        if num is not None:
+            tokens.append(int(num))
+        elif name is not None:
+            tokens.append(re.sub(r'\s+', '', name))
+        elif punc is not None:
+            tokens.append(punc)
+        pos = m.end()
+    return tokens
+
+class _TypeParser(object):
+    """Recursive descent parser over the tokens of a single type spelling."""
+
+    def __init__(self, s):
+        self.s = s
+        self.tokens = tokenize_type(s)
+        self.pos = 0
+
+    def error(self):
+        raise TypeError("could not parse type {0!r}".format(self.s))
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def next(self):
+        tok = self.peek()
+        if tok is None:
+            self.error()
+        self.pos += 1
+        return tok
+
+    def parse(self):
+        t = self.type()
+        if self.peek() is not None:
+            self.error()
+        return t
+
+    def type(self):
+        quals = []
+        while self.peek() in _QUALIFIERS:
+            quals.append(self.next())
+        t = self.base()
+        while self.peek() in _QUALIFIERS:
+            quals.append(self.next())
+        if 'const' in quals:
+            t = (t, 'const')
+        while True:
+            tok = self.peek()
+            if tok in ('*', '&') or tok in _QUALIFIERS:
+                t = (t, self.next())
+            elif tok == '[':
+                self.next()
+                size = self.next()
+                if not isinstance(size, int) or self.next() != ']':
+                    self.error()
+                t = (t, size)
+            else:
+                return t
+
+    def base(self):
+        tok = self.peek()
+        if tok in _FUNDAMENTAL_WORDS:
+            words = []
+            while self.peek() in _FUNDAMENTAL_WORDS:
+                words.append(self.next())
+            if 'int' in words and 1 < len(words):
+                words.remove('int')
+            key = tuple(sorted(words))
+            if key not in _FUNDAMENTAL_TYPES:
+                self.error()
+            return _FUNDAMENTAL_TYPES[key]
+        if not isinstance(tok, basestring) or not (tok[0].isalpha() or \
+                                                   tok[0] in '_:'):
+            self.error()
+        name = self.next().split('::')[-1]
+        if self.peek() != '<':
+            return _CLASS_NAMES.get(name, name)
+        self.next()
+        args = [self.arg()]
+        while self.peek() == ',':
+            self.next()
+            args.append(self.arg())
+        if self.next() != '>':
+            self.error()
+        args = [a for a in args if not (isinstance(a, tuple) and \
+                                        a[0] in _DEFAULTED_ARGS)]
+        if name in _CLASS_NAMES:
+            return _CLASS_NAMES[name]
+        return (name,) + tuple(args) + (0,)
+
+    def arg(self):
+        tok = self.peek()
+        if isinstance(tok, int):
+            return self.next()
+        elif tok == 'true' or tok == 'false':
+            self.next()
+            return tok == 'true'
+        return self.type()
+
+def parse_type(s):
+    """Parses the C/C++ spelling of a type into its type system representation,
+    raising a TypeError if this is not possible.  Results are cached, see
+    parse_type.maxsize.
+    """
+    cache = parse_type.cache
+    if s in cache:
+        t = cache.pop(s)
+        cache[s] = t  # most recently used
+        return t
+    t = _TypeParser(s).parse()
+    cache[s] = t
+    if len(cache) > parse_type.maxsize:
+        cache.popitem(last=False)
+    return t
+
+parse_type.cache = OrderedDict()
+parse_type.maxsize = 4096
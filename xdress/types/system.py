@@ -211,7 +211,11 @@ are operations that ``canon()``  performs:
 These shorthands are thus far more useful and intuitive than canonical form described
 above.  It is therefore recommended that users and developers write code that uses
 the shorter versions, Note that ``canon()`` is guaranteed to return strings, tuples,
-and integers only -- making the output of this function hashable.
+and integers only -- making the output of this function hashable.  The tuples are
+in fact interned ``CanonType`` instances, which compare equal to and hash the same as
+the plain tuples, but which are only ever created once per distinct type.
+Strings which are not otherwise known, such as ``'unsigned int'`` or
+``'std::map<int, std::vector<double> >'``, are parsed as C/C++ type spellings.
 
 Built-in Template Types
 -----------------------
@@ -257,24 +261,114 @@ import os
 import io
 import sys
 from contextlib import contextmanager
+from functools import wraps
 from collections import Sequence, Set, Iterable, Mapping
 from numbers import Number
 from pprint import pformat
 from warnings import warn
 import gzip
+import struct
+from copy import copy
 try:
     import cPickle as pickle
 except ImportError:
     import pickle
 
-from xdress.utils import Arg, memoize_method, infer_format
+from xdress.utils import Arg, memoize_method, infer_format, MemoDependencies, \
+    NotSpecified
 from .containers import (_LazyConfigDict, _LazyConverterDict,
-                              _LazyImportDict)
+                              _LazyImportDict, _OverlayDict)
+from .matching import TypeMatcher, TypeMatcherIndex
+from .canonical import CanonType
+from .parsing import parse_type
 from .defaults import get_defaults
 
 if sys.version_info[0] >= 3:
     basestring = str
 
+SNAPSHOT_VERSION = 1
+_SNAPSHOT_MAGIC = b'XDRESSTS'
+_CONVERTER_FIELDS = ('cython_c2py_conv', 'cython_py2c_conv')
+_SHARED_DEFAULTS = None
+
+def _shared_defaults():
+    """Returns the default type system data, which is built on first use and then
+    shared by every type system in the process.  This is a (data, indexes, refs,
+    mutables) tuple where indexes maps the converter fields to TypeMatcherIndexes
+    of their keys, refs maps the ids of the default callables to their
+    (field, key), and mutables maps fields to their keys with mutable values.
+    None of these may be modified, see _copy_default().
+    """
+    global _SHARED_DEFAULTS
+    if _SHARED_DEFAULTS is None:
+        data = get_defaults()
+        indexes = {}
+        for field in _CONVERTER_FIELDS:
+            indexes[field] = TypeMatcherIndex([k for k in data[field] \
+                                               if isinstance(k, TypeMatcher)])
+        refs = {}
+        mutables = {}
+        for field, value in data.items():
+            if not isinstance(value, Mapping):
+                continue
+            mutables[field] = []
+            for k, v in value.items():
+                if callable(v):
+                    refs[id(v)] = (field, k)
+                elif isinstance(v, (list, set, dict)):
+                    mutables[field].append(k)
+        _SHARED_DEFAULTS = (data, indexes, refs, mutables)
+    return _SHARED_DEFAULTS
+
+def _copy_default(field):
+    """Copies a shared default container, and any mutable values in it, so that
+    a type system may modify the copy freely."""
+    data, _, _, mutables = _shared_defaults()
+    x = copy(data[field])
+    for k in mutables.get(field, ()):
+        x[k] = copy(x[k])
+    return x
+
+def _pickle_dumps(data):
+    """Pickles type system data.  Callables from the default type system are
+    stored by reference, since many of them are not picklable themselves."""
+    refs = _shared_defaults()[2]
+    f = io.BytesIO()
+    p = pickle.Pickler(f, pickle.HIGHEST_PROTOCOL)
+    p.persistent_id = lambda obj: refs.get(id(obj), None) if callable(obj) else None
+    p.dump(data)
+    return f.getvalue()
+
+def _pickle_loads(s):
+    """Unpickles type system data written by _pickle_dumps()."""
+    defaults = _shared_defaults()[0]
+    u = pickle.Unpickler(io.BytesIO(s))
+    u.persistent_load = lambda pid: defaults[pid[0]][pid[1]]
+    return u.load()
+
+
+_MODULE_FIELDS = ('extra_types', 'dtypes', 'stlcontainers')
+_LAZY_DICTS = (_LazyConfigDict, _LazyConverterDict, _LazyImportDict)
+
+def _copy_container(x):
+    """Copies a mapping or set, along with any mutable values in it."""
+    if isinstance(x, Mapping):
+        return dict([(k, copy(v) if isinstance(v, (list, set, dict)) else v) \
+                     for k, v in x.items()])
+    return copy(x)
+
+def _mutates(meth):
+    """Decorates the TypeSystem methods which modify the type system so that
+    they raise a TypeError when called on a frozen type system."""
+    @wraps(meth)
+    def wrapper(self, *args, **kwargs):
+        if self._frozen:
+            msg = "{0}() cannot modify a frozen type system, use overlay() instead"
+            raise TypeError(msg.format(meth.__name__))
+        return meth(self, *args, **kwargs)
+    return wrapper
+
+
 class TypeSystem(object):
     """A class representing a type system.
     """
@@ -287,6 +381,8 @@ class TypeSystem(object):
         'cython_functionnames', 'cython_classnames', 'cython_c2py_conv',
         'cython_py2c_conv'])
 
+    _frozen = False
+
     def __init__(self, base_types=None, template_types=None, refined_types=None,
                  humannames=None, extra_types='xdress_extra_types', dtypes='dtypes',
                  stlcontainers='stlcontainers', argument_kinds=None,
@@ -366,58 +462,73 @@ class TypeSystem(object):
             An type that is used to format types to strings in conversion routines.
 
         """
-        defaults = get_defaults()
-
-        self.base_types = base_types if base_types is not None else defaults['base_types']
-        self.template_types = template_types if template_types is not None else defaults['template_types']
-        self.refined_types = refined_types if refined_types is not None else defaults['refined_types']
-        self.humannames = humannames if humannames is not None else defaults['humannames']
+        self._memodeps = MemoDependencies()
+        default_indexes = _shared_defaults()[1]
+
+        self.base_types = base_types if base_types is not None else \
+            _copy_default('base_types')
+        self.template_types = template_types if template_types is not None else \
+            _copy_default('template_types')
+        self.refined_types = refined_types if refined_types is not None else \
+            _copy_default('refined_types')
+        self.humannames = humannames if humannames is not None else \
+            _copy_default('humannames')
         self.extra_types = extra_types
         self.dtypes = dtypes
         self.stlcontainers = stlcontainers
-        self.argument_kinds = argument_kinds if argument_kinds is not None else defaults['argument_kinds']
+        self.argument_kinds = argument_kinds if argument_kinds is not None else \
+            _copy_default('argument_kinds')
         self.variable_namespace = variable_namespace if \
                                   variable_namespace is not None else {}
         self.type_aliases = _LazyConfigDict(type_aliases if type_aliases is not None
-                                            else defaults['type_aliases'], self)
+                                            else _copy_default('type_aliases'), self)
 
         self.cpp_types = _LazyConfigDict(cpp_types if cpp_types is not None
-                                         else defaults['cpp_types'], self)
+                                         else _copy_default('cpp_types'), self)
 
         self.numpy_types = _LazyConfigDict(numpy_types if numpy_types is not None
-                                           else defaults['numpy_types'], self)
+                                           else _copy_default('numpy_types'), self)
 
-        self.from_pytypes = from_pytypes if from_pytypes is not None else defaults['from_pytypes']
+        self.from_pytypes = from_pytypes if from_pytypes is not None else \
+            _copy_default('from_pytypes')
 
         self.cython_ctypes = _LazyConfigDict(cython_ctypes if cython_ctypes is not None
-                                             else defaults['cython_ctypes'], self)
+                                             else _copy_default('cython_ctypes'), self)
 
         self.cython_cytypes = _LazyConfigDict(cython_cytypes if cython_cytypes is not None
-                                              else defaults['cython_cytypes'], self)
+                                              else _copy_default('cython_cytypes'), self)
 
         self.cython_pytypes = _LazyConfigDict(cython_pytypes if cython_pytypes is not None
-                                              else defaults['cython_pytypes'], self)
+                                              else _copy_default('cython_pytypes'), self)
 
         self.cython_cimports = _LazyImportDict(cython_cimports if cython_cimports is not None
-                                               else defaults['cython_cimports'], self)
+                                               else _copy_default('cython_cimports'), self)
 
         self.cython_cyimports = _LazyImportDict(cython_cyimports if cython_cyimports is not None
-                                                else defaults['cython_cyimports'], self)
+                                                else _copy_default('cython_cyimports'), self)
 
         self.cython_pyimports = _LazyImportDict(cython_pyimports if cython_pyimports is not None
-                                                else defaults['cython_pyimports'], self)
+                                                else _copy_default('cython_pyimports'), self)
 
         self.cython_functionnames = _LazyConfigDict(cython_functionnames if cython_functionnames is not None
-                                                    else defaults['cython_functionnames'], self)
+                                                    else _copy_default('cython_functionnames'), self)
 
         self.cython_classnames = _LazyConfigDict(cython_classnames if cython_classnames is not None
-                                                 else defaults['cython_classnames'], self)
+                                                 else _copy_default('cython_classnames'), self)
 
-        self.cython_c2py_conv = _LazyConverterDict(cython_c2py_conv if cython_c2py_conv is not None
-                                                   else defaults['cython_c2py_conv'], self)
+        if cython_c2py_conv is None:
+            self.cython_c2py_conv = _LazyConverterDict(
+                _copy_default('cython_c2py_conv'), self,
+                tms=default_indexes['cython_c2py_conv'])
+        else:
+            self.cython_c2py_conv = _LazyConverterDict(cython_c2py_conv, self)
 
-        self.cython_py2c_conv = _LazyConverterDict(cython_py2c_conv if cython_py2c_conv is not None
-                                                   else defaults['cython_py2c_conv'], self)
+        if cython_py2c_conv is None:
+            self.cython_py2c_conv = _LazyConverterDict(
+                _copy_default('cython_py2c_conv'), self,
+                tms=default_indexes['cython_py2c_conv'])
+        else:
+            self.cython_py2c_conv = _LazyConverterDict(cython_py2c_conv, self)
 
         self.typestr = typestring or typestr
 
@@ -450,6 +561,7 @@ class TypeSystem(object):
 
             * pickle ('.pkl')
             * gzipped pickle ('.pkl.gz')
+            * binary snapshot ('.tss')
 
         mode : str, optional
             The mode to open the file with.
@@ -460,16 +572,28 @@ class TypeSystem(object):
             raise RuntimeError("{0!r} not found.".format(filename))
         if format == 'pkl.gz':
             f = gzip.open(filename, 'rb')
-            data = pickle.loads(f.read())
+            data = _pickle_loads(f.read())
             f.close()
         elif format == 'pkl':
             with io.open(filename, 'rb') as f:
-                data = pickle.loads(f.read())
+                data = _pickle_loads(f.read())
+        elif format == 'tss':
+            with io.open(filename, 'rb') as f:
+                s = f.read()
+            hdrlen = len(_SNAPSHOT_MAGIC) + 2
+            if not s.startswith(_SNAPSHOT_MAGIC):
+                raise ValueError("{0!r} is not a type system snapshot.".format(filename))
+            version = struct.unpack('<H', s[len(_SNAPSHOT_MAGIC):hdrlen])[0]
+            if version != SNAPSHOT_VERSION:
+                msg = "{0!r} is a version {1} type system snapshot, expected {2}."
+                raise ValueError(msg.format(filename, version, SNAPSHOT_VERSION))
+            data = _pickle_loads(s[hdrlen:])
         x = cls(**data)
         return x
 
     def dump(self, filename, format=None, mode='wb'):
-        """Saves a type system out to disk.
+        """Saves a type system out to disk.  Callables which come from the default
+        type system are saved by reference.
 
         Parameters
         ----------
@@ -481,21 +605,31 @@ class TypeSystem(object):
 
             * pickle ('.pkl')
             * gzipped pickle ('.pkl.gz')
+            * binary snapshot ('.tss'), an uncompressed and versioned pickle
+              which is the fastest to load.
 
         mode : str, optional
             The mode to open the file with.
 
         """
-        data = dict([(k, getattr(self, k, None)) for k in self.datafields])
+        data = {}
+        for k in self.datafields:
+            v = getattr(self, k, None)
+            data[k] = getattr(v, '_d', v)  # unwrap lazy dicts
         format = infer_format(filename, format)
         if format == 'pkl.gz':
             f = gzip.open(filename, mode)
-            f.write(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+            f.write(_pickle_dumps(data))
             f.close()
         elif format == 'pkl':
             with io.open(filename, mode) as f:
-                f.write(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+                f.write(_pickle_dumps(data))
+        elif format == 'tss':
+            with io.open(filename, mode) as f:
+                f.write(_SNAPSHOT_MAGIC + struct.pack('<H', SNAPSHOT_VERSION))
+                f.write(_pickle_dumps(data))
 
+    @_mutates
     def update(self, *args, **kwargs):
         """Updates the type system in-place. Only updates the data attributes
         named in 'datafields'.  This may be called with any of the following
@@ -647,7 +781,13 @@ class TypeSystem(object):
 
     @memoize_method
     def canon(self, t):
-        """Turns the type into its canonical form. See module docs for more information."""
+        """Turns the type into its canonical form. See module docs for more
+        information.  Non-string types are returned as interned CanonType
+        instances, which compare equal to the equivalent tuples."""
+        t = self._canon(t)
+        return CanonType(t) if isinstance(t, tuple) else t
+
+    def _canon(self, t):
         if isinstance(t, basestring):
             if t in self.base_types:
                 return t
@@ -658,11 +798,12 @@ class TypeSystem(object):
             elif self.isdependent(t):
                 return self._resolve_dependent_type(t)
             else:
-                _raise_type_error(t)
-                # BELOW this would be for complicated string representations,
-                # such as 'char *' or 'map<nucid, double>'.  Would need to write
-                # the parse_type() function and that might be a lot of work.
-                #parse_type(t)
+                # complicated string representations, such as 'char *' or
+                # 'std::map<int, double>', are parsed as C/C++ type spellings
+                parsed = parse_type(t)
+                if parsed == t:
+                    _raise_type_error(t)
+                return self.canon(parsed)
         elif isinstance(t, Sequence):
             t0 = t[0]
             tlen = len(t)
@@ -1061,7 +1202,6 @@ class TypeSystem(object):
             #    cypyt += ' {0}'.format(last)
             return cypyt
 
-    @memoize_method
     def cython_cimport_tuples(self, t, seen=None, inc=frozenset(['c', 'cy'])):
         """Given a type t, and possibly previously seen cimport tuples (set),
         return the set of all seen cimport tuples.  These tuple have four possible
@@ -1074,10 +1214,24 @@ class TypeSystem(object):
           ``from {module-name} cimport {var-or-mod} as {alias}``
         * ``(module-name, 'as', alias)`` becomes ``cimport {module-name} as {alias}``
 
+        The tuples for t itself come from cython_cimport_set(), so prefer
+        unioning the results of that method when collecting many types.
         """
-        t = self.canon(t)
         if seen is None:
             seen = set()
+        seen.update(self.cython_cimport_set(t, frozenset(inc)))
+        return seen
+
+    @memoize_method
+    def cython_cimport_set(self, t, inc=frozenset(['c', 'cy'])):
+        """Returns the frozenset of cimport tuples needed by a type t, see
+        cython_cimport_tuples() for their interpretation.  The inc argument
+        selects the C ('c') and/or Cython ('cy') level cimports.  Since the
+        result is immutable, it is memoized per canonical type.
+        """
+        t = self.canon(t)
+        inc = frozenset(inc)
+        seen = set()
         if isinstance(t, basestring):
             if t in self.base_types:
                 if 'c' in inc:
@@ -1085,7 +1239,7 @@ class TypeSystem(object):
                 if 'cy' in inc:
                     seen.update(self.cython_cyimports[t])
                 seen -= set((None, (None,)))
-                return seen
+            return frozenset(seen)
         # must be tuple below this line
         tlen = len(t)
         if 2 == tlen:
@@ -1103,8 +1257,7 @@ class TypeSystem(object):
                         f(t[1], self, seen)
                 seen.update(self.cython_cyimports.get(t[0], (None,)))
                 seen.update(self.cython_cyimports.get(t[1], (None,)))
-            seen -= set((None, (None,)))
-            return self.cython_cimport_tuples(t[0], seen, inc)
+            seen.update(self.cython_cimport_set(t[0], inc))
         elif 3 <= tlen:
             assert t[0] in self.template_types
             if 'c' in inc:
@@ -1116,9 +1269,9 @@ class TypeSystem(object):
                     continue
                 elif isinstance(x, basestring) and x not in self.cython_cimports:
                     continue
-                self.cython_cimport_tuples(x, seen, inc)
-            seen -= set((None, (None,)))
-            return seen
+                seen.update(self.cython_cimport_set(x, inc))
+        seen -= set((None, (None,)))
+        return frozenset(seen)
 
     _cython_cimport_cases = {
         1: lambda tup: "cimport {0}".format(*tup),
@@ -1136,7 +1289,6 @@ class TypeSystem(object):
         return set([self._cython_cimport_cases[len(tup)](tup) for tup in x \
                                                               if 0 != len(tup)])
 
-    @memoize_method
     def cython_import_tuples(self, t, seen=None):
         """Given a type t, and possibly previously seen import tuples (set),
         return the set of all seen import tuples.  These tuple have four possible
@@ -1149,16 +1301,28 @@ class TypeSystem(object):
           ``from {module-name} import {var-or-mod} as {alias}``
         * ``(module-name, 'as', alias)`` becomes ``import {module-name} as {alias}``
 
-        Any of these may be used.
+        Any of these may be used.  The tuples for t itself come from
+        cython_import_set(), so prefer unioning the results of that method when
+        collecting many types.
         """
-        t = self.canon(t)
         if seen is None:
             seen = set()
+        seen.update(self.cython_import_set(t))
+        return seen
+
+    @memoize_method
+    def cython_import_set(self, t):
+        """Returns the frozenset of import tuples needed by a type t, see
+        cython_import_tuples() for their interpretation.  Since the result is
+        immutable, it is memoized per canonical type.
+        """
+        t = self.canon(t)
+        seen = set()
         if isinstance(t, basestring):
             if t in self.base_types:
                 seen.update(self.cython_pyimports[t])
                 seen -= set((None, (None,)))
-                return seen
+            return frozenset(seen)
         # must be tuple below this line
         tlen = len(t)
         if 2 == tlen:
@@ -1168,8 +1332,7 @@ class TypeSystem(object):
                     f(t[1], self, seen)
             seen.update(self.cython_pyimports.get(t[0], (None,)))
             seen.update(self.cython_pyimports.get(t[1], (None,)))
-            seen -= set((None, (None,)))
-            return self.cython_import_tuples(t[0], seen)
+            seen.update(self.cython_import_set(t[0]))
         elif 3 <= tlen:
             assert t[0] in self.template_types
             seen.update(self.cython_pyimports[t[0]])
@@ -1178,9 +1341,9 @@ class TypeSystem(object):
                     continue
                 elif isinstance(x, basestring) and x not in self.cython_cimports:
                     continue
-                self.cython_import_tuples(x, seen)
-            seen -= set((None, (None,)))
-            return seen
+                seen.update(self.cython_import_set(x))
+        seen -= set((None, (None,)))
+        return frozenset(seen)
 
     _cython_import_cases = {
         1: lambda tup: "import {0}".format(*tup),
@@ -1316,14 +1479,21 @@ class TypeSystem(object):
     @memoize_method
     def cython_c2py(self, name, t, view=True, cached=True, inst_name=None,
                     proxy_name=None, cache_name=None, cache_prefix='self',
-                    existing_name=None):
+                    existing_name=None, move=False):
         """Given a variable name and type, returns cython code (declaration, body,
-        and return statements) to convert the variable from C/C++ to Python."""
+        and return statements) to convert the variable from C/C++ to Python.
+        If move is True, the variable is a temporary that is not used afterwards
+        and types which are able to will take ownership of its contents rather
+        than copying them.  Other types fall back to copying."""
         t = self.canon(t)
         c2pyt = self.cython_c2py_getitem(t)
         ind = int(view) + int(cached)
         if cached and not view:
             raise ValueError('cached views require view=True.')
+        if move:
+            if view:
+                raise ValueError('moves require view=False.')
+            ind = 3 if c2pyt is not NotImplemented and 3 < len(c2pyt) else 0
         if c2pyt is NotImplemented:
             raise NotImplementedError('conversion from C/C++ to Python for ' + \
                                       t + 'has not been implemented for when ' + \
@@ -1348,9 +1518,9 @@ class TypeSystem(object):
             else:
                 decl = body = None
                 rtn = c2pyt[0].format(**template_kw)
-        elif ind == 1:
+        elif ind == 1 or ind == 3:
             decl = "cdef {0} {1}".format(tstr.cython_cytype, proxy_name)
-            body = c2pyt[1].format(**template_kw)
+            body = c2pyt[ind].format(**template_kw)
             rtn = proxy_name
         elif ind == 2:
             decl = "cdef {0} {1}".format(tstr.cython_cytype, proxy_name)
@@ -1458,6 +1628,7 @@ class TypeSystem(object):
 
     #################  Some utility functions for the typesystem #############
 
+    @_mutates
     def register_class(self, name=None, template_args=None, cython_c_type=None,
                        cython_cimport=None, cython_cy_type=None, cython_py_type=None,
                        cython_template_class_name=None,
@@ -1520,7 +1691,9 @@ class TypeSystem(object):
             self.cython_classnames[name] = cython_template_class_name
         if (cython_template_function_name is not None):
             self.cython_functionnames[name] = cython_template_function_name
+        self.invalidatememo([name])
 
+    @_mutates
     def deregister_class(self, name):
         """This function will remove a previously registered class from
         the type system.
@@ -1547,8 +1720,9 @@ class TypeSystem(object):
         self.cython_py2c_conv.pop(name, None)
         self.cython_classnames.pop(name, None)
 
-        self.clearmemo()
+        self.invalidatememo([name])
 
+    @_mutates
     def register_classname(self, classname, package, pxd_base, cpppxd_base,
                            cpp_classname=None, make_dtypes=True):
         """Registers a class with the type system from only its name,
@@ -1734,6 +1908,7 @@ class TypeSystem(object):
             )
         self.register_class(**kwclassdblptr)
 
+    @_mutates
     def register_refinement(self, name, refinementof, cython_cimport=None,
                             cython_cyimport=None, cython_pyimport=None,
                             cython_c2py=None, cython_py2c=None):
@@ -1761,7 +1936,9 @@ class TypeSystem(object):
             cython_py2c = (cython_py2c, False)
         if cython_py2c is not None:
             self.cython_py2c_conv[name] = cython_py2c
+        self.invalidatememo([name])
 
+    @_mutates
     def deregister_refinement(self, name):
         """This function will remove a previously registered refinement from
         the type system.
@@ -1772,8 +1949,9 @@ class TypeSystem(object):
         self.cython_cimports.pop(name, None)
         self.cython_cyimports.pop(name, None)
         self.cython_pyimports.pop(name, None)
-        self.clearmemo()
+        self.invalidatememo([name])
 
+    @_mutates
     def register_specialization(self, t, cython_c_type=None, cython_cy_type=None,
                                 cython_py_type=None, cython_cimport=None,
                                 cython_cyimport=None, cython_pyimport=None):
@@ -1793,7 +1971,9 @@ class TypeSystem(object):
             self.cython_cyimports[t] = cython_cyimport
         if cython_pyimport is not None:
             self.cython_pyimports[t] = cython_pyimport
+        self.invalidatememo([t])
 
+    @_mutates
     def deregister_specialization(self, t):
         """This function will remove previously registered template specialization."""
         t = self.canon(t)
@@ -1803,8 +1983,9 @@ class TypeSystem(object):
         self.cython_cimports.pop(t, None)
         self.cython_cyimports.pop(t, None)
         self.cython_pyimports.pop(t, None)
-        self.clearmemo()
+        self.invalidatememo([t])
 
+    @_mutates
     def register_numpy_dtype(self, t, cython_cimport=None, cython_cyimport=None,
                              cython_pyimport=None):
         """This function will add a type to the system as numpy dtype that lives in
@@ -1835,6 +2016,7 @@ class TypeSystem(object):
         x = x + _ensure_importable(cython_pyimport)
         self.cython_pyimports[t] = x
 
+    @_mutates
     def register_argument_kinds(self, t, argkinds):
         """Registers an argument kind tuple into the type system for a template type.
         """
@@ -1848,12 +2030,14 @@ class TypeSystem(object):
                 warn(msg.format(t, old, argkinds), RuntimeWarning)
         self.argument_kinds[t] = argkinds
 
+    @_mutates
     def deregister_argument_kinds(self, t):
         """Removes a type and its argument kind tuple from the type system."""
         t = self.canon(t)
         if t in self.argument_kinds:
             del self.argument_kinds[t]
 
+    @_mutates
     def register_variable_namespace(self, name, namespace, t=None):
         """Registers a variable and its namespace in the typesystem.
         """
@@ -1875,40 +2059,62 @@ class TypeSystem(object):
 
     def clearmemo(self):
         """Clears all method memoizations on this type system instance."""
-        # see utils.memozie_method
+        # see utils.memoize_method, the per-method dicts are cleared in-place
+        # since the memoized bound methods hold on to them
         if hasattr(self, '_cache'):
-            self._cache.clear()
+            for cache in self._cache.values():
+                cache.clear()
+        self._memodeps.clear()
+
+    def invalidatememo(self, names):
+        """Clears only the method memoizations on this type system instance which
+        depend on any of the given type names, or on the module name placeholders
+        such as '{dtypes}'.  Tuple names also invalidate everything which depends
+        on their first element, since dependent types and template
+        specializations are looked up by it.  Returns the number of memoized
+        results that were removed.
+        """
+        if not hasattr(self, '_cache'):
+            return 0
+        return self._memodeps.invalidate(_memo_tokens(names), self._cache)
 
     def delmemo(self, meth, *args, **kwargs):
         """Deletes a single key from a method on this type system instance."""
-        # see utils.memozie_method
+        # see utils.memoize_method
         if hasattr(self, '_cache'):
-            meth = getattr(self, meth )if isinstance(meth, basestring) else meth
-            del self._cache[meth.func.meth, args, tuple(sorted(kwargs.items()))]
+            meth = getattr(self, meth) if isinstance(meth, basestring) else meth
+            del self._cache[meth.__name__][memoize_method.key(args, kwargs)]
 
     @contextmanager
+    @_mutates
     def swap_dtypes(self, s):
         """A context manager for temporarily swapping out the dtypes value
         with a new value and replacing the original value before exiting."""
         old = self.dtypes
         self.dtypes = s
-        self.clearmemo()
+        if s != old:
+            self.invalidatememo(['{dtypes}'])
         yield
-        self.clearmemo()
         self.dtypes = old
+        if s != old:
+            self.invalidatememo(['{dtypes}'])
 
     @contextmanager
+    @_mutates
     def swap_stlcontainers(self, s):
         """A context manager for temporarily swapping out the stlcontainer value
         with a new value and replacing the original value before exiting."""
         old = self.stlcontainers
         self.stlcontainers = s
-        self.clearmemo()
+        if s != old:
+            self.invalidatememo(['{stlcontainers}'])
         yield
-        self.clearmemo()
         self.stlcontainers = old
+        if s != old:
+            self.invalidatememo(['{stlcontainers}'])
 
     @contextmanager
+    @_mutates
     def local_classes(self, classnames, typesets=frozenset(['cy', 'py'])):
         """A context manager for making sure the given classes are local."""
         saved = {}
@@ -1919,7 +2125,7 @@ class TypeSystem(object):
                 saved[name, 'cy'] = _undot_class_name(name, self.cython_cytypes)
             if 'py' in typesets and name in self.cython_pytypes:
                 saved[name, 'py'] = _undot_class_name(name, self.cython_pytypes)
-        self.clearmemo()
+        self.invalidatememo(classnames)
         yield
         for name in classnames:
             if 'c' in typesets and name in self.cython_ctypes:
@@ -1928,7 +2134,129 @@ class TypeSystem(object):
                 _redot_class_name(name, self.cython_cytypes, saved[name, 'cy'])
             if 'py' in typesets and name in self.cython_pytypes:
                 _redot_class_name(name, self.cython_pytypes, saved[name, 'py'])
-        self.clearmemo()
+        self.invalidatememo(classnames)
+
+    @property
+    def frozen(self):
+        """Whether this is an immutable type system, see freeze()."""
+        return self._frozen
+
+    def freeze(self):
+        """Returns an immutable snapshot of this type system.  The snapshot holds
+        copies of this type system's data and memoized results, so that later
+        changes to this type system do not affect it.  Frozen type systems may
+        not be modified.  Instead, overlay() cheaply derives new frozen type
+        systems from them, which may be used concurrently.  Freezing a frozen
+        type system returns it unchanged.
+        """
+        if self._frozen:
+            return self
+        return self._derive(_copy_container, (), {})
+
+    def overlay(self, local_classes=(), typesets=frozenset(['cy', 'py']),
+                **modules):
+        """Returns a frozen type system which is layered over a frozen snapshot of
+        this one.  Lookups fall through to the snapshot, which is never modified,
+        and the memoized results of the snapshot which do not depend on what the
+        overlay changes are shared.  Each thread of code generation should use
+        its own overlay.
+
+        Parameters
+        ----------
+        local_classes : sequence of str, optional
+            Classes which should be local to the overlay, see local_classes().
+        typesets : set of str, optional
+            The type sets which the classes are local in, any of 'c', 'cy', and
+            'py'.
+        modules : str or None, optional
+            New values for the extra_types, dtypes, and stlcontainers module
+            names, eg ``stlcontainers=None``.
+
+        Returns
+        -------
+        ts : TypeSystem
+            The frozen overlay.
+
+        """
+        for k in modules:
+            if k not in _MODULE_FIELDS:
+                raise TypeError("{0!r} is not a module name field".format(k))
+        parent = self.freeze()
+        names = list(local_classes)
+        names += ['{' + k + '}' for k, v in modules.items() \
+                  if v != getattr(parent, k, None)]
+        x = parent._derive(_OverlayDict, _memo_tokens(names), modules)
+        for name in local_classes:
+            if 'c' in typesets and name in x.cython_ctypes:
+                _undot_class_name(name, x.cython_ctypes)
+            if 'cy' in typesets and name in x.cython_cytypes:
+                _undot_class_name(name, x.cython_cytypes)
+            if 'py' in typesets and name in x.cython_pytypes:
+                _undot_class_name(name, x.cython_pytypes)
+        return x
+
+    def _derive(self, layer, exclude, modules):
+        """Returns a new frozen type system whose containers are layer() of this
+        one's, and which inherits the memoized results that do not depend on the
+        excluded tokens."""
+        x = self.__class__.__new__(self.__class__)
+        x._frozen = True
+        x._memodeps = MemoDependencies()
+        for field in self.datafields:
+            if field in _MODULE_FIELDS:
+                if hasattr(self, field):
+                    setattr(x, field, modules.get(field, getattr(self, field)))
+                continue
+            value = getattr(self, field)
+            if isinstance(value, _LAZY_DICTS):
+                if isinstance(value, _LazyConverterDict):
+                    # the matcher index is copied on write by both owners
+                    value._tms_shared = True
+                    value = value.__class__(layer(value._d), x, tms=value._tms)
+                else:
+                    value = value.__class__(layer(value._d), x)
+            elif isinstance(value, Set):
+                value = frozenset(value)
+            else:
+                value = layer(value)
+            setattr(x, field, value)
+        x.typestr = self.typestr
+        if hasattr(self, '_cache'):
+            caches = self._cache
+            x._cache = xcaches = {}
+            for name, key in x._memodeps.inherit(self._memodeps, exclude):
+                value = caches.get(name, {}).get(key, NotSpecified)
+                if value is NotSpecified:
+                    continue
+                if name not in xcaches:
+                    xcaches[name] = {}
+                xcaches[name][key] = value
+        return x
+
+    @contextmanager
+    def localized(self, classnames=(), typesets=frozenset(['cy', 'py']),
+                  **modules):
+        """A context manager which yields a type system where the given classes
+        are local and the given module names, eg ``stlcontainers=None``, are
+        swapped in.  For frozen type systems this is an overlay().  Otherwise this
+        type system itself is temporarily modified, as with local_classes().
+        """
+        if self._frozen:
+            yield self.overlay(classnames, typesets, **modules)
+            return
+        for k in modules:
+            if k not in _MODULE_FIELDS:
+                raise TypeError("{0!r} is not a module name field".format(k))
+        old = dict([(k, getattr(self, k)) for k in modules])
+        tokens = ['{' + k + '}' for k, v in modules.items() if v != old[k]]
+        with self.local_classes(classnames, typesets):
+            for k, v in modules.items():
+                setattr(self, k, v)
+            self.invalidatememo(tokens)
+            yield self
+            for k, v in old.items():
+                setattr(self, k, v)
+            self.invalidatememo(tokens)
 
 #################### Type System Above This Line ##############################
 
@@ -2238,6 +2566,16 @@ class typestr(object):
 def _raise_type_error(t):
     raise TypeError("type of {0!r} could not be determined".format(t))
 
+def _memo_tokens(names):
+    """Returns the memo dependency tokens for type names, see
+    TypeSystem.invalidatememo()."""
+    tokens = set()
+    for name in names:
+        tokens.add(name)
+        if isinstance(name, (tuple, CanonType)) and 0 < len(name):
+            tokens.add(name[0])
+    return tokens
+
 def _undot_class_name(name, d):
     value = d[name]
     if '.' not in value:
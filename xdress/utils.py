@@ -12,7 +12,9 @@ import re
 import ast
 import sys
 import glob
+import sqlite3
 import functools
+import threading
 from copy import deepcopy
 from pprint import pformat
 from collections import Mapping, Iterable, Hashable, Sequence, namedtuple
@@ -516,6 +518,8 @@ def infer_format(filename, format):
         format = 'pkl.gz'
     elif filename.endswith('.pkl'):
         format = 'pkl'
+    elif filename.endswith('.tss'):
+        format = 'tss'
     else:
         raise ValueError("file format could not be determined.")
     return format
@@ -536,72 +540,281 @@ def sortedbytype(iterable):
 nyansep = r'~\_/' * 17 + '~=[,,_,,]:3'
 """WAT?!"""
 
-class DescriptionCache(object):
-    """A quick persistent cache for descriptions from files.
-    The keys are (classname, filename, kind) tuples.  The values are
-    (hashes-of-the-file, description-dictionary) tuples."""
+class FileFingerprints(object):
+    """A per-run service for fingerprinting files.  A fingerprint is a
+    (stat, md5-hash) tuple, where stat is (path, size, mtime_ns, inode).  The
+    contents of any given file are hashed at most once for each distinct stat and
+    a file whose stat matches a previously stored fingerprint is not hashed at
+    all.  Use the module-level ``fingerprints`` instance so that every cache
+    shares the same hashes.
+    """
 
-    def __init__(self, cachefile=os.path.join('build', 'desc.cache')):
+    def __init__(self):
+        self._hashes = {}
+
+    def stat(self, filename):
+        """Returns the (path, size, mtime_ns, inode) tuple for a file."""
+        st = os.stat(filename)
+        mtime_ns = getattr(st, 'st_mtime_ns', None)
+        if mtime_ns is None:
+            mtime_ns = int(st.st_mtime * 1000000000)
+        return (filename, st.st_size, mtime_ns, st.st_ino)
+
+    def hash(self, filename, stat=None):
+        """Returns the md5 hex digest of a file's contents."""
+        stat = self.stat(filename) if stat is None else stat
+        h = self._hashes.get(stat, None)
+        if h is None:
+            with io.open(filename, 'rb') as f:
+                h = md5(f.read()).hexdigest()
+            self._hashes[stat] = h
+        return h
+
+    def fingerprint(self, filename):
+        """Returns the current (stat, hash) fingerprint of a file."""
+        stat = self.stat(filename)
+        return stat, self.hash(filename, stat=stat)
+
+    def matches(self, filename, fingerprint):
+        """Boolean on whether a file is unchanged since the fingerprint was
+        taken.  The file is only hashed if its stat has changed."""
+        try:
+            stat, h = fingerprint
+            currstat = self.stat(filename)
+        except (TypeError, ValueError, OSError):
+            return False
+        if currstat == stat:
+            return True
+        return self.hash(filename, stat=currstat) == h
+
+    def clear(self):
+        """Forgets all hashes."""
+        self._hashes.clear()
+
+fingerprints = FileFingerprints()
+"""The file fingerprint service shared by all caches."""
+
+class PersistentCache(object):
+    """A persistent cache, backed by an SQLite database, whose values depend on
+    the state of source files.  The values stored are (fingerprints-of-the-files,
+    value) tuples, see FileFingerprints.  Entries are read from disk only when they are first asked
+    for and only new or changed entries are written back, in batches.  Since
+    every batch is written in a single transaction an interrupted run never
+    corrupts the cache.  Values may also depend on further files, such as the
+    headers that the source files include, see set().  Subclasses should
+    implement the _srcfiles() method.  Caches may be used as context managers,
+    which close() them on exit.
+    """
+
+    batchsize = 100
+    """Number of changed entries that are held in memory before they are
+    automatically written to disk."""
+
+    def __init__(self, cachefile):
         """Parameters
         -------------
-        cachefile : str, optional
-            Path to description cachefile.
+        cachefile : str
+            Path to the cache file.
 
         """
         self.cachefile = cachefile
-        if os.path.isfile(cachefile):
-            with io.open(cachefile, 'rb') as f:
-                self.cache = pickle.load(f)
-        else:
-            self.cache = {}
+        self._db = None
+        self._entries = {}  # database key -> (key, fps, value), None if absent
+        self._dirty = set()
+
+    def _srcfiles(self, key):
+        """Returns the source files that the entry for a key depends on, by
+        default none."""
+        return ()
+
+    def _normkey(self, key):
+        return key
+
+    def _dbkey(self, key):
+        return repr(key)
+
+    def _fingerprint_srcfiles(self, srcfiles):
+        return tuple([fingerprints.fingerprint(srcfile) for srcfile in srcfiles])
+
+    def _connect(self):
+        if self._db is not None:
+            return self._db
+        ensuredirs(self.cachefile)
+        for i in range(2):
+            db = sqlite3.connect(self.cachefile)
+            try:
+                db.execute("CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, "
+                           "pkey BLOB, hashes BLOB, value BLOB)")
+                break
+            except sqlite3.DatabaseError:
+                # not a database, likely an older pickled cache
+                db.close()
+                if i == 1:
+                    raise
+                os.remove(self.cachefile)
+        self._db = db
+        return db
+
+    def _entry(self, key):
+        """Returns the (key, fingerprints, value) entry for a key or None, loading
+        it from disk if needed."""
+        dbkey = self._dbkey(key)
+        if dbkey in self._entries:
+            return self._entries[dbkey]
+        entry = None
+        if os.path.isfile(self.cachefile):
+            cur = self._connect().execute("SELECT pkey, hashes, value FROM cache "
+                                          "WHERE key = ?", (dbkey,))
+            row = cur.fetchone()
+            if row is not None:
+                entry = tuple([pickle.loads(bytes(x)) for x in row])
+        self._entries[dbkey] = entry
+        return entry
 
-    def _hash_srcfiles(self, srcfiles):
-        hashes = []
-        for srcfile in srcfiles:
-            with io.open(srcfile, 'rb') as f:
-                filebytes = f.read()
-            hashes.append(md5(filebytes).hexdigest())
-        return tuple(hashes)
-
-    def isvalid(self, name, kind):
-        """Boolean on whether the cach value for a (apiname, kind)
-        tuple matches the state of the file on the system."""
-        key = tuple(name) + (kind,)
-        if key not in self.cache:
+    def __contains__(self, key):
+        return self._entry(self._normkey(key)) is not None
+
+    def isvalid(self, key):
+        """Boolean on whether the cache value for a key matches the state of
+        the files on the system."""
+        key = self._normkey(key)
+        entry = self._entry(key)
+        if entry is None:
+            return False
+        srcfiles = self._srcfiles(key)
+        cachefps = entry[1]
+        if len(cachefps) < len(srcfiles):
             return False
-        cachehashes = self.cache[key][0]
-        currhashes = self._hash_srcfiles(name.srcfiles)
-        return cachehashes == currhashes
+        for srcfile, fp in zip(srcfiles, cachefps):
+            if not fingerprints.matches(srcfile, fp):
+                return False
+        # the remaining fingerprints are for the files that were included
+        for fp in cachefps[len(srcfiles):]:
+            if not fingerprints.matches(fp[0][0], fp):
+                return False
+        return True
 
     def __getitem__(self, key):
-        if len(key) == 2 and isinstance(key[0], apiname):
-            key = tuple(key[0]) + key[1:]
-        return self.cache[key][1]  # return the description only
+        entry = self._entry(self._normkey(key))
+        if entry is None:
+            raise KeyError(key)
+        return entry[2]  # return the value only
 
     def __setitem__(self, key, value):
-        if len(key) == 2 and isinstance(key[0], apiname):
-            name, kind = key
-            key = tuple(key[0]) + key[1:]
-        else:
-            name, kind = apiname(*key[0]), key[1]
-        currhashes = self._hash_srcfiles(name.srcfiles)
-        self.cache[key] = (currhashes, value)
+        self.set(key, value)
+
+    def set(self, key, value, deps=()):
+        """Sets the value for a key.
+
+        Parameters
+        ----------
+        key : hashable
+            The cache key.
+        value : object
+            The value to cache.
+        deps : sequence of str, optional
+            Further files, beyond the source files of the key, that the value
+            depends on.  This is typically the include closure of the source
+            files. The entry is invalidated when any of these files change.
+
+        """
+        key = self._normkey(key)
+        srcfiles = tuple(self._srcfiles(key))
+        deps = [dep for dep in deps if dep not in srcfiles and os.path.isfile(dep)]
+        currfps = self._fingerprint_srcfiles(srcfiles + tuple(sorted(set(deps))))
+        entry = (key, currfps, value)
+        if self._entry(key) == entry:
+            return
+        dbkey = self._dbkey(key)
+        self._entries[dbkey] = entry
+        self._dirty.add(dbkey)
+        if len(self._dirty) >= self.batchsize:
+            self.dump()
 
     def __delitem__(self, key):
-        del self.cache[key]
+        key = self._normkey(key)
+        if self._entry(key) is None:
+            raise KeyError(key)
+        dbkey = self._dbkey(key)
+        self._entries[dbkey] = None
+        self._dirty.add(dbkey)
 
     def dump(self):
-        """Writes the cache out to the filesystem."""
-        if not os.path.exists(self.cachefile):
-            pardir = os.path.split(self.cachefile)[0]
-            if not os.path.exists(pardir):
-                os.makedirs(pardir)
-        with io.open(self.cachefile, 'wb') as f:
-            pickle.dump(self.cache, f, pickle.HIGHEST_PROTOCOL)
+        """Writes any new or changed entries out to the filesystem."""
+        if len(self._dirty) == 0:
+            return
+        db = self._connect()
+        dumps = lambda x: sqlite3.Binary(pickle.dumps(x, pickle.HIGHEST_PROTOCOL))
+        with db:
+            for dbkey in sorted(self._dirty):
+                entry = self._entries[dbkey]
+                if entry is None:
+                    db.execute("DELETE FROM cache WHERE key = ?", (dbkey,))
+                else:
+                    db.execute("INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)",
+                               (dbkey,) + tuple([dumps(x) for x in entry]))
+        self._dirty.clear()
+
+    def load(self):
+        """Reads all entries from disk into memory."""
+        if not os.path.isfile(self.cachefile):
+            return
+        cur = self._connect().execute("SELECT key, pkey, hashes, value FROM cache")
+        for row in cur:
+            if row[0] not in self._entries:
+                self._entries[row[0]] = tuple([pickle.loads(bytes(x)) \
+                                               for x in row[1:]])
+
+    def close(self):
+        """Writes out any new or changed entries and closes the database.  The
+        cache may still be used afterwards, which reopens the database."""
+        self.dump()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def cache(self):
+        """A dictionary of all (fingerprints, value) tuples in the cache."""
+        self.load()
+        return dict([(e[0], e[1:]) for e in self._entries.values() if e is not None])
 
     def __str__(self):
         return pformat(self.cache)
 
+class DescriptionCache(PersistentCache):
+    """A quick persistent cache for descriptions from files.
+    The keys are (classname, filename, kind) tuples.  The values are
+    (fingerprints-of-the-file, description-dictionary) tuples."""
+
+    def __init__(self, cachefile=os.path.join('build', 'desc.cache')):
+        """Parameters
+        -------------
+        cachefile : str, optional
+            Path to description cachefile.
+
+        """
+        super(DescriptionCache, self).__init__(cachefile)
+
+    def _normkey(self, key):
+        if len(key) == 2 and isinstance(key[0], apiname):
+            key = tuple(key[0]) + key[1:]
+        return tuple(key)
+
+    def _srcfiles(self, key):
+        return apiname(*key[:-1]).srcfiles
+
+    def isvalid(self, name, kind):
+        """Boolean on whether the cach value for a (apiname, kind)
+        tuple matches the state of the file on the system."""
+        return super(DescriptionCache, self).isvalid((name, kind))
+
 def merge_descriptions(descriptions):
     """Given a sequence of descriptions, in order of increasing precedence,
     merge them into a single description dictionary."""
@@ -710,35 +923,188 @@ def memoize(obj):
             return obj(*args, **kwargs)
     return memoizer
 
+def _add_memo_tokens(x, tokens):
+    """Adds all of the strings and tuples in a (nested) value to a set."""
+    if isinstance(x, basestring):
+        tokens.add(x)
+    elif isinstance(x, Sequence):
+        try:
+            tokens.add(x)
+        except TypeError:
+            pass  # unhashable
+        for y in x:
+            _add_memo_tokens(y, tokens)
+
+class _MemoStack(threading.local):
+    """The token sets for the results which the current thread is computing."""
+
+    def __init__(self):
+        self.stack = []
+
+class MemoDependencies(object):
+    """Records which tokens -- typically type names -- each memoized method
+    result consulted, so that only the results which depend on a token need to
+    be thrown away when that token changes.  The tokens for a result are all of
+    the strings and tuples in its arguments, the tokens which are explicitly
+    consulted while computing it, and the tokens of every memoized result
+    that was used while computing it.  See memoize_method.  Each thread keeps
+    track of the results that it is computing on its own, so that instances may
+    be shared between threads.
+    """
+
+    def __init__(self):
+        self._local = _MemoStack()  # per thread results being computed
+        self._deps = {}   # memo key -> frozenset of tokens
+        self._keys = {}   # token -> set of memo keys
+
+    @property
+    def _stack(self):
+        return self._local.stack
+
+    def active(self):
+        """Whether any results are currently being computed."""
+        return 0 < len(self._stack)
+
+    def consult(self, token):
+        """Records that the results currently being computed depend on a token."""
+        if self._stack:
+            self._stack[-1].add(token)
+
+    def hit(self, key):
+        """Records that a memoized result was used by the results currently
+        being computed."""
+        if self._stack:
+            self._stack[-1].update(self._deps.get(key, ()))
+
+    def push(self):
+        """Starts computing a new result."""
+        self._stack.append(set())
+
+    def pop(self, key, args):
+        """Finishes computing the result for a memo key, which was called with
+        the given arguments.  The key may be None if the result is not stored."""
+        tokens = self._stack.pop()
+        _add_memo_tokens(args, tokens)
+        if self._stack:
+            self._stack[-1].update(tokens)
+        if key is None:
+            return
+        self._deps[key] = frozenset(tokens)
+        keys = self._keys
+        for token in tokens:
+            keys.setdefault(token, set()).add(key)
+
+    def invalidate(self, tokens, caches):
+        """Removes every memoized result that depends on any of the tokens.
+        Memo keys are (method name, argument key) pairs and caches maps
+        method names to their memo dicts.  Returns the number of results
+        removed."""
+        n = 0
+        keys = self._keys
+        for token in tokens:
+            for key in keys.pop(token, ()):
+                cache = caches.get(key[0], None)
+                if cache is not None and \
+                   cache.pop(key[1], NotSpecified) is not NotSpecified:
+                    n += 1
+                for other in self._deps.pop(key, ()):
+                    if other != token and other in keys:
+                        keys[other].discard(key)
+        return n
+
+    def inherit(self, other, exclude=()):
+        """Copies the dependencies of another instance's results, except for the
+        results which depend on any of the excluded tokens.  Returns the list of
+        memo keys whose dependencies were copied."""
+        exclude = frozenset(exclude)
+        keys = self._keys
+        inherited = []
+        for key, tokens in dict(other._deps).items():
+            if not exclude.isdisjoint(tokens):
+                continue
+            self._deps[key] = tokens
+            for token in tokens:
+                if token in keys:
+                    keys[token].add(key)
+                else:
+                    keys[token] = set([key])
+            inherited.append(key)
+        return inherited
+
+    def clear(self):
+        """Forgets all dependencies."""
+        self._deps.clear()
+        self._keys.clear()
+
+_KWMARK = object()  # separates positional from keyword arguments in memo keys
+
 class memoize_method(object):
     """Decorator suitable for memoizing methods, rather than functions
     and classes.  This is based off of code that may be found at
     http://code.activestate.com/recipes/577452-a-memoize-decorator-for-instance-methods/
     This code was originally released under the MIT license.
+
+    Each method has its own memo dict per instance, which lives in the
+    instance's ``_cache`` dict under the method's name.  The memoized bound
+    method is built once, on first access, and then stored on the instance so
+    that later lookups are plain attribute accesses.  Calls with only positional
+    arguments are keyed by the argument tuple itself and arguments which turn
+    out to be unhashable are simply not memoized.  If the instance has a
+    MemoDependencies object as its ``_memodeps`` attribute, the dependencies of
+    each result are recorded there.
     """
     def __init__(self, meth):
         self.meth = meth
+        self.name = meth.__name__
+
+    @staticmethod
+    def key(args, kwargs):
+        """Returns the memo key for a call.  This is just the positional
+        arguments unless there are keyword arguments."""
+        if kwargs:
+            return args + (_KWMARK,) + tuple(sorted(kwargs.items()))
+        return args
 
     def __get__(self, obj, objtype=None):
         if obj is None:
             return self.meth
-        p = functools.partial(self, obj)
-        p.__doc__ = self.meth.__doc__
-        p.__name__ = self.meth.__name__
-        return p
-
-    def __call__(self, *args, **kwargs):
-        obj = args[0]
-        cache = obj._cache = getattr(obj, '_cache', {})
-        key = (self.meth, args[1:], tuple(sorted(kwargs.items())))
-        hashable = ishashable(key)
-        if hashable:
-            if key not in cache:
-                cache[key] = self.meth(*args, **kwargs)
-            return cache[key]
-        else:
-            return self.meth(*args, **kwargs)
-
+        meth = self.meth
+        name = self.name
+        caches = obj.__dict__.setdefault('_cache', {})
+        cache = caches.setdefault(name, {})
+        deps = getattr(obj, '_memodeps', None)
+        local = None if deps is None else deps._local
+
+        def memoized(*args, **kwargs):
+            key = args + (_KWMARK,) + tuple(sorted(kwargs.items())) if kwargs \
+                  else args
+            try:
+                value = cache[key]
+            except KeyError:
+                pass
+            except TypeError:
+                return meth(obj, *args, **kwargs)  # unhashable arguments
+            else:
+                if local is not None and local.stack:
+                    deps.hit((name, key))
+                return value
+            if local is None:
+                value = cache[key] = meth(obj, *args, **kwargs)
+                return value
+            deps.push()
+            memokey = None
+            try:
+                value = cache[key] = meth(obj, *args, **kwargs)
+                memokey = (name, key)
+            finally:
+                deps.pop(memokey, key)
+            return value
+
+        memoized.__name__ = name
+        memoized.__doc__ = meth.__doc__
+        memoized.memoizer = self
+        obj.__dict__[name] = memoized
+        return memoized
 
 #
 # API Name Tuples and Functions
@@ -42,6 +42,30 @@ namespace {extra_types}
       void deall(T * ptr){{delete ptr;}};
   }};
 
+  /// Hands ownership of a heap allocated instance of type T over to
+  /// Python, such as to the base object of a NumPy array that views
+  /// its memory.  Python.h must already have been included, as it
+  /// always is in Cython generated sources.
+  template <class T>
+  class HeapCapsule
+  {{
+    public:
+      HeapCapsule(){{}};   ///< Default constructor
+      ~HeapCapsule(){{}};  ///< Default Destructor
+
+      /// Creates a capsule which deletes ptr when it is garbage collected.
+      /// \param T * ptr, instance created with new
+      /// \return new reference to the capsule
+      PyObject * capsule(T * ptr){{return PyCapsule_New(ptr, NULL, &destroy);}};
+
+      /// Capsule destructor which deletes the instance.
+      /// \param PyObject * cap, capsule made by capsule()
+      static void destroy(PyObject * cap)
+      {{
+        delete static_cast<T *>(PyCapsule_GetPointer(cap, NULL));
+      }};
+  }};
+
 // End namespace {extra_types}
 }};
 
@@ -26,6 +26,12 @@ cdef extern from "{extra_types}.h":
 
 cdef complex_t py2c_complex(object pyv)
 
+cdef extern from "{extra_types}.h" namespace "{extra_types}":
+
+    cdef cppclass HeapCapsule[T]:
+        HeapCapsule() nogil except +
+        object capsule(T *)
+
 cdef extern from "Python.h":
 
     object PyFile_FromFile(FILE *fp, char *name, char *mode, int (*close)(FILE*))